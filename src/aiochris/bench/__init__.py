@@ -0,0 +1,101 @@
+"""
+Performance benchmarks of *aiochris*, run against a `aiochris.testing.FakeCube`.
+
+```shell
+python -m aiochris.bench --output results.json
+python -m aiochris.bench --only pagination --only import_time
+```
+
+Each benchmark produces a `dict` of measurements. The results of a run are
+emitted as JSON so that they can be compared between commits.
+"""
+
+import dataclasses
+import datetime
+import importlib.metadata
+import platform
+import time
+from collections.abc import Callable, Coroutine, Sequence
+from typing import Any, Optional
+
+Measurements = dict[str, float | int]
+"""Results of a benchmark, e.g. `{"items_per_second": 12345.6}`"""
+
+Benchmark = Callable[["BenchConfig"], Coroutine[None, None, Measurements]]
+"""A benchmark is an async function which produces measurements."""
+
+BENCHMARKS: dict[str, Benchmark] = {}
+"""Registered benchmarks, by name."""
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchConfig:
+    """
+    Settings common to all benchmarks.
+    """
+
+    scale: float = 1.0
+    """Multiplier for the amount of work done by each benchmark."""
+    repeat: int = 3
+    """Number of times to repeat measurements. The best result is kept."""
+
+    def n(self, base: int) -> int:
+        """Scale a number of iterations."""
+        return max(1, int(base * self.scale))
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """
+    Register a benchmark.
+    """
+
+    def decorator(fn: Benchmark) -> Benchmark:
+        if name in BENCHMARKS:
+            raise ValueError(f'Benchmark "{name}" is already registered')
+        BENCHMARKS[name] = fn
+        return fn
+
+    return decorator
+
+
+async def run(
+    config: BenchConfig = BenchConfig(), only: Optional[Sequence[str]] = None
+) -> dict[str, Any]:
+    """
+    Run benchmarks and produce a JSON-serializable report.
+
+    Parameters
+    ----------
+    config
+        benchmark settings
+    only
+        names of benchmarks to run. By default, every benchmark is run.
+    """
+    import aiochris.bench.cases  # noqa: F401 registers benchmarks
+
+    names = list(BENCHMARKS) if not only else only
+    results = {}
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f'Unknown benchmark "{name}"')
+        start = time.perf_counter()
+        results[name] = await BENCHMARKS[name](config)
+        results[name]["wall_seconds"] = time.perf_counter() - start
+    return {
+        "aiochris_version": _version(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "config": dataclasses.asdict(config),
+        "results": results,
+    }
+
+
+def _version() -> str:
+    try:
+        return importlib.metadata.version("aiochris")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+__all__ = ["BenchConfig", "benchmark", "run", "BENCHMARKS", "Measurements"]
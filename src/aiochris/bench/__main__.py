@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from aiochris.bench import BenchConfig, run
+
+parser = argparse.ArgumentParser(
+    prog="python -m aiochris.bench", description="Run aiochris benchmarks."
+)
+parser.add_argument(
+    "--only", action="append", help="name of a benchmark to run (repeatable)"
+)
+parser.add_argument(
+    "--scale", type=float, default=1.0, help="multiplier for the amount of work"
+)
+parser.add_argument("--repeat", type=int, default=3, help="repetitions per measurement")
+parser.add_argument("-o", "--output", help="file to write results to (default: stdout)")
+
+
+def main():
+    options = parser.parse_args()
+    config = BenchConfig(scale=options.scale, repeat=options.repeat)
+    report = asyncio.run(run(config, options.only))
+    if options.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
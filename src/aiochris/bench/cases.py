@@ -0,0 +1,482 @@
+"""
+Benchmarks of *aiochris*. Importing this module registers them.
+"""
+
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any, Optional
+from unittest import mock
+
+import aiohttp
+from serde import from_dict
+
+from aiochris import ChrisClient, Status
+from aiochris.bench import BenchConfig, Measurements, benchmark
+from aiochris.link.linked import deserialize_linked
+from aiochris.models.collection_links import CollectionLinks
+from aiochris.models.logged_in import (
+    PACSFile,
+    PluginInstance,
+    Feed,
+    Plugin,
+    File,
+    User,
+)
+from aiochris.models.public import PluginParameter, ComputeResource
+from aiochris.testing import FakeCube, SyntheticData
+from aiochris.testing.server import _Resource  # noqa
+from aiochris.util.polling import (
+    ExponentialBackoff,
+    LearnedRuntime,
+    PollingStrategy,
+    StatusIntervals,
+)
+from aiochris.util.dag import Dag
+from aiochris.util.wait import WaitManager
+
+_API = "http://bench.local/api/v1/"
+
+
+@contextlib.asynccontextmanager
+async def _client_of(
+    cube: FakeCube, max_search_requests: int = -1
+) -> AsyncIterator[ChrisClient]:
+    async with cube.serve() as url:
+        chris = await ChrisClient.from_login(
+            url=url,
+            username=cube.admin_username,
+            password=cube.admin_password,
+            max_search_requests=max_search_requests,
+        )
+        async with chris:
+            yield chris
+
+
+def _best_of(repeat: int, fn: Callable[[], float]) -> float:
+    return min(fn() for _ in range(repeat))
+
+
+async def _best_of_async(repeat: int, fn) -> float:
+    return min([await fn() for _ in range(repeat)])
+
+
+@benchmark("pagination")
+async def pagination(config: BenchConfig) -> Measurements:
+    """Throughput of iterating over a `Search`."""
+    n = config.n(20_000)
+    page_size = 100
+    cube = FakeCube(data=SyntheticData(pacsfiles=n), page_size=page_size)
+    async with _client_of(cube) as chris:
+
+        async def measure() -> float:
+            start = time.perf_counter()
+            count = 0
+            async for _ in chris.search_pacsfiles():
+                count += 1
+            assert count == n
+            return time.perf_counter() - start
+
+        elapsed = await _best_of_async(config.repeat, measure)
+    return {
+        "items": n,
+        "page_size": page_size,
+        "seconds": elapsed,
+        "items_per_second": n / elapsed,
+    }
+
+
+def _sample_payloads(cube: FakeCube) -> dict[type, tuple[_Resource, int]]:
+    return {
+        PACSFile: (cube.pacsfiles, 1),
+        PluginInstance: (cube.plugin_instances, 20),
+        Feed: (cube.feeds, 1),
+        Plugin: (cube.plugins, 1),
+        PluginParameter: (cube.plugin_parameters, 1),
+        File: (cube.files, 1),
+        ComputeResource: (cube.compute_resources, 1),
+        User: (cube.users, 1),
+    }
+
+
+def _render(resource: _Resource, i: int) -> dict[str, Any]:
+    return resource.render(resource.view(resource.table.get(i)), _API)
+
+
+def _offline_client(cube: FakeCube, session) -> ChrisClient:
+    links = from_dict(CollectionLinks, cube.collection_links(_API, cube.admin_username))
+    return ChrisClient(
+        url=_API, s=session, collection_links=links, max_search_requests=100
+    )
+
+
+@benchmark("deserialize")
+async def deserialize(config: BenchConfig) -> Measurements:
+    """Throughput of `aiochris.link.linked.deserialize_linked` per model type."""
+    n = config.n(5_000)
+    cube = FakeCube()
+    client = _offline_client(cube, _stub_session({}))
+    results = {}
+    for model, (resource, i) in _sample_payloads(cube).items():
+        payload = _render(resource, i)
+
+        def measure() -> float:
+            payloads = [dict(payload) for _ in range(n)]
+            start = time.perf_counter()
+            for p in payloads:
+                deserialize_linked(client, model, p)
+            return time.perf_counter() - start
+
+        elapsed = _best_of(config.repeat, measure)
+        results[f"{model.__name__}_per_second"] = n / elapsed
+    return results
+
+
+class _StubResponse:
+    status = 200
+
+    def __init__(self, body: dict):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self, **_kwargs) -> dict:
+        return dict(self.body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        pass
+
+
+def _stub_session(body: dict) -> aiohttp.ClientSession:
+    """
+    Create a stand-in for an `aiohttp.ClientSession` which responds instantly.
+    """
+    session = mock.NonCallableMagicMock(spec=aiohttp.ClientSession)
+    session.get = lambda *_args, **_kwargs: _StubResponse(body)
+    return session
+
+
+@benchmark("decorator_overhead")
+async def decorator_overhead(config: BenchConfig) -> Measurements:
+    """
+    Time spent in `aiochris.link.http` decorated methods, excluding the network.
+    """
+    n = config.n(20_000)
+    cube = FakeCube()
+    payload = _render(cube.users, 1)
+    client = _offline_client(cube, _stub_session(payload))
+
+    async def call() -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            await client.user()
+        return time.perf_counter() - start
+
+    def baseline() -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            deserialize_linked(client, User, dict(payload))
+        return time.perf_counter() - start
+
+    called = await _best_of_async(config.repeat, call)
+    deserialized = _best_of(config.repeat, baseline)
+    return {
+        "calls": n,
+        "microseconds_per_call": called / n * 1e6,
+        "microseconds_per_deserialize": deserialized / n * 1e6,
+        "overhead_microseconds_per_call": (called - deserialized) / n * 1e6,
+    }
+
+
+@benchmark("file_transfer")
+async def file_transfer(config: BenchConfig) -> Measurements:
+    """Throughput of uploading and downloading a file."""
+    size = config.n(64 * 1024 * 1024)
+    cube = FakeCube()
+    async with _client_of(cube) as chris:
+        with tempfile.TemporaryDirectory() as tmp:
+            local_file = Path(tmp) / "upload.dat"
+            with local_file.open("wb") as f:
+                f.write(os.urandom(size))
+
+            async def upload() -> float:
+                start = time.perf_counter()
+                await chris.upload_file(local_file, "bench/upload.dat")
+                return time.perf_counter() - start
+
+            upload_seconds = await _best_of_async(config.repeat, upload)
+            uploaded = await chris.upload_file(local_file, "bench/upload.dat")
+
+            async def download() -> float:
+                start = time.perf_counter()
+                received = 0
+                async for chunk in uploaded.iter_chunks():
+                    received += len(chunk)
+                assert received == size
+                return time.perf_counter() - start
+
+            async def download_to_file() -> float:
+                start = time.perf_counter()
+                await uploaded.download(Path(tmp) / "download.dat")
+                return time.perf_counter() - start
+
+            download_seconds = await _best_of_async(config.repeat, download)
+            to_file_seconds = await _best_of_async(config.repeat, download_to_file)
+    mebibytes = size / 1024 / 1024
+    return {
+        "bytes": size,
+        "upload_mib_per_second": mebibytes / upload_seconds,
+        "download_mib_per_second": mebibytes / download_seconds,
+        "download_to_file_mib_per_second": mebibytes / to_file_seconds,
+    }
+
+
+@benchmark("range_download")
+async def range_download(config: BenchConfig) -> Measurements:
+    """
+    Throughput of downloading a file using parallel byte ranges compared to
+    a single stream, from a server with a per-connection bandwidth limit.
+    """
+    size = config.n(32 * 1024 * 1024)
+    bandwidth = 16 * 1024 * 1024
+    part_size = max(size // 16, 1024 * 1024)
+    cube = FakeCube(bandwidth=bandwidth)
+    results = {"bytes": size, "bandwidth_per_connection": bandwidth}
+    async with _client_of(cube) as chris:
+        uploaded = await chris.upload(os.urandom(size), "bench/range.dat")
+        with tempfile.TemporaryDirectory() as tmp:
+            for concurrency in (1, 4, 8):
+
+                async def measure() -> float:
+                    start = time.perf_counter()
+                    await uploaded.download(
+                        Path(tmp) / "range.dat",
+                        concurrency=concurrency,
+                        part_size=part_size,
+                    )
+                    return time.perf_counter() - start
+
+                seconds = await _best_of_async(config.repeat, measure)
+                results[f"concurrency_{concurrency}_mib_per_second"] = (
+                    size / 1024 / 1024 / seconds
+                )
+    return results
+
+
+@benchmark("wait")
+async def wait(config: BenchConfig) -> Measurements:
+    """
+    Overhead of `PluginInstance.wait`: the time between when a plugin instance
+    finishes and when `wait` returns, and the number of requests made,
+    with a fixed interval and with each `aiochris.util.polling` strategy.
+    """
+    job_seconds = 0.2
+    interval = 0.05
+    cube = FakeCube(
+        data=SyntheticData(feeds=0, plugin_instances=0),
+        job_script=(("started", job_seconds), ("finishedSuccessfully", 0)),
+    )
+    async with _client_of(cube) as chris:
+        dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+
+        async def measure(polling: Optional[PollingStrategy]) -> tuple[float, int]:
+            plinst = await dircopy.create_instance(dir="chris/uploads/bench")
+            requests_before = cube.request_count
+            elapsed, _ = await plinst.wait(interval=interval, polling=polling)
+            return elapsed - job_seconds, cube.request_count - requests_before
+
+        runs = [await measure(None) for _ in range(config.repeat)]
+        results = {
+            "job_seconds": job_seconds,
+            "interval": interval,
+            "mean_overhead_seconds": sum(o for o, _ in runs) / len(runs),
+            "mean_polls": sum(p for _, p in runs) / len(runs),
+        }
+        strategies = {
+            "backoff": ExponentialBackoff(initial=interval / 4, max_interval=1),
+            "status": StatusIntervals({Status.started: job_seconds}, default=interval),
+            "learned": await LearnedRuntime.from_history(
+                chris, "pl-dircopy", min_interval=interval / 4
+            ),
+        }
+        for name, polling in strategies.items():
+            runs = [await measure(polling) for _ in range(config.repeat)]
+            results[f"{name}_mean_overhead_seconds"] = sum(o for o, _ in runs) / len(
+                runs
+            )
+            results[f"{name}_mean_polls"] = polling.polls / len(runs)
+    return results
+
+
+@benchmark("wait_many")
+async def wait_many(config: BenchConfig) -> Measurements:
+    """
+    Requests made to wait on many plugin instances,
+    each polling on its own versus sharing a `aiochris.util.wait.WaitManager`.
+    """
+    n = config.n(200)
+    interval = 0.05
+    cube = FakeCube(job_script=(("started", 0.2), ("finishedSuccessfully", 0)))
+    async with _client_of(cube) as chris:
+        dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+
+        async def measure(manager: Optional[WaitManager]) -> tuple[float, int]:
+            plinsts = [
+                await dircopy.create_instance(dir="chris/uploads/bench")
+                for _ in range(n)
+            ]
+            requests_before = cube.request_count
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(p.wait(interval=interval, manager=manager) for p in plinsts)
+            )
+            return time.perf_counter() - start, cube.request_count - requests_before
+
+        separate_seconds, separate_requests = await measure(None)
+        shared_seconds, shared_requests = await measure(
+            WaitManager(chris, interval=interval)
+        )
+    return {
+        "instances": n,
+        "separate_seconds": separate_seconds,
+        "separate_requests": separate_requests,
+        "shared_seconds": shared_seconds,
+        "shared_requests": shared_requests,
+    }
+
+
+@benchmark("dag_launch")
+async def dag_launch(config: BenchConfig) -> Measurements:
+    """
+    Latency of creating a fan-out graph of plugin instances one at a time
+    versus using `aiochris.util.dag.Dag`.
+    """
+    n = config.n(50)
+    cube = FakeCube(latency=0.01)
+    async with _client_of(cube) as chris:
+        start = time.perf_counter()
+        dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+        root = await dircopy.create_instance(dir="chris/uploads/bench")
+        for _ in range(n):
+            ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+            await ds.create_instance(previous=root)
+        sequential_seconds = time.perf_counter() - start
+
+        dag = Dag()
+        root = dag.add("pl-dircopy", dir="chris/uploads/bench")
+        for _ in range(n):
+            dag.add("pl-simpledsapp", previous=root)
+        start = time.perf_counter()
+        run = await dag.launch(chris, concurrency=16)
+        dag_seconds = time.perf_counter() - start
+    assert run.ok
+    return {
+        "instances": n + 1,
+        "sequential_seconds": sequential_seconds,
+        "dag_seconds": dag_seconds,
+    }
+
+
+@benchmark("create_instances")
+async def create_instances(config: BenchConfig) -> Measurements:
+    """
+    Latency of creating a plugin instance after each of many plugin instances,
+    one at a time versus `aiochris.models.logged_in.Plugin.create_instances`.
+    """
+    n = config.n(100)
+    cube = FakeCube(latency=0.01)
+    async with _client_of(cube) as chris:
+        dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+        ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+        previous = [
+            await dircopy.create_instance(dir="chris/uploads/bench") for _ in range(n)
+        ]
+        start = time.perf_counter()
+        for p in previous:
+            await ds.create_instance(previous=p)
+        sequential_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        results = [r async for r in ds.create_instances(previous, concurrency=16)]
+        bulk_seconds = time.perf_counter() - start
+    assert all(r.ok for r in results)
+    return {
+        "instances": n,
+        "sequential_seconds": sequential_seconds,
+        "bulk_seconds": bulk_seconds,
+    }
+
+
+@benchmark("plugin_lookup")
+async def plugin_lookup(config: BenchConfig) -> Measurements:
+    """
+    Latency of looking up a plugin by name and version using a search
+    versus `aiochris.util.registry.PluginRegistry`.
+    """
+    n = config.n(50)
+    cube = FakeCube(latency=0.01)
+    async with _client_of(cube) as chris:
+        start = time.perf_counter()
+        for _ in range(n):
+            await chris.search_plugins(
+                name_exact="pl-dircopy", version="2.1.1"
+            ).get_only()
+        search_seconds = (time.perf_counter() - start) / n
+        registry = chris.plugin_registry
+        await registry.get("pl-dircopy", "2.1.1")
+        start = time.perf_counter()
+        for _ in range(n):
+            await registry.get("pl-dircopy", "2.1.1")
+        registry_seconds = (time.perf_counter() - start) / n
+    return {
+        "lookups": n,
+        "search_seconds_per_lookup": search_seconds,
+        "registry_seconds_per_lookup": registry_seconds,
+    }
+
+
+@benchmark("client_construction")
+async def client_construction(config: BenchConfig) -> Measurements:
+    """Latency of creating a client, with and without logging in."""
+    n = config.n(50)
+    cube = FakeCube()
+    async with cube.serve() as url:
+        login_start = time.perf_counter()
+        for _ in range(n):
+            chris = await ChrisClient.from_login(
+                url=url, username=cube.admin_username, password=cube.admin_password
+            )
+            await chris.close()
+        login_seconds = time.perf_counter() - login_start
+        token = next(iter(cube._tokens))
+        token_start = time.perf_counter()
+        for _ in range(n):
+            chris = await ChrisClient.from_token(url=url, token=token)
+            await chris.close()
+        token_seconds = time.perf_counter() - token_start
+    return {
+        "clients": n,
+        "from_login_milliseconds": login_seconds / n * 1e3,
+        "from_token_milliseconds": token_seconds / n * 1e3,
+    }
+
+
+@benchmark("import_time")
+async def import_time(config: BenchConfig) -> Measurements:
+    """Time to `import aiochris` in a new interpreter."""
+    code = "import time; s = time.perf_counter(); import aiochris; print(time.perf_counter() - s)"
+
+    def measure() -> float:
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        return float(output)
+
+    return {"seconds": _best_of(max(config.repeat, 3), measure)}
@@ -1,6 +1,10 @@
 import abc
+import asyncio
+import contextlib
+import functools
 import os
-from pathlib import Path
+from collections.abc import AsyncIterable, AsyncIterator
+from pathlib import Path, PurePosixPath
 from typing import Optional, Generic, Callable, Sequence, Self
 
 import aiohttp
@@ -10,11 +14,46 @@ from aiochris.client.base import BaseChrisClient
 from aiochris.client.base import L
 from aiochris.link import http
 from aiochris.link.linked import deserialize_res
-from aiochris.models.logged_in import Plugin, File, User, PluginInstance, Feed, PACSFile
+from aiochris.models.logged_in import (
+    Plugin,
+    File,
+    FileBrowserFolder,
+    User,
+    PluginInstance,
+    Feed,
+    PACSFile,
+    Pipeline,
+    Workflow,
+)
 from aiochris.models.public import ComputeResource
 from aiochris.types import ChrisURL, Username, Password
-from aiochris.errors import IncorrectLoginError, raise_for_status
+from aiochris.errors import (
+    IncorrectLoginError,
+    raise_for_status,
+    BaseClientError,
+    StatusError,
+)
+from aiochris.util.payload import (
+    DEFAULT_CHUNK_SIZE,
+    SizedAsyncIterablePayload,
+    file_payload,
+    payload_of,
+    read_file,
+)
+from aiochris.util.download import sync_files
+from aiochris.util.registry import PluginRegistry
 from aiochris.util.search import Search, acollect
+from aiochris.util.transfer import (
+    DEFAULT_MANIFEST_NAME,
+    default_manifest_path,
+    Manifest,
+    ManifestEntry,
+    ProgressCallback,
+    SyncReport,
+    TransferProgress,
+    TransferReport,
+)
+from aiochris.util.walk import WalkEntry, aggregate_sizes, walk_tree
 from aiochris.client.from_chrs import ChrsLogins
 
 
@@ -186,16 +225,32 @@ class AuthenticatedClient(BaseChrisClient[L], Generic[L], abc.ABC):
         """
         ...
 
+    @functools.cached_property
+    def plugin_registry(self) -> PluginRegistry:
+        """
+        Plugins of this *CUBE*, indexed by name and version and by image.
+
+        Prefer this over `search_plugins` for looking up plugins repeatedly,
+        see `aiochris.util.registry.PluginRegistry`.
+        """
+        return PluginRegistry(self)
+
+    async def close(self):
+        if "plugin_registry" in self.__dict__:  # only if it was used
+            await self.plugin_registry.close()
+        await super().close()
+
     async def upload_file(
-        self, local_file: str | os.PathLike, upload_path: str
+        self,
+        local_file: str | os.PathLike,
+        upload_path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
     ) -> File:
         """
         Upload a local file to *ChRIS*.
 
-        .. warning:: Uses non-async code.
-                     The file is read using non-async code.
-                     Performance will suffer with large files and hard drives.
-                     See [aiolibs/aiohttp#7174](https://github.com/aio-libs/aiohttp/issues/7174)
+        The file is streamed: it is read in chunks of `chunk_size` bytes
+        using a thread pool, so the event loop is not blocked.
 
         Examples
         --------
@@ -212,68 +267,421 @@ class AuthenticatedClient(BaseChrisClient[L], Generic[L], abc.ABC):
         assert file.fname == 'aiochris/uploads/dir/my_data.dat'
         ```
 
-        Upload (in parallel) all `*.txt` files in a directory
-        `'incoming'` to `aiochris/uploads/big_folder`:
+        To upload all the files of a directory, use `upload_directory`.
+
+        Parameters
+        ----------
+        local_file
+            Path of an existing local file to upload.
+        upload_path
+            A subpath of `{username}/uploads/` where to upload the file to in *CUBE*
+        chunk_size
+            Number of bytes to read from the local file at a time.
+
+        See also
+        --------
+        `upload` : upload data which is not in a local file.
+        """
+        payload = await file_payload(local_file, chunk_size)
+        return await self._upload(payload, upload_path, {"fname": local_file})
+
+    async def upload(
+        self,
+        data: bytes | bytearray | memoryview | AsyncIterable[bytes],
+        upload_path: str,
+        length: Optional[int] = None,
+    ) -> File:
+        """
+        Upload data from memory or from an asynchronous stream to *ChRIS*.
+
+        *CUBE* requires the length of uploads to be known in advance,
+        so `length` must be given if `data` is an async iterable.
+
+        Examples
+        --------
 
         ```python
-        upload_jobs = (
-            aiochris.upload_file(p, f'big_folder/{p}')
-            for p in Path('incoming')
-        )
-        await asyncio.gather(upload_jobs)
+        await chris.upload(b"hello, world\n", "greetings/hello.txt")
+
+        async with session.get(url) as res:
+            await chris.upload(res.content.iter_chunked(65536), "copy.dat", res.content_length)
         ```
 
         Parameters
         ----------
-        local_file
-            Path of an existing local file to upload.
+        data
+            bytes, or an async iterable which produces exactly `length` bytes
         upload_path
             A subpath of `{username}/uploads/` where to upload the file to in *CUBE*
+        length
+            Total number of bytes produced by `data`, if it is an async iterable.
+
+        Raises
+        ------
+        ValueError
+            If `data` is an async iterable and `length` is not given,
+            or if `data` produces a different number of bytes than `length`.
         """
+        payload = payload_of(data, length)
+        return await self._upload(payload, upload_path, {"length": payload.size})
+
+    async def _upload(
+        self, payload: aiohttp.payload.Payload, upload_path: str, request_data: dict
+    ) -> File:
         upload_path = await self._add_upload_prefix(upload_path)
-        local_file = Path(local_file)
-        with local_file.open("rb") as f:
-            data = aiohttp.FormData()
-            data.add_field("upload_path", upload_path)
-            data.add_field("fname", f, filename=local_file.name)
-            sent = self.s.post(self.collection_links.uploadedfiles, data=data)
+        data = aiohttp.FormData()
+        data.add_field("upload_path", upload_path)
+        data.add_field("fname", payload, filename=PurePosixPath(upload_path).name)
+        sent = self.s.post(self.collection_links.useruploadedfiles, data=data)
+        try:
             return await deserialize_res(
-                sent, self, {"fname": local_file, "upload_path": upload_path}, File
+                sent, self, {**request_data, "upload_path": upload_path}, File
             )
+        except aiohttp.ClientError as e:
+            # aiohttp wraps errors raised by the payload, e.g. for a length mismatch
+            if isinstance(e.__cause__, ValueError):
+                raise e.__cause__
+            raise
+
+    async def upload_directory(
+        self,
+        local_dir: str | os.PathLike,
+        upload_path: str,
+        concurrency: int = 4,
+        manifest: Optional[str | os.PathLike | bool] = True,
+        progress: Optional[ProgressCallback] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> TransferReport[File]:
+        """
+        Upload every file under a local directory to *ChRIS*.
 
-        # read_stream = _file_sender(local_file, chunk_size)
-        # file_length = os.stat(local_file).st_size
-        # return await self.upload_stream(read_stream, upload_path, str(local_file), file_length)
-
-    # doesn't work: 411 Length Required
-    # async def upload_stream(self, read_stream: AsyncIterable[bytes], upload_path: str, fname: str, length: int
-    #                         ) -> File:
-    #     """
-    #     Stream a file upload to *ChRIS*. For a higher-level wrapper which accepts
-    #     a path argument instead, see `upload`.
-    #
-    #     Parameters
-    #     ----------
-    #     read_stream
-    #         bytes stream
-    #     upload_path
-    #         uploadedfiles path starting with `'{username}/uploads/`
-    #     fname
-    #         file name to use in the multipart POST request
-    #     length
-    #         content length
-    #     """
-    #     data = aiohttp.FormData()
-    #     data.add_field('upload_path', upload_path)
-    #     data.add_field('fname', read_stream, filename=fname)
-    #     async with self.s.post(self.collection_links.uploadedfiles, data=data) as res:
-    #         return serde.json.from_json(File, await res.text())
-    #
-    #     with aiohttp.MultipartWriter() as mpwriter:
-    #         mpwriter.append_form({'upload_path': upload_path})
-    #         mpwriter.append(read_stream, headers={
-    #             'Content-Disposition': 'form-data; name="fname"; filename="value_goes_here"'
-    #         })
+        At most `concurrency` files are uploaded at a time. Files which were already
+        uploaded are skipped: they are either recorded in the manifest file of a
+        previous run, or a file of the same size is already in *CUBE* at the same path.
+        A failure to upload a file does not stop the upload of the other files.
+
+        Examples
+        --------
+
+        ```python
+        report = await chris.upload_directory(
+            "./incoming", "big_folder", concurrency=8, progress=print
+        )
+        if not report.ok:
+            print(f"failed to upload: {list(report.failed)}")
+        ```
+
+        Parameters
+        ----------
+        local_dir
+            Path of a local directory to upload.
+        upload_path
+            A subpath of `{username}/uploads/` where to upload the directory to in *CUBE*
+        concurrency
+            Maximum number of files to upload at the same time.
+        manifest
+            File where finished uploads are recorded, so that an interrupted upload
+            can be resumed. Relative paths are relative to `local_dir`, e.g.
+            `aiochris.util.transfer.DEFAULT_MANIFEST_NAME` keeps the manifest
+            inside of the uploaded directory. If `True`, a file in the user's
+            cache directory for this directory and destination is used
+            (see `aiochris.util.transfer.default_manifest_path`).
+            `None` or `False` disables the manifest.
+        progress
+            Function which is called whenever a file is finished.
+        chunk_size
+            Number of bytes to read from a local file at a time.
+        """
+        local_dir = Path(local_dir)
+        upload_path = (await self._add_upload_prefix(upload_path)).rstrip("/")
+        if manifest is True:
+            destination = f"{self.url.rstrip('/')}/{upload_path}"
+            manifest_path = default_manifest_path(local_dir, destination)
+        elif manifest is None or manifest is False:
+            manifest_path = None
+        else:
+            manifest_path = local_dir / manifest
+        manifests = {local_dir / DEFAULT_MANIFEST_NAME, manifest_path}
+        files = await asyncio.to_thread(_walk_files, local_dir, manifests)
+        report = TransferReport(
+            TransferProgress(
+                total_files=len(files),
+                total_bytes=sum(s.st_size for s in files.values()),
+            )
+        )
+        existing = {
+            f.fname: f.fsize
+            async for f in self._search_uploaded_files(fname=f"{upload_path}/")
+        }
+
+        async with contextlib.AsyncExitStack() as stack:
+            if manifest_path is not None:
+                manifest = await stack.enter_async_context(Manifest(manifest_path))
+            else:
+                manifest = None
+
+            def finish_skipped(rel: str, stat: os.stat_result) -> None:
+                report.skipped.append(rel)
+                report.progress.skipped_files += 1
+                report.progress.skipped_bytes += stat.st_size
+                if progress is not None:
+                    progress(report.progress)
+
+            async def upload_one(rel: str, stat: os.stat_result) -> None:
+                fname = f"{upload_path}/{rel}"
+                entry = None if manifest is None else manifest.get(rel)
+                if (
+                    entry is not None and entry.fname == fname and entry.matches(stat)
+                ) or (existing.get(fname) == stat.st_size):
+                    finish_skipped(rel, stat)
+                    return
+                sent = 0
+
+                async def counted(chunks):
+                    nonlocal sent
+                    async for chunk in chunks:
+                        sent += len(chunk)
+                        report.progress.bytes += len(chunk)
+                        yield chunk
+
+                payload = SizedAsyncIterablePayload(
+                    counted(read_file(local_dir / rel, chunk_size)),
+                    stat.st_size,
+                    filename=PurePosixPath(rel).name,
+                )
+                try:
+                    uploaded = await self._upload(payload, fname, {"fname": rel})
+                except (aiohttp.ClientError, BaseClientError, OSError, ValueError) as e:
+                    report.progress.bytes -= sent
+                    report.progress.failed_files += 1
+                    report.failed[rel] = e
+                else:
+                    report.progress.files += 1
+                    report.transferred.append(uploaded)
+                    if manifest is not None:
+                        await manifest.add(
+                            ManifestEntry(
+                                rel, uploaded.fname, stat.st_size, stat.st_mtime_ns
+                            )
+                        )
+                if progress is not None:
+                    progress(report.progress)
+
+            pending = iter(files.items())
+
+            async def worker() -> None:
+                for rel, stat in pending:
+                    await upload_one(rel, stat)
+
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        return report
+
+    async def sync_down(
+        self,
+        cube_prefix: str,
+        local_dir: str | os.PathLike,
+        files: Optional[AsyncIterable[File]] = None,
+        delete: bool = False,
+        dry_run: bool = False,
+        concurrency: int = 4,
+        progress: Optional[ProgressCallback] = None,
+        filebrowser: bool = False,
+        **kwargs,
+    ) -> SyncReport:
+        """
+        Make a local directory mirror the files under a path in *CUBE*.
+
+        Only files which are new, or which have a different size, are downloaded.
+        Local paths are the paths of files relative to `cube_prefix`.
+
+        Examples
+        --------
+
+        Mirror a feed every night:
+
+        ```python
+        feed = await chris.search_feeds(id=42).get_only()
+        report = await chris.sync_down(
+            f"chris/feed_{feed.id}", "./feed_42", files=feed.get_files(), delete=True
+        )
+        print(f"downloaded {len(report.transferred)}, deleted {len(report.deleted)}")
+        ```
+
+        Mirror any folder of the filebrowser, e.g. the outputs of a plugin instance:
+
+        ```python
+        await chris.sync_down(plinst.output_path, "./outputs", filebrowser=True)
+        ```
+
+        Parameters
+        ----------
+        cube_prefix
+            path in *CUBE* to synchronize
+        local_dir
+            local directory to synchronize
+        files
+            listing of files to synchronize. By default, the user's uploaded files
+            (`userfiles` or `uploadedfiles`) under `cube_prefix` are listed.
+        delete
+            If `True`, local files which are not in *CUBE* are deleted.
+            Unless `files` is given or `filebrowser=True`, `cube_prefix` must be a path
+            under the user's uploads, otherwise `ValueError` is raised,
+            since other paths would look empty and every local file would be deleted.
+        dry_run
+            If `True`, nothing is downloaded or deleted,
+            but the report says what would have been.
+        concurrency
+            maximum number of files to download at the same time
+        progress
+            function which is called whenever a file is finished
+        filebrowser
+            If `True` and `files` is not given, files are listed by walking
+            the filebrowser under `cube_prefix` (see `walk_files`) instead.
+        kwargs
+            passed to `aiochris.models.logged_in.File.download`
+        """
+        if files is None and filebrowser:
+            files = self.walk_files(cube_prefix)
+        elif files is None:
+            fname = cube_prefix.rstrip("/") + "/"
+            upload_prefix = f"{await self.username()}/uploads/"
+            if delete and not fname.startswith(upload_prefix):
+                raise ValueError(
+                    f'"{cube_prefix}" is not under "{upload_prefix}", so it cannot be '
+                    "listed from uploaded files. Pass files or filebrowser=True."
+                )
+            files = self._search_uploaded_files(fname=fname)
+        return await sync_files(
+            files,
+            cube_prefix,
+            local_dir,
+            delete=delete,
+            dry_run=dry_run,
+            concurrency=concurrency,
+            progress=progress,
+            **kwargs,
+        )
+
+    @http.search("filebrowser")
+    def search_filebrowser(self, **query) -> Search[FileBrowserFolder]:
+        """
+        Search for folders of the filebrowser, e.g. `search_filebrowser(path="chris/uploads")`.
+        """
+        ...
+
+    async def get_folder(self, path: str) -> Optional[FileBrowserFolder]:
+        """
+        Get a folder of the filebrowser, or `None` if it does not exist.
+        """
+        path = path.strip("/")
+        folder = await self.search_filebrowser(path=path).first()
+        if folder is None or folder.path.strip("/") != path:
+            return None
+        return folder
+
+    async def walk(
+        self, path: str = "", concurrency: int = 8, files: bool = True
+    ) -> AsyncIterator[WalkEntry]:
+        """
+        Walk a tree of the filebrowser, analogous to `os.walk`.
+
+        Folders are listed breadth-first, up to `concurrency` at a time,
+        and each folder is produced as soon as it is listed, so the order of
+        folders of the same depth is not deterministic.
+
+        Only the top folder is searched for. The URLs of subfolders are made
+        from the URLs of their parents, so each subfolder is gotten and its
+        files are listed at the same time.
+
+        Examples
+        --------
+
+        ```python
+        async for entry in chris.walk("chris", concurrency=16):
+            print(entry.path, len(entry.files), entry.size)
+        ```
+
+        Parameters
+        ----------
+        path
+            path of the top folder. Nothing is produced if it does not exist.
+        concurrency
+            maximum number of folders to list at the same time
+        files
+            If `False`, files are not listed, which makes the walk faster.
+        """
+        if (top := await self.get_folder(path)) is None:
+            return
+        unlisted = {path.strip("/"): top}
+
+        async def list_folder(folder_path: str) -> Optional[WalkEntry]:
+            folder = unlisted.pop(folder_path)
+            listing = (
+                asyncio.create_task(acollect(folder.get_files(limit=100)))
+                if files
+                else None
+            )
+            try:
+                if folder is not top:
+                    folder = await folder.get()
+                listed = [] if listing is None else await listing
+            except StatusError as e:
+                if e.status == 404:
+                    return None  # deleted during the walk
+                raise
+            finally:
+                if listing is not None:
+                    listing.cancel()
+                    await asyncio.gather(listing, return_exceptions=True)
+            for name in folder.subfolder_names:
+                unlisted[f"{folder_path}/{name}" if folder_path else name] = (
+                    folder.child(name)
+                )
+            return WalkEntry(folder_path, folder.subfolder_names, listed)
+
+        async for entry in walk_tree(list_folder, path, concurrency):
+            yield entry
+
+    async def walk_files(
+        self, path: str = "", concurrency: int = 8
+    ) -> AsyncIterator[File]:
+        """
+        Produce every file under a path of the filebrowser, including the files
+        of subfolders, using `walk`.
+        """
+        async for entry in self.walk(path, concurrency):
+            for file in entry.files:
+                yield file
+
+    async def disk_usage(self, path: str = "", concurrency: int = 8) -> dict[str, int]:
+        """
+        Compute the total size of every folder under a path of the filebrowser.
+
+        Examples
+        --------
+
+        ```python
+        usage = await chris.disk_usage("chris")
+        for folder, size in sorted(usage.items(), key=lambda u: -u[1])[:10]:
+            print(f"{size:>16,} {folder}")
+        ```
+
+        Returns
+        -------
+        dict[str, int]
+            Total size in bytes of all files under each folder, including subfolders.
+        """
+        return aggregate_sizes(await acollect(self.walk(path, concurrency)))
+
+    def _search_uploaded_files(self, **query) -> Search[File]:
+        return Search(
+            base_url=self.collection_links.useruploadedfiles,
+            params={"limit": 100, **query},
+            client=self,
+            Item=File,
+            max_requests=-1,
+            link_name="useruploadedfiles",
+        )
 
     async def _add_upload_prefix(self, upload_path: str) -> str:
         upload_prefix = f"{await self.username()}/uploads/"
@@ -328,15 +736,40 @@ class AuthenticatedClient(BaseChrisClient[L], Generic[L], abc.ABC):
         """
         ...
 
+    @http.search("pipelines")
+    def search_pipelines(self, **query) -> Search[Pipeline]:
+        """
+        Search for pipelines.
+        """
+        ...
+
+    @http.search("workflows")
+    def search_workflows(self, **query) -> Search[Workflow]:
+        """
+        Search for workflows.
+        """
+        ...
+
 
-# async def _file_sender(file_name: str | os.PathLike, chunk_size: int):
-#     """
-#     Stream the reading of a file using an asynchronous generator.
-#
-#     https://docs.aiohttp.org/en/stable/client_quickstart.html#streaming-uploads
-#     """
-#     async with aiofiles.open(file_name, 'rb') as f:
-#         chunk = await f.read(chunk_size)
-#         while chunk:
-#             yield chunk
-#             chunk = await f.read(chunk_size)
+def _walk_files(
+    local_dir: Path, exclude: set[Optional[Path]]
+) -> dict[str, os.stat_result]:
+    """
+    Find all files under a directory.
+
+    Returns
+    -------
+    dict
+        `stat` of every file, by path relative to `local_dir` with `/` separators
+    """
+    if not local_dir.is_dir():
+        raise NotADirectoryError(local_dir)
+    exclude = {p.absolute() for p in exclude if p is not None}
+    files = {}
+    for root, _, names in os.walk(local_dir):
+        for name in sorted(names):
+            path = Path(root) / name
+            if path.absolute() in exclude:
+                continue
+            files[path.relative_to(local_dir).as_posix()] = path.stat()
+    return files
@@ -75,3 +75,27 @@ class NonsenseResponseError(BaseClientError):
     """CUBE returned data which does not make sense."""
 
     pass
+
+
+class DownloadSizeError(BaseClientError):
+    """The size of a downloaded file is different from its `fsize`."""
+
+    def __init__(self, url: str | yarl.URL, expected: int, received: int):
+        super().__init__(f"expected {expected} bytes from {url}, received {received}")
+        self.url = url
+        """URL of the file"""
+        self.expected = expected
+        """Size of the file according to *CUBE*"""
+        self.received = received
+        """Number of bytes received"""
+
+
+class InvalidParametersError(BaseClientError, ValueError):
+    """Parameters of a plugin instance are invalid according to the plugin's parameters."""
+
+    def __init__(self, plugin: str, errors: dict[str, list[str]]):
+        super().__init__(f"invalid parameters of {plugin}: {errors}")
+        self.plugin = plugin
+        """Name and version of the plugin"""
+        self.errors = errors
+        """Error messages by parameter name, like the body of a 400 response from *CUBE*"""
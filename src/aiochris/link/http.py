@@ -26,6 +26,7 @@ import yarl
 
 from aiochris.link.linked import LinkedMeta, Linked, deserialize_res
 from aiochris.link.metaprog import get_return_hint
+from aiochris.util.diagnostics import current_watcher
 from aiochris.util.search import Search
 
 logger = logging.getLogger(__name__)
@@ -114,6 +115,8 @@ def _http_method_decorator(
             url = self._get_link(link_name)
             data = _filter_none(kwargs)
             logger.debug(f"{method_name} --> {url} : {data}")
+            if (watcher := current_watcher()) is not None:
+                watcher.record_call(link_name)
             sent = request(self.s, url, data)
             return await deserialize_res(sent, self, data, return_type)
 
@@ -146,6 +149,7 @@ def search(
                 params=kwargs,
                 max_requests=self.max_search_requests,
                 subpath=subpath,
+                link_name=collection_name,
             )
 
         LinkedMeta.mark_to_check(wrapped, collection_name)
@@ -1,5 +1,6 @@
 import abc
 import dataclasses
+import time
 from typing import (
     Final,
     Any,
@@ -17,6 +18,7 @@ import yarl
 import importlib
 
 from aiochris.errors import raise_for_status, StatusError
+from aiochris.util.diagnostics import current_watcher
 
 T = TypeVar("T")
 
@@ -172,7 +174,13 @@ async def deserialize_res(
     sent_data: dict,
     return_type: Type[T],
 ) -> T:
+    start = time.perf_counter()
     async with sent_request as res:
+        # recorded before the status is checked, so that failed requests,
+        # and requests without a response body, are recorded too
+        if (watcher := current_watcher()) is not None:
+            body = await res.read()
+            watcher.record_response(res, time.perf_counter() - start, len(body))
         try:
             await raise_for_status(res)
         except StatusError as e:
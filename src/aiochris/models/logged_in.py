@@ -5,8 +5,14 @@ These classes may have read-write functionality on the *ChRIS* API.
 """
 
 import asyncio
+import dataclasses
+import datetime
+import json
+import os
 import time
-from collections.abc import Sequence
+import urllib.parse
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional
 
@@ -17,7 +23,30 @@ from aiochris.link import http
 from aiochris.link.linked import LinkedModel
 from aiochris.models.data import PluginInstanceData, FeedData, UserData, FeedNoteData
 from aiochris.models.public import PublicPlugin, PluginParameter
-from aiochris.util.search import Search
+from aiochris.util.admission import AdmissionController
+from aiochris.util.bulk import CreateResult, create_instances
+from aiochris.util.cache import FileCache
+from aiochris.util.compute import ComputeResourceSelector
+from aiochris.util.download import (
+    DEFAULT_PART_SIZE,
+    download_files,
+    download_ranges,
+    iter_response,
+    safe_relative_path,
+    write_file,
+)
+from aiochris.util.parameters import ParameterCache
+from aiochris.util.payload import DEFAULT_CHUNK_SIZE
+from aiochris.util.polling import PollingStrategy
+from aiochris.util.search import Search, acollect
+from aiochris.util.transfer import ProgressCallback, TransferReport
+from aiochris.util.wait import (
+    FINAL_STATUSES,
+    FeedDelta,
+    WaitManager,
+    active_jobs,
+    watch_job_counters,
+)
 from aiochris.types import *
 
 
@@ -35,6 +64,7 @@ class File(LinkedModel):
     """
 
     url: str
+    id: FileId
     fname: FileFname
     fsize: int
     file_resource: FileResourceUrl
@@ -57,7 +87,158 @@ class File(LinkedModel):
             return self.fname
         return "/".join(split[:-1])
 
-    # TODO download methods
+    def iter_chunks(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE, cache: Optional[FileCache] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the content of this file.
+
+        Every chunk is `chunk_size` bytes, except for the last one which may be smaller,
+        so memory usage does not depend on the size of the file.
+        If `cache` is given, the content is read from the cache,
+        and the file is downloaded into the cache first if needed.
+
+        Examples
+        --------
+
+        ```python
+        digest = hashlib.sha256()
+        async for chunk in file.iter_chunks():
+            digest.update(chunk)
+        ```
+
+        Raises
+        ------
+        aiochris.errors.DownloadSizeError
+            If the size of the content is not `fsize`.
+        """
+        if cache is not None:
+            return cache.iter_chunks(self, chunk_size)
+        return iter_response(self.s, self.file_resource, self.fsize, chunk_size)
+
+    async def download(
+        self,
+        path: str | os.PathLike,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        concurrency: int = 1,
+        part_size: int = DEFAULT_PART_SIZE,
+        cache: Optional[FileCache] = None,
+    ) -> Path:
+        """
+        Download this file to a local path.
+
+        Writes are done using a thread pool, so the event loop is not blocked.
+        Data is written to a temporary file `{path}.part` which is renamed to `path`
+        after its size is verified. Parent directories are created as needed.
+
+        If `concurrency > 1`, then byte ranges of `part_size` are requested
+        concurrently, which can be faster than a single stream for large files.
+        If *CUBE* does not support HTTP range requests, then the file is
+        downloaded using a single stream.
+
+        Examples
+        --------
+
+        ```python
+        await file.download("./data/brain.nii.gz", concurrency=8)
+        ```
+
+        Parameters
+        ----------
+        path
+            local file path to write to
+        chunk_size
+            number of bytes to receive and write at a time
+        concurrency
+            maximum number of byte ranges to download at the same time
+        part_size
+            size of byte ranges, if `concurrency > 1`
+        cache
+            If given, the file is copied from this cache,
+            and downloaded into the cache first if needed.
+
+        Raises
+        ------
+        aiochris.errors.DownloadSizeError
+            If the size of the content is not `fsize`.
+        """
+        if cache is not None:
+            await cache.copy(
+                self,
+                path,
+                chunk_size=chunk_size,
+                concurrency=concurrency,
+                part_size=part_size,
+            )
+        elif concurrency > 1 and self.fsize > part_size:
+            await download_ranges(
+                self.s,
+                self.file_resource,
+                path,
+                self.fsize,
+                concurrency,
+                part_size,
+                chunk_size,
+            )
+        else:
+            await write_file(self.iter_chunks(chunk_size), path)
+        return Path(path)
+
+
+@serde
+@dataclass(frozen=True)
+class FileBrowserFolder(LinkedModel):
+    """
+    A folder of the *CUBE* filebrowser.
+    """
+
+    url: FolderUrl
+    path: FolderPath
+    subfolders: str
+    """Names of subfolders, serialized as a JSON list."""
+    files: FilesUrl
+
+    @property
+    def subfolder_names(self) -> list[str]:
+        """
+        Names of the subfolders of this folder.
+
+        Examples
+        --------
+
+        ```python
+        assert folder.path == 'chris'
+        assert folder.subfolder_names == ['feed_1', 'uploads']
+        ```
+        """
+        if not self.subfolders:
+            return []
+        if self.subfolders.startswith("["):
+            return json.loads(self.subfolders)
+        return self.subfolders.split(",")
+
+    def child(self, name: str) -> "FileBrowserFolder":
+        """
+        A subfolder of this folder, without making a request.
+
+        Its `subfolders` are not known until it is gotten using `get`.
+        Its files can be listed without getting it first.
+        """
+        url = f"{self.url}{urllib.parse.quote(name)}/"
+        path = f"{self.path.rstrip('/')}/{name}" if self.path else name
+        return dataclasses.replace(
+            self, url=url, path=path, subfolders="", files=f"{url}files/"
+        )
+
+    @http.get("url")
+    async def get(self) -> "FileBrowserFolder":
+        """Get this folder (again)."""
+        ...
+
+    @http.search("files", subpath="")
+    def get_files(self, **query) -> Search[File]:
+        """Get the files directly in this folder."""
+        ...
 
 
 @serde
@@ -143,15 +324,153 @@ class PluginInstance(PluginInstanceData):
         """Delete this plugin instance."""
         ...
 
+    @http.search("files", subpath="")
+    def get_files(self, **query) -> Search[File]:
+        """Get the output files of this plugin instance."""
+        ...
+
+    async def download_outputs(
+        self,
+        dest: str | os.PathLike,
+        concurrency: int = 4,
+        progress: Optional[ProgressCallback] = None,
+        **kwargs,
+    ) -> TransferReport[Path]:
+        """
+        Download the output files of this plugin instance to a local directory.
+
+        Files are downloaded while their listing is being paginated through.
+        Paths relative to this plugin instance's `output_path` are preserved
+        under `dest`. Local files which already exist with the same size are skipped.
+
+        Examples
+        --------
+
+        ```python
+        report = await plinst.download_outputs("./outputs", concurrency=8)
+        for rel, error in report.failed.items():
+            print(f"{rel}: {error}")
+        ```
+
+        Parameters
+        ----------
+        dest
+            local directory to download to
+        concurrency
+            maximum number of files to download at the same time
+        progress
+            function which is called whenever a file is finished
+        kwargs
+            passed to `File.download`
+        """
+        prefix = self.output_path.rstrip("/") + "/"
+        return await download_files(
+            self.get_files(),
+            dest,
+            lambda f: f.fname.removeprefix(prefix),
+            concurrency,
+            progress,
+            **kwargs,
+        )
+
+    async def stream_outputs(
+        self,
+        dest: Optional[str | os.PathLike] = None,
+        interval: float = 2,
+        timeout: Optional[float] = None,
+        concurrency: int = 4,
+        **kwargs,
+    ) -> AsyncIterator[File]:
+        """
+        Produce the output files of this plugin instance as they are registered by *CUBE*.
+
+        This plugin instance's status is polled. While files are being registered,
+        and once more after the plugin instance finishes, the output files are
+        listed, and each new file is produced exactly once. Only files with an ID
+        number greater than those already seen are listed again, so each file is
+        listed once. Iteration stops after the plugin instance finishes.
+
+        If `dest` is given, each new file is downloaded immediately, so that
+        downloads overlap with *CUBE*'s file registration. Files are produced
+        after they are downloaded, with the same paths as `download_outputs`.
+
+        Examples
+        --------
+
+        ```python
+        async for file in plinst.stream_outputs("./outputs", interval=1):
+            print(f"downloaded {file.fname}")
+        ```
+
+        Parameters
+        ----------
+        dest
+            local directory to download to. If `None`, files are not downloaded.
+        interval
+            Number of seconds to wait between checking on status and files
+        timeout
+            Number of seconds after which `TimeoutError` is raised.
+        concurrency
+            maximum number of files to download at the same time
+        kwargs
+            passed to `File.download`
+        """
+        prefix = self.output_path.rstrip("/") + "/"
+        dest = None if dest is None else Path(dest)
+        slots = asyncio.Semaphore(concurrency)
+        pending: set[asyncio.Task] = set()
+        seen: set[str] = set()
+        last_id = 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async def fetch(file: File) -> File:
+            path = dest / safe_relative_path(file.fname.removeprefix(prefix))
+            async with slots:
+                await file.download(path, **kwargs)
+            return file
+
+        try:
+            cur = self
+            while True:
+                finished = cur.status in FINAL_STATUSES
+                if finished or cur.status is Status.registeringFiles:
+                    async for file in cur.get_files(min_id=last_id + 1):
+                        if file.url in seen:
+                            continue
+                        seen.add(file.url)
+                        last_id = max(last_id, file.id)
+                        if dest is None:
+                            yield file
+                        else:
+                            pending.add(asyncio.create_task(fetch(file)))
+                if finished:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"{self.url} did not finish in {timeout}s")
+                wake = time.monotonic() + interval
+                while pending and (remaining := wake - time.monotonic()) > 0:
+                    done, pending = await asyncio.wait(
+                        pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        yield task.result()
+                await asyncio.sleep(max(0.0, wake - time.monotonic()))
+                cur = await cur.get()
+            for task in asyncio.as_completed(pending):
+                yield await task
+            pending.clear()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def wait(
         self,
-        status: Status | Sequence[Status] = (
-            Status.finishedSuccessfully,
-            Status.finishedWithError,
-            Status.cancelled,
-        ),
+        status: Status | Sequence[Status] = FINAL_STATUSES,
         timeout: float = 300,
         interval: float = 5,
+        manager: Optional[WaitManager] = None,
+        polling: Optional[PollingStrategy] = None,
     ) -> tuple[float, "PluginInstance"]:
         """
         Wait until this plugin instance finishes (or some other desired status).
@@ -164,6 +483,12 @@ class PluginInstance(PluginInstanceData):
             Number of seconds to wait for before giving up
         interval
             Number of seconds to wait between checking on status
+        manager
+            If given, the status is polled by the manager together with
+            other plugin instances, and `interval` is ignored.
+        polling
+            If given, decides how long to wait between checking on status
+            instead of `interval`. See `aiochris.util.polling`.
 
         Returns
         -------
@@ -172,16 +497,27 @@ class PluginInstance(PluginInstanceData):
             This function will return for one of two reasons: either the plugin instance finished,
             or this function timed out. Make sure you check the plugin instance's final status!
         """
-        if status is Status:
+        if manager is not None:
+            return await manager.wait(self, status, timeout)
+        if isinstance(status, Status):
             status = (status,)
         if self.status in status:
             return 0.0, self
         timeout_ns = timeout * 1e9
         start = time.monotonic_ns()
-        while (cur := await self.get()).status not in status:
+        polls = 0
+        while True:
+            cur = await self.get()
+            polls += 1
+            if polling is not None:
+                polling.polls += 1
+            if cur.status in status:
+                break
             elapsed = time.monotonic_ns() - start
             if elapsed > timeout_ns:
                 return elapsed / 1e9, cur
+            if polling is not None:
+                interval = polling.interval(cur, elapsed / 1e9, polls)
             await asyncio.sleep(interval)
         return (time.monotonic_ns() - start) / 1e9, cur
 
@@ -209,6 +545,89 @@ class Feed(FeedData):
     A feed of a logged in user.
     """
 
+    @property
+    def active_jobs(self) -> int:
+        """Number of plugin instances of this feed which are not finished."""
+        return active_jobs(self)
+
+    @http.get("url")
+    async def get(self) -> "Feed":
+        """
+        Get this feed's state (again).
+        """
+        ...
+
+    async def watch(
+        self,
+        min_interval: float = 0.5,
+        max_interval: float = 30.0,
+        backoff: float = 2.0,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[FeedDelta]:
+        """
+        Poll this feed, producing the changes of its job counters.
+
+        Only the feed resource is requested, no matter how many plugin instances
+        it has. Polling starts every `min_interval` seconds, and the interval is
+        multiplied by `backoff` after every poll which sees no change, up to
+        `max_interval`. It goes back to `min_interval` after a change.
+
+        Examples
+        --------
+
+        ```python
+        async for delta in feed.watch():
+            print(delta.changes, f"{delta.feed.active_jobs} jobs active")
+        ```
+
+        Parameters
+        ----------
+        min_interval
+            Number of seconds to wait between polls after a change
+        max_interval
+            Maximum number of seconds to wait between polls
+        backoff
+            Factor by which the interval grows while nothing changes
+        timeout
+            Number of seconds after which `TimeoutError` is raised.
+        """
+        async for cur, changes in watch_job_counters(
+            self, min_interval, max_interval, backoff, timeout
+        ):
+            yield FeedDelta(cur, changes)
+
+    async def wait_idle(
+        self,
+        min_interval: float = 0.5,
+        max_interval: float = 30.0,
+        backoff: float = 2.0,
+        timeout: float = 300.0,
+    ) -> tuple[float, "Feed"]:
+        """
+        Wait until no plugin instances of this feed are active.
+
+        See `watch` for the parameters.
+
+        Returns
+        -------
+        elapsed_seconds
+            Number of seconds elapsed and the last state of the feed.
+            This function will return for one of two reasons: either the feed
+            became idle, or this function timed out. Make sure you check `active_jobs`!
+        """
+        if self.active_jobs == 0:
+            return 0.0, self
+        start = time.monotonic()
+        cur = self
+        try:
+            async for delta in self.watch(min_interval, max_interval, backoff, timeout):
+                cur = delta.feed
+                if cur.active_jobs == 0:
+                    break
+        except TimeoutError:
+            pass
+        return time.monotonic() - start, cur
+
     @http.put("url")
     async def set(
         self, name: Optional[str] = None, owner: Optional[str | Username] = None
@@ -235,6 +654,61 @@ class Feed(FeedData):
         """Delete this feed."""
         ...
 
+    @http.search("files", subpath="")
+    def get_files(self) -> Search[File]:
+        """Get the files of this feed, i.e. the outputs of all of its plugin instances."""
+        ...
+
+    async def download_files(
+        self,
+        dest: str | os.PathLike,
+        concurrency: int = 4,
+        progress: Optional[ProgressCallback] = None,
+        **kwargs,
+    ) -> TransferReport[Path]:
+        """
+        Download the files of this feed to a local directory.
+
+        Files are downloaded while their listing is being paginated through.
+        Paths relative to the feed's directory (e.g. `pl-dircopy_1/data/file.txt`)
+        are preserved under `dest`. Local files which already exist with the same
+        size are skipped.
+
+        Examples
+        --------
+
+        ```python
+        report = await feed.download_files("./feed", concurrency=8, progress=print)
+        assert report.ok
+        ```
+
+        Parameters
+        ----------
+        dest
+            local directory to download to
+        concurrency
+            maximum number of files to download at the same time
+        progress
+            function which is called whenever a file is finished
+        kwargs
+            passed to `File.download`
+        """
+        return await download_files(
+            self.get_files(),
+            dest,
+            self._relative_fname,
+            concurrency,
+            progress,
+            **kwargs,
+        )
+
+    def _relative_fname(self, file: File) -> str:
+        parts = file.fname.split("/")
+        feed_dir = f"feed_{self.id}"
+        if feed_dir in parts:
+            return "/".join(parts[parts.index(feed_dir) + 1 :])
+        return file.fname
+
 
 @serde
 @dataclass(frozen=True)
@@ -249,7 +723,11 @@ class Plugin(PublicPlugin):
     async def _create_instance_raw(self, **kwargs) -> PluginInstance: ...
 
     async def create_instance(
-        self, previous: Optional[PluginInstance] = None, **kwargs
+        self,
+        previous: Optional[PluginInstance] = None,
+        validate: bool | ParameterCache = False,
+        admission: Optional[AdmissionController] = None,
+        **kwargs,
     ) -> PluginInstance:
         """
         Create a plugin instance, i.e. "run" this plugin.
@@ -265,6 +743,15 @@ class Plugin(PublicPlugin):
             Previous plugin instance
         previous_id: int
             Previous plugin instance ID number (conflicts with `previous`)
+        validate: bool | aiochris.util.parameters.ParameterCache
+            If `True`, parameters are checked against this plugin's parameters
+            before the request is made, and the defaults of optional parameters are
+            filled in. The plugin's parameters are requested once, then cached in
+            `aiochris.util.parameters.ParameterCache.default()`, unless another
+            cache is given.
+        admission: aiochris.util.admission.AdmissionController
+            If given, the plugin instance is created once its compute resource
+            has enough budget for the resources it requests.
         compute_resource_name: Optional[str]
             Name of compute resource to use
         memory_limit: Optional[str]
@@ -289,4 +776,319 @@ class Plugin(PublicPlugin):
             raise ValueError(
                 f'Plugin type is "{self.plugin_type.value}" so previous is a required parameter.'
             )
+        if validate:
+            cache = ParameterCache.default() if validate is True else validate
+            kwargs = (await cache.get(self)).validate(kwargs)
+        if admission is not None:
+            return await admission.submit(self, kwargs)
         return await self._create_instance_raw(**kwargs)
+
+    async def create_instances(
+        self,
+        previous: Iterable[PluginInstance | PluginInstanceId],
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        validate: bool | ParameterCache = True,
+        selector: Optional[ComputeResourceSelector] = None,
+        admission: Optional[AdmissionController] = None,
+        **kwargs,
+    ) -> AsyncIterator[CreateResult]:
+        """
+        Create a plugin instance of this plugin after each of many plugin instances,
+        with the same parameters.
+
+        The parameters are checked against this plugin's parameters once, before
+        anything is created (see `create_instance`). Results are produced in the order they complete.
+        A plugin instance which could not be created does not stop the others:
+        its result has the error and the rejected request body.
+
+        Examples
+        --------
+
+        ```python
+        results = [r async for r in plugin.create_instances(previous_list, concurrency=16)]
+        failed = [r for r in results if not r.ok]
+        ```
+
+        Parameters
+        ----------
+        previous
+            Previous plugin instances, or their ID numbers
+        concurrency
+            maximum number of plugin instances to create at the same time
+        rate
+            maximum number of plugin instances to create per second
+        validate
+            See `create_instance`.
+        selector
+            If given, each plugin instance is sent to the least loaded compute
+            resource, unless `compute_resource_name` is given.
+        admission
+            See `create_instance`.
+        kwargs
+            Parameters of the plugin instances. See `create_instance`.
+
+        Raises
+        ------
+        ValueError
+            If this is a fs-type plugin, or if `admission` is given and
+            a resource limit is malformed.
+        aiochris.errors.InvalidParametersError
+            If the parameters are invalid.
+        """
+        if self.plugin_type is PluginType.fs:
+            raise ValueError(
+                "Cannot create plugin instance of a fs-type plugin with a previous plugin instance."
+            )
+        async for result in create_instances(
+            self, previous, concurrency, rate, kwargs, validate, selector, admission
+        ):
+            yield result
+
+
+@serde
+@dataclass(frozen=True)
+class Piping(LinkedModel):
+    """
+    A node of a pipeline, i.e. a plugin and its place in the pipeline's tree.
+    """
+
+    url: PipingUrl
+    id: PipingId
+    previous_id: Optional[PipingId]
+    title: str
+    plugin_id: PluginId
+    plugin_name: PluginName
+    plugin_version: PluginVersion
+    pipeline_id: PipelineId
+    previous: Optional[PipingUrl]
+    pipeline: PipelineUrl
+    plugin: PluginUrl
+
+    @http.get("plugin")
+    async def get_plugin(self) -> Plugin:
+        """Get the plugin of this piping."""
+        ...
+
+
+@serde
+@dataclass(frozen=True)
+class PipelineParameter(LinkedModel):
+    """
+    The default value of a parameter of a piping.
+    """
+
+    url: PipelineParameterUrl
+    id: PipelineParameterId
+    value: ParameterValue
+    type: ParameterType
+    plugin_piping_id: PipingId
+    plugin_piping_title: str
+    param_name: ParameterName
+    param_id: PluginParameterId
+    plugin_name: PluginName
+    plugin_version: PluginVersion
+    plugin_id: PluginId
+
+
+@serde
+@dataclass(frozen=True)
+class Workflow(LinkedModel):
+    """
+    A run of a pipeline: the plugin instances created from its pipings.
+    """
+
+    url: WorkflowUrl
+    id: WorkflowId
+    creation_date: datetime.datetime
+    title: str
+    owner_username: Username
+    pipeline_id: PipelineId
+    pipeline_name: str
+    created_jobs: int
+    waiting_jobs: int
+    scheduled_jobs: int
+    started_jobs: int
+    registering_jobs: int
+    finished_jobs: int
+    errored_jobs: int
+    cancelled_jobs: int
+    pipeline: PipelineUrl
+    plugin_instances: PluginInstancesUrl
+
+    @property
+    def active_jobs(self) -> int:
+        """Number of plugin instances of this workflow which are not finished."""
+        return active_jobs(self)
+
+    @http.get("url")
+    async def get(self) -> "Workflow":
+        """
+        Get this workflow's state (again).
+        """
+        ...
+
+    @http.get("pipeline")
+    async def get_pipeline(self) -> "Pipeline":
+        """Get the pipeline this workflow was created from."""
+        ...
+
+    @http.search("plugin_instances", subpath="")
+    def get_plugin_instances(self) -> Search[PluginInstance]:
+        """Get the plugin instances of this workflow."""
+        ...
+
+    async def wait(
+        self,
+        min_interval: float = 0.5,
+        max_interval: float = 30.0,
+        backoff: float = 2.0,
+        timeout: float = 300.0,
+    ) -> tuple[float, list[PluginInstance]]:
+        """
+        Wait until all plugin instances of this workflow are finished.
+
+        Only the workflow resource is polled, using its job counters,
+        no matter how many plugin instances it has. See `Feed.watch`
+        for the parameters.
+
+        Returns
+        -------
+        elapsed_seconds
+            Number of seconds elapsed and the last states of the plugin instances.
+            This function will return for one of two reasons: either every plugin
+            instance finished, or this function timed out. Make sure you check
+            their statuses!
+        """
+        start = time.monotonic()
+        if self.active_jobs > 0:
+            try:
+                async for cur, _ in watch_job_counters(
+                    self, min_interval, max_interval, backoff, timeout
+                ):
+                    if cur.active_jobs == 0:
+                        break
+            except TimeoutError:
+                pass
+        plinsts = await acollect(self.get_plugin_instances())
+        return time.monotonic() - start, plinsts
+
+
+@serde
+@dataclass(frozen=True)
+class Pipeline(LinkedModel):
+    """
+    A tree of plugins with default parameters, which can be run as a whole
+    by creating a `Workflow`.
+    """
+
+    url: PipelineUrl
+    id: PipelineId
+    name: str
+    locked: bool
+    authors: str
+    category: str
+    description: str
+    owner_username: Username
+    creation_date: datetime.datetime
+    modification_date: datetime.datetime
+    plugins: PipelinePluginsUrl
+    plugin_pipings: PipingsUrl
+    default_parameters: PipelineDefaultParametersUrl
+    workflows: WorkflowsUrl
+
+    @http.search("plugin_pipings", subpath="")
+    def get_pipings(self) -> Search[Piping]:
+        """Get the pipings of this pipeline, in order (parents before children)."""
+        ...
+
+    @http.search("default_parameters", subpath="")
+    def get_default_parameters(self) -> Search[PipelineParameter]:
+        """Get the default parameter values of every piping of this pipeline."""
+        ...
+
+    @http.search("workflows", subpath="")
+    def get_workflows(self) -> Search[Workflow]:
+        """Get the workflows created from this pipeline."""
+        ...
+
+    @http.post("workflows")
+    async def _create_workflow_raw(self, **kwargs) -> Workflow: ...
+
+    async def create_workflow(
+        self,
+        previous: PluginInstance,
+        params: Optional[Mapping[str | int, Mapping[str, ParameterValue]]] = None,
+        title: Optional[str] = None,
+        compute_resource_name: Optional[str] = None,
+    ) -> Workflow:
+        """
+        Run this pipeline after a plugin instance.
+
+        All of the pipeline's plugin instances are created by *CUBE* in a single
+        request, in contrast to calling `Plugin.create_instance` once per piping.
+
+        Examples
+        --------
+
+        ```python
+        pipeline = await chris.search_pipelines(name="Fetal Brain Reconstruction").get_only()
+        workflow = await pipeline.create_workflow(
+            dircopy, params={"mask": {"threshold": 0.5}}, title="subject 1"
+        )
+        elapsed, plinsts = await workflow.wait()
+        ```
+
+        Parameters
+        ----------
+        previous
+            Plugin instance which the root of the pipeline runs after
+        params
+            Parameters which override the pipeline's defaults,
+            by piping title or piping ID number.
+            Titles which are shared by several pipings cannot be used.
+        title
+            Title of the workflow
+        compute_resource_name
+            Name of compute resource to use for every plugin instance
+        """
+        kwargs = {"previous_plugin_inst_id": previous.id, "title": title}
+        if params or compute_resource_name is not None:
+            nodes = self._nodes_info(
+                await acollect(self.get_pipings()), params or {}, compute_resource_name
+            )
+            kwargs["nodes_info"] = json.dumps(nodes)
+        return await self._create_workflow_raw(**kwargs)
+
+    @staticmethod
+    def _nodes_info(
+        pipings: Sequence[Piping],
+        params: Mapping[str | int, Mapping[str, ParameterValue]],
+        compute_resource_name: Optional[str],
+    ) -> list[dict]:
+        by_key: dict[str | int, list[Piping]] = {}
+        for piping in pipings:
+            by_key.setdefault(piping.id, []).append(piping)
+            by_key.setdefault(piping.title, []).append(piping)
+        if unknown := [k for k in params if k not in by_key]:
+            raise ValueError(f"Pipings not found: {unknown}")
+        if ambiguous := {
+            k: [p.id for p in by_key[k]] for k in params if len(by_key[k]) > 1
+        }:
+            raise ValueError(
+                f"Piping titles are shared by several pipings, use their IDs instead: "
+                f"{ambiguous}"
+            )
+        overrides = {by_key[k][0].id: v for k, v in params.items()}
+        nodes = []
+        for piping in pipings:
+            node = {"piping_id": piping.id}
+            if compute_resource_name is not None:
+                node["compute_resource_name"] = compute_resource_name
+            if piping.id in overrides:
+                node["plugin_parameter_defaults"] = [
+                    {"name": name, "default": value}
+                    for name, value in overrides[piping.id].items()
+                ]
+            nodes.append(node)
+        return nodes
@@ -0,0 +1,22 @@
+"""
+A local stand-in for *CUBE*, for offline tests and benchmarks.
+
+See `aiochris.testing.server.FakeCube`. Real *CUBE* traffic can be recorded
+and replayed using `aiochris.testing.cassette`.
+"""
+
+from aiochris.testing.generator import SyntheticData
+from aiochris.testing.server import FakeCube, JobScript
+from aiochris.testing.cassette import Cassette, Recorder, Replayer
+
+__all__ = [
+    "FakeCube",
+    "SyntheticData",
+    "JobScript",
+    "Cassette",
+    "Recorder",
+    "Replayer",
+    "generator",
+    "server",
+    "cassette",
+]
@@ -0,0 +1,51 @@
+"""
+Run a `aiochris.testing.FakeCube` in the foreground.
+
+```shell
+python -m aiochris.testing --port 8000 --pacsfiles 1000000 --latency 0.02
+```
+"""
+
+import argparse
+import asyncio
+
+from aiochris.testing import FakeCube, SyntheticData
+
+parser = argparse.ArgumentParser(description="Run a stand-in CUBE.")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8000)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--pacsfiles", type=int, default=1000)
+parser.add_argument("--feeds", type=int, default=10)
+parser.add_argument("--plugin-instances", type=int, default=100)
+parser.add_argument("--plugins", type=int, default=0)
+parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+parser.add_argument("--bandwidth", type=float, default=None, help="bytes per second")
+parser.add_argument("--error-rate", type=float, default=0.0)
+parser.add_argument("--page-size", type=int, default=10)
+
+
+async def main(options: argparse.Namespace):
+    cube = FakeCube(
+        data=SyntheticData(
+            seed=options.seed,
+            pacsfiles=options.pacsfiles,
+            feeds=options.feeds,
+            plugin_instances=options.plugin_instances,
+            plugins=options.plugins,
+        ),
+        latency=options.latency,
+        bandwidth=options.bandwidth,
+        error_rate=options.error_rate,
+        page_size=options.page_size,
+    )
+    async with cube.serve(options.host, options.port) as url:
+        print(f"CUBE is running at {url}", flush=True)
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
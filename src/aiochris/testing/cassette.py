@@ -0,0 +1,495 @@
+"""
+Record and replay *CUBE* traffic.
+
+A `Recorder` is a local reverse proxy in front of a real *CUBE*. Requests made
+through it are forwarded, and every exchange is saved into a `Cassette`.
+A `Replayer` serves the exchanges of a `Cassette` back, with no network access
+to *CUBE*, either as fast as possible or with the recorded response times.
+
+Both are used by pointing a client at the local URL they serve, so the client
+code being tested or profiled runs unmodified.
+
+Examples
+--------
+
+Record a crawl:
+
+```python
+recorder = Recorder("https://cube.example.org/api/v1/")
+async with recorder.serve() as url:
+    chris = await ChrisClient.from_login(url=url, username=..., password=...)
+    await acollect(chris.search_pacsfiles(PatientID="1234567"))
+recorder.cassette.save("crawl.jsonl.gz")
+```
+
+Replay it:
+
+```python
+async with Replayer(Cassette.load("crawl.jsonl.gz")).serve() as url:
+    chris = await ChrisClient.from_login(url=url, username=..., password=...)
+    await acollect(chris.search_pacsfiles(PatientID="1234567"))
+```
+
+Notes
+-----
+Authentication tokens are replaced by `REDACTED` in recordings, and request
+bodies are only saved as digests (except those of logins, which are not saved
+at all), so cassettes can be committed.
+
+`Replayer.serve` runs the replay server on the caller's event loop, so a profile
+of the client also measures the server. `Replayer.serve_in_thread` runs it on
+an event loop of its own instead.
+"""
+
+import asyncio
+import base64
+import contextlib
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import Any, Optional, Literal, Self
+
+import aiohttp
+import yarl
+from aiohttp import web
+
+ORIGIN_PLACEHOLDER = "http://aiochris-cassette.invalid"
+"""Replaces the origin of the recorded *CUBE* in saved response bodies."""
+
+REDACTED = "REDACTED"
+"""Replaces authentication tokens in saved response bodies."""
+
+_TEXT_TYPES = ("application/json", "application/vnd.collection+json", "text/")
+_RESPONSE_HEADERS = (
+    "Accept-Ranges",
+    "Cache-Control",
+    "Content-Disposition",
+    "Content-Length",
+    "Content-Range",
+    "ETag",
+    "Last-Modified",
+    "Location",
+)
+"""Response headers which are recorded and replayed."""
+_MATCHED_HEADERS = ("If-None-Match", "If-Range", "Range")
+"""Request headers which are recorded and used to match requests to responses."""
+_HOP_BY_HOP = frozenset(
+    (
+        "host",
+        "content-length",
+        "transfer-encoding",
+        "connection",
+        "keep-alive",
+        "accept-encoding",
+    )
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Interaction:
+    """
+    A recorded request and its response.
+    """
+
+    method: str
+    path_qs: str
+    """Path and query string of the request."""
+    request_digest: Optional[str]
+    """SHA-256 of the request body. The body itself is not saved."""
+    status: int
+    content_type: Optional[str]
+    body: bytes
+    """Response body, where the origin of *CUBE* is replaced by `ORIGIN_PLACEHOLDER`."""
+    started: float
+    """Seconds since the start of the recording when the request was received."""
+    elapsed: float
+    """Seconds it took for *CUBE* to respond."""
+    headers: dict[str, str] = dataclasses.field(default_factory=dict)
+    """
+    Response headers which clients use, e.g. `ETag` and `Content-Range`,
+    where the origin of *CUBE* is replaced by `ORIGIN_PLACEHOLDER`.
+    """
+    request_headers: dict[str, str] = dataclasses.field(default_factory=dict)
+    """Request headers which select the response, e.g. `Range`."""
+    elided: int = 0
+    """
+    Length of the response body if it was too big to be saved, in which case
+    `body` is empty and this many zero bytes are replayed instead.
+    """
+
+    @property
+    def replayed_body(self) -> bytes:
+        """The response body which is replayed."""
+        return bytes(self.elided) if self.elided else self.body
+
+    @property
+    def exact_key(self) -> tuple:
+        """What a request must match to be answered by this interaction."""
+        return (
+            self.method,
+            self.path_qs,
+            self.request_digest,
+            tuple(sorted(self.request_headers.items())),
+        )
+
+    def to_dict(self, inline: bool = True) -> dict:
+        """
+        Serialize this interaction. If `inline` is `False`, a binary body is
+        referred to by its SHA-256 as `body_sha256` instead of being included.
+        """
+        d = {
+            f.name: getattr(self, f.name)
+            for f in dataclasses.fields(self)
+            if f.name != "body"
+        }
+        if _is_text(self.content_type):
+            d["text"] = self.body.decode()
+        elif inline or not self.body:
+            d["body_b64"] = base64.b64encode(self.body).decode()
+        else:
+            d["body_sha256"] = hashlib.sha256(self.body).hexdigest()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict, blobs: Optional[Mapping[str, bytes]] = None) -> Self:
+        """
+        Deserialize an interaction. `blobs` are binary bodies by SHA-256,
+        for interactions which were serialized with `inline=False`.
+        """
+        d = dict(d)
+        if "text" in d:
+            d["body"] = d.pop("text").encode()
+        elif "body_sha256" in d:
+            d["body"] = blobs[d.pop("body_sha256")]
+        else:
+            d["body"] = base64.b64decode(d.pop("body_b64"))
+        return cls(**d)
+
+
+@dataclasses.dataclass
+class Cassette:
+    """
+    A sequence of recorded `Interaction`s.
+
+    Cassettes are saved as JSON lines, compressed with gzip if the file name ends with `.gz`.
+    Each distinct binary body is saved once, before the first interaction which has it.
+    """
+
+    interactions: list[Interaction] = dataclasses.field(default_factory=list)
+
+    def save(self, path: str | os.PathLike) -> None:
+        saved: set[str] = set()
+        with _open(path, "wt") as f:
+            for interaction in self.interactions:
+                d = interaction.to_dict(inline=False)
+                if (digest := d.get("body_sha256")) is not None and digest not in saved:
+                    saved.add(digest)
+                    body = base64.b64encode(interaction.body).decode()
+                    _write_line(f, {"blob": digest, "body_b64": body})
+                _write_line(f, d)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> Self:
+        blobs: dict[str, bytes] = {}
+        interactions = []
+        with _open(path, "rt") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                d = json.loads(line)
+                if "blob" in d:
+                    blobs[d["blob"]] = base64.b64decode(d["body_b64"])
+                else:
+                    interactions.append(Interaction.from_dict(d, blobs))
+        return cls(interactions)
+
+
+def _write_line(f, d: dict) -> None:
+    f.write(json.dumps(d, separators=(",", ":")))
+    f.write("\n")
+
+
+def _open(path: str | os.PathLike, mode: str):
+    if os.fspath(path).endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+class Recorder:
+    """
+    A reverse proxy to *CUBE* which records every exchange into `cassette`.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        cassette: Optional[Cassette] = None,
+        max_body_bytes: Optional[int] = None,
+    ):
+        """
+        Parameters
+        ----------
+        upstream
+            *CUBE* API URL, e.g. "https://cube.chrisproject.org/api/v1/"
+        cassette
+            Cassette to append to
+        max_body_bytes
+            Binary response bodies (e.g. file downloads) which are bigger than
+            this are not saved, only their length (see `Interaction.elided`).
+            `None` saves every body.
+        """
+        self.upstream = yarl.URL(upstream)
+        self.cassette = Cassette() if cassette is None else cassette
+        self.max_body_bytes = max_body_bytes
+        self._secrets: set[str] = set()
+        self._blobs: dict[str, bytes] = {}
+        self._upstream_origin = str(self.upstream.origin())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._start = time.monotonic()
+
+    @contextlib.asynccontextmanager
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[str]:
+        """
+        Run the proxy in the background and produce the URL to give to a client.
+        """
+        async with aiohttp.ClientSession(auto_decompress=True) as session:
+            self._session = session
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", self._proxy)
+            async with _run(app, host, port) as origin:
+                self._start = time.monotonic()
+                yield f"{origin}{self.upstream.path}"
+            self._session = None
+
+    async def _proxy(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        headers = {
+            k: v for k, v in request.headers.items() if k.lower() not in _HOP_BY_HOP
+        }
+        url = yarl.URL(self._upstream_origin).join(yarl.URL(request.path_qs))
+        started = time.monotonic()
+        async with self._session.request(
+            request.method,
+            url,
+            headers=headers,
+            data=body or None,
+            allow_redirects=False,
+        ) as res:
+            res_body = await res.read()
+            content_type = res.headers.get("Content-Type")
+            res_headers = _select(res.headers, _RESPONSE_HEADERS)
+        elapsed = time.monotonic() - started
+        live_origin = str(request.url.origin())
+        saved_headers = {
+            k: v.replace(self._upstream_origin, ORIGIN_PLACEHOLDER)
+            for k, v in res_headers.items()
+        }
+        res_headers = {
+            k: v.replace(self._upstream_origin, live_origin)
+            for k, v in res_headers.items()
+        }
+
+        is_login = request.path.endswith("/auth-token/")
+        if (auth := request.headers.get("Authorization", "")).startswith("Token "):
+            self._secrets.add(auth.removeprefix("Token "))
+        if is_login and res.status < 300:
+            with contextlib.suppress(ValueError, KeyError, TypeError):
+                self._secrets.add(json.loads(res_body)["token"])
+
+        saved_body = res_body
+        elided = 0
+        if _is_text(content_type):
+            saved_body = res_body.replace(
+                self._upstream_origin.encode(), ORIGIN_PLACEHOLDER.encode()
+            )
+            for secret in self._secrets:
+                saved_body = saved_body.replace(secret.encode(), REDACTED.encode())
+            res_body = res_body.replace(
+                self._upstream_origin.encode(), live_origin.encode()
+            )
+        elif self.max_body_bytes is not None and len(res_body) > self.max_body_bytes:
+            saved_body, elided = b"", len(res_body)
+        else:  # keep one copy of bodies which are downloaded repeatedly
+            saved_body = self._blobs.setdefault(_digest(res_body) or "", res_body)
+        self.cassette.interactions.append(
+            Interaction(
+                method=request.method,
+                path_qs=request.path_qs,
+                # a digest of a password could be brute-forced
+                request_digest=None if is_login else _digest(body),
+                status=res.status,
+                content_type=content_type,
+                body=saved_body,
+                started=started - self._start,
+                elapsed=elapsed,
+                headers=saved_headers,
+                request_headers=_select(request.headers, _MATCHED_HEADERS),
+                elided=elided,
+            )
+        )
+        return _respond(request, res.status, content_type, res_body, res_headers)
+
+
+class Replayer:
+    """
+    Serves the responses of a `Cassette`.
+
+    Requests are matched by method, path, query string, body, and the headers
+    which select a response, e.g. `Range`. If no interaction has the same body
+    and headers, then the body and headers are ignored.
+    Interactions with the same request are served in their recorded order,
+    and the last one is repeated after the others are exhausted.
+    Unmatched requests are answered with "404 Not Found".
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        timing: Literal["none", "recorded"] = "none",
+        speed: float = 1.0,
+    ):
+        """
+        Parameters
+        ----------
+        cassette
+            recording to replay
+        timing
+            If `"recorded"`, each response is delayed by its recorded response time.
+        speed
+            Divisor of recorded response times
+        """
+        self.cassette = cassette
+        self.timing = timing
+        self.speed = speed
+        self._exact: dict[tuple, deque[Interaction]] = {}
+        self._loose: dict[tuple, deque[Interaction]] = {}
+        for interaction in cassette.interactions:
+            loose_key = (interaction.method, interaction.path_qs)
+            self._exact.setdefault(interaction.exact_key, deque()).append(interaction)
+            self._loose.setdefault(loose_key, deque()).append(interaction)
+        self.misses: list[tuple[str, str]] = []
+        """Requests which did not match any interaction."""
+
+    @contextlib.asynccontextmanager
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[str]:
+        """
+        Run the replay server in the background and produce the URL to give to a client.
+        """
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._replay)
+        async with _run(app, host, port) as origin:
+            yield f"{origin}{self._api_path()}"
+
+    @contextlib.asynccontextmanager
+    async def serve_in_thread(
+        self, host: str = "127.0.0.1", port: int = 0
+    ) -> AsyncIterator[str]:
+        """
+        Like `serve`, but the replay server runs on an event loop in another
+        thread, so that its work is not done by the caller's event loop.
+        """
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        async def call(coro) -> Any:
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(coro, loop)
+            )
+
+        server = self.serve(host, port)
+        try:
+            url = await call(server.__aenter__())
+            try:
+                yield url
+            finally:
+                await call(server.__aexit__(None, None, None))
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            await asyncio.to_thread(thread.join)
+            loop.close()
+
+    def _api_path(self) -> str:
+        for interaction in self.cassette.interactions:
+            if interaction.path_qs.endswith("/api/v1/"):
+                return interaction.path_qs
+        return "/api/v1/"
+
+    async def _replay(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        loose_key = (request.method, request.path_qs)
+        exact_key = (
+            *loose_key,
+            _digest(body),
+            tuple(sorted(_select(request.headers, _MATCHED_HEADERS).items())),
+        )
+        queue = self._exact.get(exact_key) or self._loose.get(loose_key)
+        if not queue:
+            self.misses.append(loose_key)
+            return web.json_response(
+                {"detail": "request not found in cassette"}, status=404
+            )
+        interaction = queue.popleft() if len(queue) > 1 else queue[0]
+        if self.timing == "recorded":
+            await asyncio.sleep(interaction.elapsed / self.speed)
+        origin = str(request.url.origin())
+        res_body = interaction.replayed_body
+        if _is_text(interaction.content_type):
+            res_body = res_body.replace(ORIGIN_PLACEHOLDER.encode(), origin.encode())
+        headers = {
+            k: v.replace(ORIGIN_PLACEHOLDER, origin)
+            for k, v in interaction.headers.items()
+        }
+        return _respond(
+            request, interaction.status, interaction.content_type, res_body, headers
+        )
+
+
+@contextlib.asynccontextmanager
+async def _run(app: web.Application, host: str, port: int) -> AsyncIterator[str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        bound_host, bound_port = runner.addresses[0][:2]
+        yield f"http://{bound_host}:{bound_port}"
+    finally:
+        await runner.cleanup()
+
+
+def _respond(
+    request: web.Request,
+    status: int,
+    content_type: Optional[str],
+    body: bytes,
+    headers: Mapping[str, str],
+) -> web.Response:
+    headers = dict(headers)
+    if content_type is not None:
+        headers["Content-Type"] = content_type
+    if request.method == "HEAD" or status in (204, 304):
+        body = None
+    else:
+        # the body was decompressed, so its length is computed again
+        headers.pop("Content-Length", None)
+    return web.Response(status=status, body=body, headers=headers)
+
+
+def _select(headers: Mapping[str, str], names: Iterable[str]) -> dict[str, str]:
+    return {name: headers[name] for name in names if name in headers}
+
+
+def _digest(body: bytes) -> Optional[str]:
+    if not body:
+        return None
+    return hashlib.sha256(body).hexdigest()
+
+
+def _is_text(content_type: Optional[str]) -> bool:
+    return content_type is not None and content_type.startswith(_TEXT_TYPES)
@@ -0,0 +1,358 @@
+"""
+Deterministic generator of synthetic *CUBE* data.
+
+Items are computed on demand from their ID number, so a `SyntheticData`
+can describe millions of PACS files and plugin instances without storing them.
+The same `seed` always produces the same data.
+"""
+
+import dataclasses
+import datetime
+import functools
+import hashlib
+import random
+import re
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+"""Timestamp of the first synthetic item."""
+
+_PATTERN_SIZE = 4096
+
+PACS_ROOT = "SERVICES/PACS/SYNTHETIC"
+"""Folder of the synthetic PACS files."""
+
+_PACS_LEVELS = (500, 100, 20)
+"""Number of PACS files per patient, study, and series."""
+
+_PACS_GROUPS = {
+    "PatientID": 500,
+    "PatientName": 500,
+    "StudyInstanceUID": 100,
+    "AccessionNumber": 100,
+    "SeriesInstanceUID": 20,
+}
+"""Number of PACS files which share a value of these fields."""
+
+
+@dataclasses.dataclass(frozen=True)
+class SyntheticData:
+    """
+    Describes the synthetic data of a `aiochris.testing.server.FakeCube`.
+
+    Synthetic feeds are owned by the user `owner`. The first `feeds` plugin instances
+    are the roots (of plugin `pl-dircopy`) of each feed, and every other plugin instance
+    is a child (of plugin `pl-simpledsapp`) of its feed's root.
+    """
+
+    seed: int = 0
+    pacsfiles: int = 1000
+    """Number of PACS files."""
+    feeds: int = 10
+    """Number of feeds."""
+    plugin_instances: int = 100
+    """Number of plugin instances. Must be at least `feeds` (or zero)."""
+    outputs_per_instance: int = 2
+    """Number of output files of every plugin instance."""
+    plugins: int = 0
+    """Number of synthetic plugins, in addition to the built-in plugins."""
+    min_fsize: int = 1024
+    """Minimum size of synthetic files, in bytes."""
+    max_fsize: int = 65536
+    """Maximum size of synthetic files, in bytes."""
+    owner: str = "chris"
+    """Username of the owner of synthetic feeds."""
+
+    def __post_init__(self):
+        if self.plugin_instances and self.plugin_instances < self.feeds:
+            raise ValueError("plugin_instances must be at least the number of feeds")
+
+    @property
+    def output_files(self) -> int:
+        """Number of plugin instance output files."""
+        return self.plugin_instances * self.outputs_per_instance
+
+    def _rng(self, kind: str, i: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{i}")
+
+    def _fsize(self, rng: random.Random) -> int:
+        return rng.randint(self.min_fsize, self.max_fsize)
+
+    def pacsfile(self, i: int) -> dict:
+        """
+        Get the PACS file with ID number `i`, where `1 <= i <= pacsfiles`.
+        """
+        rng = self._rng("pacsfile", i)
+        patient, study, series = ((i - 1) // n for n in _PACS_LEVELS)
+        patient_id = f"P{patient:07d}"
+        patient_name = f"Anon^Patient{patient}"
+        study_uid = f"1.2.840.{self.seed}.{study}"
+        series_uid = f"{study_uid}.{series}"
+        study_desc = rng.choice(("BRAIN", "SPINE", "KNEE", "CHEST"))
+        series_desc = rng.choice(("T1", "T2", "FLAIR", "DWI", "SWI"))
+        return {
+            "id": i,
+            "fname": (
+                f"{PACS_ROOT}/{patient_id}-{patient_name}"
+                f"/{study_desc}-{study_uid}/{series_desc}-{series_uid}/{i:09d}.dcm"
+            ),
+            "fsize": self._fsize(rng),
+            "PatientID": patient_id,
+            "PatientName": patient_name,
+            "PatientBirthDate": f"{1950 + patient % 60}-01-01",
+            "PatientAge": 365 * (20 + patient % 60),
+            "PatientSex": "MF"[patient % 2],
+            "StudyDate": (EPOCH + datetime.timedelta(days=study)).date().isoformat(),
+            "AccessionNumber": f"A{study:08d}",
+            "Modality": "MR",
+            "ProtocolName": series_desc,
+            "StudyInstanceUID": study_uid,
+            "StudyDescription": study_desc,
+            "SeriesInstanceUID": series_uid,
+            "SeriesDescription": series_desc,
+            "pacs_identifier": "SYNTHETIC",
+        }
+
+    def pacsfile_ids(self, filters: Mapping[str, str]) -> tuple[range, set[str]]:
+        """
+        Narrow down the ID numbers of the PACS files which can match query parameters,
+        without computing every PACS file.
+
+        Returns
+        -------
+        ids
+            ID numbers of the PACS files which can match
+        exact
+            Query parameters which every PACS file of `ids` matches
+        """
+        ids = range(1, self.pacsfiles + 1)
+        exact = set()
+        for key, value in filters.items():
+            field = key.removesuffix("_exact")
+            if (size := _PACS_GROUPS.get(field)) is not None:
+                ids = _intersect(
+                    ids, self._pacs_group(field, size, value, key != field)
+                )
+                exact.add(key)
+            elif key == "fname":
+                prefix, exact_prefix = self._pacs_prefix(value)
+                ids = _intersect(ids, prefix)
+                if exact_prefix:
+                    exact.add(key)
+        return ids, exact
+
+    def _pacs_group(
+        self, field: str, size: int, value: str, case_sensitive: bool
+    ) -> range:
+        """
+        Get the ID numbers of the PACS files which have `value` for `field`.
+        Synthetic values end with the number of their patient, study, or series.
+        """
+        if (m := re.search(r"\d+$", value)) is None:
+            return range(0)
+        start = int(m.group()) * size + 1
+        if start > self.pacsfiles:
+            return range(0)
+        actual = self.pacsfile(start)[field]
+        if (actual != value) if case_sensitive else (actual.lower() != value.lower()):
+            return range(0)
+        return range(start, min(start + size, self.pacsfiles + 1))
+
+    def _pacs_prefix(self, prefix: str) -> tuple[range, bool]:
+        """
+        Get a range of ID numbers which contains the PACS files whose `fname`
+        starts with `prefix`, and whether every PACS file of the range does.
+        """
+        everything = range(1, self.pacsfiles + 1)
+        if f"{PACS_ROOT}/".startswith(prefix):
+            return everything, True
+        if not prefix.startswith(f"{PACS_ROOT}/"):
+            return range(0), True
+        *folders, rest = prefix.removeprefix(f"{PACS_ROOT}/").split("/")
+        ids = self._pacs_folder_ids(folders[: len(_PACS_LEVELS)])
+        if ids is None:
+            return range(0), True
+        return ids, not rest and len(folders) <= len(_PACS_LEVELS)
+
+    @functools.lru_cache(maxsize=1024)
+    def pacs_folder(self, path: str) -> Optional[tuple[tuple[str, ...], range]]:
+        """
+        Get the names of the subfolders and the ID numbers of the files directly in
+        a folder of the synthetic PACS files, or `None` if there is no such folder.
+        """
+        if not self.pacsfiles:
+            return None
+        root = PACS_ROOT.split("/")
+        parts = path.split("/") if path else []
+        if len(parts) < len(root):
+            if parts != root[: len(parts)]:
+                return None
+            return (root[len(parts)],), range(0)
+        if parts[: len(root)] != root:
+            return None
+        depth = len(parts) - len(root)
+        if depth > len(_PACS_LEVELS):
+            return None
+        if (ids := self._pacs_folder_ids(parts[len(root) :])) is None:
+            return None
+        if depth == len(_PACS_LEVELS):
+            return (), ids
+        names = tuple(
+            self.pacsfile(i)["fname"].split("/")[len(parts)]
+            for i in ids[:: _PACS_LEVELS[depth]]
+        )
+        return names, range(0)
+
+    def _pacs_folder_ids(self, names: list[str]) -> Optional[range]:
+        """
+        Get the ID numbers of the PACS files under a patient, study, or series folder.
+        Folder names end with the number of their patient, study, or series.
+        """
+        ids = range(1, self.pacsfiles + 1)
+        depth = len(PACS_ROOT.split("/"))
+        for size, name in zip(_PACS_LEVELS, names):
+            if (m := re.search(r"\d+$", name)) is None:
+                return None
+            start = int(m.group()) * size + 1
+            if (
+                start not in ids
+                or self.pacsfile(start)["fname"].split("/")[depth] != name
+            ):
+                return None
+            ids = range(start, min(start + size, ids.stop))
+            depth += 1
+        return ids
+
+    def feed(self, i: int) -> dict:
+        """
+        Get the feed with ID number `i`, where `1 <= i <= feeds`.
+        """
+        return {
+            "id": i,
+            "creation_date": self.date(i),
+            "modification_date": self.date(i),
+            "name": f"Synthetic feed {i}",
+            "creator_username": self.owner,
+        }
+
+    def feed_of(self, plugin_instance_id: int) -> int:
+        """
+        Get the ID number of the feed of a synthetic plugin instance.
+        """
+        return (plugin_instance_id - 1) % self.feeds + 1
+
+    def plugin_instances_of(self, feed_id: int) -> range:
+        """
+        Get the ID numbers of the plugin instances of a synthetic feed.
+        """
+        return range(feed_id, self.plugin_instances + 1, self.feeds)
+
+    def plugin_instance(self, i: int) -> dict:
+        """
+        Get the plugin instance with ID number `i`, where `1 <= i <= plugin_instances`.
+
+        The returned `dict` has the keys `plugin_name` and `plugin_version`
+        but not `plugin_id`.
+        """
+        rng = self._rng("plugin_instance", i)
+        feed_id = self.feed_of(i)
+        is_root = i <= self.feeds
+        root_path = f"{self.owner}/feed_{feed_id}/pl-dircopy_{feed_id}"
+        duration = datetime.timedelta(seconds=rng.randint(5, 3600))
+        return {
+            "id": i,
+            "title": "",
+            "plugin_name": "pl-dircopy" if is_root else "pl-simpledsapp",
+            "plugin_version": "2.1.1" if is_root else "2.1.0",
+            "previous_id": None if is_root else feed_id,
+            "feed_id": feed_id,
+            "start_date": self.date(i),
+            "end_date": isoformat(EPOCH + datetime.timedelta(minutes=i) + duration),
+            "output_path": (
+                f"{root_path}/data"
+                if is_root
+                else f"{root_path}/pl-simpledsapp_{i}/data"
+            ),
+            "status": "finishedSuccessfully",
+            "owner_username": self.owner,
+            "cpu_limit": 1000,
+            "memory_limit": 200,
+            "number_of_workers": 1,
+            "gpu_limit": 0,
+            "size": 0,
+        }
+
+    def output_file(self, i: int) -> dict:
+        """
+        Get the output file with ID number `i`, where `1 <= i <= output_files`.
+        """
+        plinst_id, k = divmod(i - 1, self.outputs_per_instance)
+        plinst_id += 1
+        output_path = self.plugin_instance(plinst_id)["output_path"]
+        return {
+            "id": i,
+            "fname": f"{output_path}/out{k}.dat",
+            "fsize": self._fsize(self._rng("output_file", i)),
+            "plugin_inst_id": plinst_id,
+            "feed_id": self.feed_of(plinst_id),
+        }
+
+    def output_files_of(self, plugin_instance_id: int) -> range:
+        """
+        Get the ID numbers of the output files of a synthetic plugin instance.
+        """
+        start = (plugin_instance_id - 1) * self.outputs_per_instance + 1
+        return range(start, start + self.outputs_per_instance)
+
+    def date(self, i: int) -> str:
+        """
+        Get a timestamp which increases with `i`.
+        """
+        return isoformat(EPOCH + datetime.timedelta(minutes=i))
+
+    def content(self, key: str, size: int, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Produce the deterministic contents of a synthetic file in chunks.
+
+        Parameters
+        ----------
+        key
+            A unique name for the file, e.g. its URL path
+        size
+            Size of the file in bytes
+        chunk_size
+            Maximum size of each chunk
+        """
+        return content_range(self._pattern(key), 0, size, chunk_size)
+
+    @functools.lru_cache(maxsize=1024)
+    def _pattern(self, key: str) -> bytes:
+        block = hashlib.blake2b(f"{self.seed}:{key}".encode()).digest()
+        return block * (_PATTERN_SIZE // len(block))
+
+
+def _intersect(a: range, b: range) -> range:
+    return range(max(a.start, b.start), min(a.stop, b.stop))
+
+
+def isoformat(t: datetime.datetime) -> str:
+    """
+    Format a timestamp the way *CUBE* does.
+    """
+    return t.isoformat().replace("+00:00", "Z")
+
+
+def content_range(
+    pattern: bytes, start: int, end: int, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    Produce the bytes `[start, end)` of an infinite repetition of `pattern` in chunks.
+    """
+    n = len(pattern)
+    while start < end:
+        offset = start % n
+        length = min(chunk_size, end - start)
+        repeats = (offset + length) // n + 1
+        yield (pattern * repeats)[offset : offset + length]
+        start += length
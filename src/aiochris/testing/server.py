@@ -0,0 +1,1792 @@
+"""
+A stand-in for *CUBE* implemented with [`aiohttp.web`](https://docs.aiohttp.org/en/stable/web.html).
+
+`FakeCube` implements the subset of the *CUBE* API used by *aiochris*. Its data is
+a mix of synthetic items produced by a `aiochris.testing.generator.SyntheticData`
+and items created through the API. Latency, bandwidth, and errors can be injected
+to make it a realistic target for benchmarks.
+
+Examples
+--------
+
+```python
+from aiochris import ChrisClient
+from aiochris.testing import FakeCube, SyntheticData
+
+cube = FakeCube(data=SyntheticData(pacsfiles=1_000_000), latency=0.01)
+async with cube.serve() as url:
+    chris = await ChrisClient.from_login(url=url, username="chris", password="chris1234")
+    print(await chris.search_pacsfiles().count())
+```
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import datetime
+import heapq
+import itertools
+import json
+import random
+import secrets
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from typing import Optional, Any
+
+from aiohttp import web
+
+from aiochris.testing.generator import SyntheticData, content_range, isoformat
+from aiochris.types import ChrisURL
+from aiochris.util.parameters import coerce
+
+JobScript = Sequence[tuple[str, float]]
+"""
+A sequence of (status, duration in seconds) which a new plugin instance goes through.
+The status of the last stage is final.
+"""
+
+DEFAULT_JOB_SCRIPT: JobScript = (
+    ("scheduled", 0.05),
+    ("started", 0.2),
+    ("registeringFiles", 0.1),
+    ("finishedSuccessfully", 0.0),
+)
+
+_STATUS_COUNTERS = {
+    "created": "created_jobs",
+    "waiting": "waiting_jobs",
+    "scheduled": "scheduled_jobs",
+    "started": "started_jobs",
+    "registeringFiles": "registering_jobs",
+    "finishedSuccessfully": "finished_jobs",
+    "finishedWithError": "errored_jobs",
+    "cancelled": "cancelled_jobs",
+}
+
+_PARAMETER_TYPES = {"str": "string", "int": "integer", "bool": "boolean"}
+
+_BUILTIN_PLUGINS = (
+    {
+        "name": "pl-dircopy",
+        "version": "2.1.1",
+        "type": "fs",
+        "parameters": [
+            {"name": "dir", "type": "unextpath", "optional": False, "flag": "--dir"},
+        ],
+    },
+    {
+        "name": "pl-simpledsapp",
+        "version": "2.1.0",
+        "type": "ds",
+        "parameters": [
+            {"name": "prefix", "type": "string", "default": "", "flag": "--prefix"},
+            {"name": "sleepLength", "type": "integer", "default": 0},
+            {"name": "dummyFloat", "type": "float", "default": 3.5},
+            {
+                "name": "ignoreInputDir",
+                "type": "boolean",
+                "default": False,
+                "action": "store_true",
+            },
+        ],
+    },
+    {
+        "name": "pl-topologicalcopy",
+        "version": "1.0.2",
+        "type": "ts",
+        "parameters": [
+            {"name": "plugininstances", "type": "string", "optional": False},
+            {"name": "filter", "type": "string", "default": ".*"},
+        ],
+    },
+)
+
+
+def _everything(_view: dict) -> bool:
+    return True
+
+
+class _Table:
+    """
+    A table of rows where the first `synthetic` rows are computed by `make`
+    and any further rows are stored.
+
+    `index` narrows down the synthetic rows which can match query parameters,
+    see `aiochris.testing.generator.SyntheticData.pacsfile_ids`.
+    """
+
+    def __init__(
+        self,
+        synthetic: int = 0,
+        make: Callable[[int], dict] = None,
+        index: Optional[Callable[[dict[str, str]], tuple[range, set[str]]]] = None,
+    ):
+        self.synthetic = synthetic
+        self.make = make
+        self.index = index
+        self.rows: dict[int, dict] = {}
+        self.deleted: set[int] = set()
+        self.next_id = synthetic + 1
+
+    def __len__(self) -> int:
+        return self.next_id - 1 - len(self.deleted)
+
+    def get(self, i: int) -> Optional[dict]:
+        if i in self.deleted:
+            return None
+        if (row := self.rows.get(i)) is not None:
+            return row
+        if 1 <= i <= self.synthetic:
+            return self.make(i)
+        return None
+
+    def add(self, **row) -> dict:
+        row["id"] = self.next_id
+        self.rows[self.next_id] = row
+        self.next_id += 1
+        return row
+
+    def update(self, i: int, **changes) -> dict:
+        row = dict(self.get(i))
+        row.update(changes)
+        self.rows[i] = row
+        return row
+
+    def delete(self, i: int) -> None:
+        self.deleted.add(i)
+        self.rows.pop(i, None)
+
+    def ids(self, start: int = 0, within: Optional[range] = None) -> Iterator[int]:
+        """
+        Iterate over ID numbers (of `within`, by default all of them),
+        skipping the first `start` of them.
+        """
+        ids = range(1, self.next_id) if within is None else within
+        if not self.deleted:
+            return iter(ids[start:])
+        return itertools.islice((i for i in ids if i not in self.deleted), start, None)
+
+    def count(self, within: range) -> int:
+        """
+        Count the rows with ID numbers in `within`.
+        """
+        return len(within) - sum(i in within for i in self.deleted)
+
+    def select(self, filters: dict[str, str]) -> tuple[Iterable[int], dict[str, str]]:
+        """
+        Narrow down the ID numbers of the rows which can match query parameters.
+
+        Returns the ID numbers, as a `range` if possible, and the query parameters
+        which the rows still have to be checked against.
+        """
+        filters = dict(filters)
+        lo = max(int(filters.pop("min_id", 1)), 1)
+        hi = min(int(filters.pop("max_id", self.next_id - 1)), self.next_id - 1)
+        ids = range(lo, hi + 1)
+        if self.index is None:
+            return ids, filters
+        synthetic, exact = self.index(filters)
+        narrowed = range(max(lo, synthetic.start), min(hi + 1, synthetic.stop))
+        stored = sorted(i for i in self.rows if i in ids and i not in narrowed)
+        if not stored:
+            return narrowed, {k: v for k, v in filters.items() if k not in exact}
+        # stored rows are checked against every query parameter
+        return heapq.merge(narrowed, stored), filters
+
+
+@dataclasses.dataclass
+class _Folder:
+    """A directory of the filebrowser."""
+
+    subfolders: dict[str, None] = dataclasses.field(default_factory=dict)
+    """Names of subfolders, in order of appearance."""
+    files: list[tuple["_Resource", int]] = dataclasses.field(default_factory=list)
+    """Files directly in this folder, by resource and ID number."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _Resource:
+    """A kind of *CUBE* resource."""
+
+    table: _Table
+    view: Callable[[dict], dict]
+    """Add dynamic fields to a row."""
+    render: Callable[[dict, str], dict]
+    """Serialize a view given the base API URL."""
+
+
+@dataclasses.dataclass
+class FakeCube:
+    """
+    An in-process stand-in for *CUBE*.
+
+    Plugin instances created through the API go through the statuses of their
+    `JobScript` as time passes. Their `outputs_per_job` output files are registered
+    during the `registeringFiles` stage.
+    """
+
+    data: SyntheticData = SyntheticData()
+    """Synthetic data to serve."""
+    latency: float = 0.0
+    """Seconds to wait before handling each request."""
+    bandwidth: Optional[float] = None
+    """Maximum rate of response bodies, in bytes per second, per connection."""
+    error_rate: float = 0.0
+    """Probability of responding to a request with `error_status`."""
+    error_status: int = 500
+    """HTTP status code of injected errors."""
+    page_size: int = 10
+    """Default number of items per page of collections."""
+    job_script: JobScript = DEFAULT_JOB_SCRIPT
+    """Statuses which new plugin instances go through."""
+    plugin_job_scripts: dict[str, JobScript] = dataclasses.field(default_factory=dict)
+    """Statuses which new plugin instances go through, by plugin name."""
+    outputs_per_job: int = 2
+    """Number of output files produced by new plugin instances."""
+    output_fsize: int = 4096
+    """Size of output files produced by new plugin instances."""
+    admin_username: str = "chris"
+    admin_password: str = "chris1234"
+    require_content_length: bool = True
+    """Respond to file uploads without a `Content-Length` with "411 Length Required"."""
+    accept_ranges: bool = True
+    """Respond to `Range` requests for files with "206 Partial Content"."""
+    clock: Callable[[], float] = time.monotonic
+    """Source of time for plugin instance status transitions."""
+
+    def __post_init__(self):
+        data = self.data
+        self._rng = random.Random(data.seed)
+        self.request_count = 0
+        """Number of requests received."""
+        self._tokens: dict[str, str] = {}
+        self._passwords: dict[str, str] = {}
+        self._user_ids: dict[str, int] = {}
+        self._plugin_ids: dict[tuple[str, str], int] = {}
+        self._plugin_params: dict[int, list[int]] = {}
+        self._feed_instances: dict[int, list[int]] = {}
+        self._instance_files: dict[int, list[int]] = {}
+        self._instance_params: dict[int, list[int]] = {}
+        self._folders: dict[str, _Folder] = {}
+        self._folders_version: Optional[tuple] = None
+
+        self.users = _Resource(_Table(), lambda r: r, self._render_user)
+        self.compute_resources = _Resource(_Table(), lambda r: r, self._render_cr)
+        self.plugins = _Resource(
+            _Table(data.plugins, self._synthetic_plugin),
+            lambda r: r,
+            self._render_plugin,
+        )
+        self.plugin_parameters = _Resource(
+            _Table(2 * data.plugins, self._synthetic_plugin_parameter),
+            lambda r: r,
+            self._render_plugin_parameter,
+        )
+        self.feeds = _Resource(
+            _Table(data.feeds, data.feed), self._view_feed, self._render_feed
+        )
+        self.notes = _Resource(
+            _Table(data.feeds, self._synthetic_note), lambda r: r, self._render_note
+        )
+        self.plugin_instances = _Resource(
+            _Table(data.plugin_instances, self._synthetic_plugin_instance),
+            self._view_plugin_instance,
+            self._render_plugin_instance,
+        )
+        self.plugin_instance_parameters = _Resource(
+            _Table(), lambda r: r, self._render_plugin_instance_parameter
+        )
+        self.pacsfiles = _Resource(
+            _Table(data.pacsfiles, data.pacsfile, data.pacsfile_ids),
+            lambda r: r,
+            self._file_renderer("pacsfiles"),
+        )
+        self.files = _Resource(
+            _Table(data.output_files, data.output_file),
+            lambda r: r,
+            self._file_renderer("files"),
+        )
+        self.uploadedfiles = _Resource(
+            _Table(), lambda r: r, self._file_renderer("uploadedfiles")
+        )
+        self.pipelines = _Resource(_Table(), lambda r: r, self._render_pipeline)
+        self.pipings = _Resource(_Table(), lambda r: r, self._render_piping)
+        self.pipeline_parameters = _Resource(
+            _Table(), lambda r: r, self._render_pipeline_parameter
+        )
+        self.workflows = _Resource(_Table(), self._view_workflow, self._render_workflow)
+        self._pipeline_pipings: dict[int, list[int]] = {}
+        self._piping_params: dict[int, list[int]] = {}
+        self._workflow_instances: dict[int, list[int]] = {}
+
+        self._add_user(self.admin_username, self.admin_password, "admin@example.com")
+        if data.owner not in self._user_ids:
+            self._add_user(data.owner, secrets.token_hex(), f"{data.owner}@example.com")
+        self._add_compute_resource(name="host", description="Default compute resource")
+        for plugin in _BUILTIN_PLUGINS:
+            self._add_plugin(plugin, [1])
+
+    # ============================================================
+    # Serving
+    # ============================================================
+
+    def app(self) -> web.Application:
+        """
+        Create the `aiohttp.web.Application` of this *CUBE*.
+        """
+        app = web.Application(middlewares=[self._network_middleware])
+        app.add_routes(self._routes())
+        return app
+
+    @contextlib.asynccontextmanager
+    async def serve(
+        self, host: str = "127.0.0.1", port: int = 0
+    ) -> AsyncIterator[ChrisURL]:
+        """
+        Run this *CUBE* in the background and produce its API URL.
+
+        Parameters
+        ----------
+        host
+            Address to listen on
+        port
+            Port to listen on. The default value `0` picks an available port.
+        """
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        try:
+            site = web.TCPSite(runner, host, port)
+            await site.start()
+            bound_host, bound_port = runner.addresses[0][:2]
+            yield ChrisURL(f"http://{bound_host}:{bound_port}/api/v1/")
+        finally:
+            await runner.cleanup()
+
+    @web.middleware
+    async def _network_middleware(self, request: web.Request, handler):
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return web.json_response(
+                {"detail": "injected error"}, status=self.error_status
+            )
+        res = await handler(request)
+        if self.bandwidth and isinstance(res, web.Response) and res.body:
+            await asyncio.sleep(len(res.body) / self.bandwidth)
+        return res
+
+    def _routes(self) -> list[web.RouteDef]:
+        api = "/api/v1"
+        return [
+            web.get(f"{api}/", self._get_root),
+            web.get(f"{api}/search/", self._search_feeds),
+            web.post(f"{api}/auth-token/", self._post_auth_token),
+            web.post(f"{api}/users/", self._post_user),
+            web.get(f"{api}/users/{{id:\\d+}}/", self._get_user),
+            web.get(f"{api}/{{id:\\d+}}/", self._get_feed),
+            web.put(f"{api}/{{id:\\d+}}/", self._put_feed),
+            web.delete(f"{api}/{{id:\\d+}}/", self._delete_feed),
+            web.get(f"{api}/{{id:\\d+}}/files/", self._get_feed_files),
+            web.get(f"{api}/{{id:\\d+}}/plugininstances/", self._get_feed_instances),
+            web.get(f"{api}/note{{id:\\d+}}/", self._get_note),
+            web.put(f"{api}/note{{id:\\d+}}/", self._put_note),
+            *self._collection_routes(f"{api}/computeresources", self.compute_resources),
+            *self._collection_routes(f"{api}/plugins", self.plugins),
+            web.get(f"{api}/plugins/{{id:\\d+}}/parameters/", self._get_plugin_params),
+            web.get(
+                f"{api}/plugins/{{id:\\d+}}/computeresources/",
+                self._get_plugin_compute_resources,
+            ),
+            web.post(f"{api}/plugins/{{id:\\d+}}/instances/", self._post_instance),
+            web.get(
+                f"{api}/plugins/parameters/{{id:\\d+}}/",
+                self._detail_handler(self.plugin_parameters),
+            ),
+            *self._collection_routes(
+                f"{api}/plugins/instances",
+                self.plugin_instances,
+                self._search_instances,
+            ),
+            web.put(f"{api}/plugins/instances/{{id:\\d+}}/", self._put_instance),
+            web.delete(f"{api}/plugins/instances/{{id:\\d+}}/", self._delete_instance),
+            web.get(
+                f"{api}/plugins/instances/{{id:\\d+}}/parameters/",
+                self._get_instance_params,
+            ),
+            web.get(
+                f"{api}/plugins/instances/{{id:\\d+}}/files/", self._get_instance_files
+            ),
+            web.get(
+                f"{api}/plugins/instances/parameters/{{id:\\d+}}/",
+                self._detail_handler(self.plugin_instance_parameters),
+            ),
+            *self._collection_routes(f"{api}/pacsfiles", self.pacsfiles),
+            *self._file_routes(f"{api}/pacsfiles", self.pacsfiles),
+            *self._file_routes(f"{api}/files", self.files),
+            *self._collection_routes(f"{api}/uploadedfiles", self.uploadedfiles),
+            *self._file_routes(f"{api}/uploadedfiles", self.uploadedfiles),
+            web.post(f"{api}/uploadedfiles/", self._post_uploadedfile),
+            web.get(f"{api}/filebrowser/", self._search_filebrowser),
+            web.get(f"{api}/filebrowser/search/", self._search_filebrowser),
+            web.get(f"{api}/filebrowser/files/", self._get_folder_files),
+            web.get(f"{api}/filebrowser/{{path:.+}}/files/", self._get_folder_files),
+            web.get(f"{api}/filebrowser/{{path:.+}}/", self._get_folder),
+            *self._collection_routes(f"{api}/pipelines", self.pipelines),
+            web.get(
+                f"{api}/pipelines/{{id:\\d+}}/pipings/", self._get_pipeline_pipings
+            ),
+            web.get(
+                f"{api}/pipelines/{{id:\\d+}}/parameters/", self._get_pipeline_params
+            ),
+            web.get(
+                f"{api}/pipelines/{{id:\\d+}}/workflows/",
+                self._get_pipeline_workflows,
+            ),
+            web.post(f"{api}/pipelines/{{id:\\d+}}/workflows/", self._post_workflow),
+            web.get(
+                f"{api}/pipelines/pipings/{{id:\\d+}}/",
+                self._detail_handler(self.pipings),
+            ),
+            *self._collection_routes(f"{api}/pipelines/workflows", self.workflows),
+            web.get(
+                f"{api}/pipelines/workflows/{{id:\\d+}}/plugininstances/",
+                self._get_workflow_instances,
+            ),
+            web.get("/chris-admin/api/v1/", self._get_admin),
+            web.post("/chris-admin/api/v1/", self._post_admin_plugin),
+            web.post(
+                "/chris-admin/api/v1/computeresources/",
+                self._post_admin_compute_resource,
+            ),
+        ]
+
+    def _collection_routes(
+        self, path: str, resource: _Resource, list_handler=None
+    ) -> list[web.RouteDef]:
+        list_handler = list_handler or self._list_handler(resource)
+        return [
+            web.get(f"{path}/", list_handler),
+            web.get(f"{path}/search/", list_handler),
+            web.get(f"{path}/{{id:\\d+}}/", self._detail_handler(resource)),
+        ]
+
+    def _file_routes(self, path: str, resource: _Resource) -> list[web.RouteDef]:
+        routes = [web.get(f"{path}/{{id:\\d+}}/{{name}}", self._file_handler(resource))]
+        if path.endswith("/files"):
+            routes.append(
+                web.get(f"{path}/{{id:\\d+}}/", self._detail_handler(resource))
+            )
+        return routes
+
+    # ============================================================
+    # Generic handlers
+    # ============================================================
+
+    def _list_handler(self, resource: _Resource):
+        async def handler(request: web.Request) -> web.Response:
+            return self._page(request, resource)
+
+        return handler
+
+    def _detail_handler(self, resource: _Resource):
+        async def handler(request: web.Request) -> web.Response:
+            row = self._get_or_404(resource, request)
+            return web.json_response(resource.render(resource.view(row), _api(request)))
+
+        return handler
+
+    def _file_handler(self, resource: _Resource):
+        async def handler(request: web.Request) -> web.StreamResponse:
+            row = self._get_or_404(resource, request)
+            self._check_auth(request)
+            return await self._send_file(request, row)
+
+        return handler
+
+    def _page(
+        self,
+        request: web.Request,
+        resource: _Resource,
+        candidates: Optional[Iterable[int]] = None,
+        visible: Callable[[dict], bool] = _everything,
+    ) -> web.Response:
+        """
+        Respond with a page of a collection.
+
+        Parameters
+        ----------
+        candidates
+            ID numbers of the rows of the collection. Defaults to all the rows of the table.
+        visible
+            A filter which is applied to every view before the query parameters.
+        """
+        query = request.query
+        limit = int(query.get("limit", self.page_size))
+        offset = int(query.get("offset", 0))
+        filters = {k: v for k, v in query.items() if k not in ("limit", "offset")}
+        table = resource.table
+        if "id" in filters:
+            candidates = [int(filters.pop("id"))]
+        elif candidates is None:
+            candidates, filters = table.select(filters)
+
+        if isinstance(candidates, range) and not filters and visible is _everything:
+            count = table.count(candidates)
+            page_ids = itertools.islice(table.ids(offset, candidates), limit)
+            views = [resource.view(table.get(i)) for i in page_ids]
+        else:
+            rows = filter(None, map(table.get, candidates))
+            matches = (
+                v
+                for v in map(resource.view, rows)
+                if visible(v) and _matches(v, filters)
+            )
+            count = 0
+            views = []
+            for view in matches:
+                if offset <= count < offset + limit:
+                    views.append(view)
+                count += 1
+
+        api = _api(request)
+        return web.json_response(
+            {
+                "count": count,
+                "next": (
+                    _page_url(request, limit, offset + limit)
+                    if offset + limit < count
+                    else None
+                ),
+                "previous": (
+                    _page_url(request, limit, max(offset - limit, 0))
+                    if offset > 0
+                    else None
+                ),
+                "results": [resource.render(v, api) for v in views],
+            }
+        )
+
+    def _get_or_404(self, resource: _Resource, request: web.Request) -> dict:
+        row = resource.table.get(int(request.match_info["id"]))
+        if row is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"detail": "Not found."}),
+                content_type="application/json",
+            )
+        return row
+
+    def _check_auth(self, request: web.Request) -> str:
+        """
+        Get the username of the request's user.
+        """
+        header = request.headers.get("Authorization", "")
+        if (username := self._tokens.get(header.removeprefix("Token "))) is None:
+            raise web.HTTPUnauthorized(
+                text=json.dumps(
+                    {"detail": "Authentication credentials were not provided."}
+                ),
+                content_type="application/json",
+            )
+        return username
+
+    def _username(self, request: web.Request) -> Optional[str]:
+        header = request.headers.get("Authorization", "")
+        return self._tokens.get(header.removeprefix("Token "))
+
+    async def _send_file(self, request: web.Request, row: dict) -> web.StreamResponse:
+        fsize = row["fsize"]
+        start, end = 0, fsize
+        etag = f'"{request.path.rsplit("/", 1)[0]}:{fsize}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        res = web.StreamResponse(
+            headers={"Content-Type": "application/octet-stream", "ETag": etag},
+        )
+        if self.accept_ranges:
+            res.headers["Accept-Ranges"] = "bytes"
+            if (byte_range := _parse_range(request, fsize)) is not None:
+                start, end = byte_range
+                if start >= end:
+                    return web.Response(
+                        status=416, headers={"Content-Range": f"bytes */{fsize}"}
+                    )
+                res.set_status(206)
+                res.headers["Content-Range"] = f"bytes {start}-{end - 1}/{fsize}"
+        res.content_length = end - start
+        await res.prepare(request)
+        for chunk in self._file_content(request.path, row, start, end):
+            await res.write(chunk)
+            if self.bandwidth:
+                await asyncio.sleep(len(chunk) / self.bandwidth)
+        await res.write_eof()
+        return res
+
+    def _file_content(
+        self, path: str, row: dict, start: int = 0, end: int = None
+    ) -> Iterator[bytes]:
+        end = row["fsize"] if end is None else end
+        if (content := row.get("content")) is not None:
+            return (content[i : min(i + 65536, end)] for i in range(start, end, 65536))
+        key = path.rsplit("/", 1)[0]
+        return content_range(self.data._pattern(key), start, end, 65536)
+
+    # ============================================================
+    # Users
+    # ============================================================
+
+    def _add_user(self, username: str, password: str, email: str) -> dict:
+        user = self.users.table.add(username=username, email=email)
+        self._user_ids[username] = user["id"]
+        self._passwords[username] = password
+        return user
+
+    def _render_user(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}users/{row['id']}/",
+            "id": row["id"],
+            "username": row["username"],
+            "email": row["email"],
+        }
+
+    def _user_url(self, api: str, username: str) -> str:
+        return f"{api}users/{self._user_ids[username]}/"
+
+    async def _post_auth_token(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        username = body.get("username")
+        if username is None or self._passwords.get(username) != body.get("password"):
+            return web.json_response(
+                {"non_field_errors": ["Unable to log in with provided credentials."]},
+                status=400,
+            )
+        token = secrets.token_hex(20)
+        self._tokens[token] = username
+        return web.json_response({"token": token})
+
+    async def _post_user(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        fields = {d["name"]: d["value"] for d in body["template"]["data"]}
+        if fields["username"] in self._user_ids:
+            return web.json_response(
+                {"username": ["A user with that username already exists."]}, status=400
+            )
+        user = self._add_user(fields["username"], fields["password"], fields["email"])
+        return web.json_response(self._render_user(user, _api(request)), status=201)
+
+    async def _get_user(self, request: web.Request) -> web.Response:
+        username = self._check_auth(request)
+        row = self._get_or_404(self.users, request)
+        if row["username"] != username:
+            raise web.HTTPForbidden()
+        return web.json_response(self._render_user(row, _api(request)))
+
+    # ============================================================
+    # Root and feeds
+    # ============================================================
+
+    def collection_links(self, api: str, username: Optional[str]) -> dict[str, Any]:
+        """
+        Get the collection links for a user.
+        """
+        links = {
+            "chrisinstance": f"{api}chrisinstance/1/",
+            "compute_resources": f"{api}computeresources/",
+            "plugin_metas": f"{api}plugins/metas/",
+            "plugins": f"{api}plugins/",
+            "plugin_instances": f"{api}plugins/instances/",
+            "pipelines": f"{api}pipelines/",
+            "workflows": f"{api}pipelines/workflows/",
+            "tags": f"{api}tags/",
+            "pacsfiles": f"{api}pacsfiles/",
+            "filebrowser": f"{api}filebrowser/",
+            "pacsseries": None,
+            "servicefiles": f"{api}servicefiles/",
+            "pipeline_instances": f"{api}pipelines/instances/",
+        }
+        if username is None:
+            return links
+        links["user"] = self._user_url(api, username)
+        links["uploadedfiles"] = f"{api}uploadedfiles/"
+        links["userfiles"] = None
+        if username == self.admin_username:
+            links["admin"] = api.replace("/api/v1/", "/chris-admin/api/v1/")
+        return links
+
+    async def _get_root(self, request: web.Request) -> web.Response:
+        res = await self._search_feeds(request)
+        body = json.loads(res.body)
+        body["collection_links"] = self.collection_links(
+            _api(request), self._username(request)
+        )
+        return web.json_response(body)
+
+    async def _search_feeds(self, request: web.Request) -> web.Response:
+        username = self._username(request)
+        return self._page(
+            request,
+            self.feeds,
+            visible=lambda v: username in v.get("owner", [v["creator_username"]]),
+        )
+
+    def _view_feed(self, row: dict) -> dict:
+        feed_id = row["id"]
+        table = self.plugin_instances.table
+        counts = self._job_counts(self._feed_instances.get(feed_id, []))
+        if feed_id <= self.data.feeds:
+            # synthetic plugin instances are finished, so they are counted
+            # without being generated
+            synthetic = self.data.plugin_instances_of(feed_id)
+            deleted = sum(1 for i in table.deleted if i in synthetic)
+            counts["finished_jobs"] += len(synthetic) - deleted
+        return {**row, **counts}
+
+    def _job_counts(self, plinst_ids: Iterable[int]) -> dict[str, int]:
+        """Count plugin instances by status."""
+        counts = dict.fromkeys(_STATUS_COUNTERS.values(), 0)
+        created = filter(None, map(self.plugin_instances.table.get, plinst_ids))
+        for plinst in map(self._view_plugin_instance, created):
+            counts[_STATUS_COUNTERS[plinst["status"]]] += 1
+        return counts
+
+    def _feed_instance_ids(self, feed_id: int) -> Iterable[int]:
+        created = self._feed_instances.get(feed_id, [])
+        if feed_id <= self.data.feeds:
+            return itertools.chain(self.data.plugin_instances_of(feed_id), created)
+        return created
+
+    def _render_feed(self, view: dict, api: str) -> dict:
+        i = view["id"]
+        owner = view.get("owner", [view["creator_username"]])
+        return {
+            "url": f"{api}{i}/",
+            **{k: v for k, v in view.items() if k != "owner"},
+            "owner": [self._user_url(api, u) for u in owner],
+            "note": f"{api}note{i}/",
+            "tags": f"{api}{i}/tags/",
+            "taggings": f"{api}{i}/taggings/",
+            "comments": f"{api}{i}/comments/",
+            "files": f"{api}{i}/files/",
+            "plugin_instances": f"{api}{i}/plugininstances/",
+        }
+
+    async def _get_feed(self, request: web.Request) -> web.Response:
+        row = self._get_or_404(self.feeds, request)
+        return web.json_response(self._render_feed(self._view_feed(row), _api(request)))
+
+    async def _put_feed(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        row = self._get_or_404(self.feeds, request)
+        body = await request.json()
+        changes = {}
+        if "name" in body:
+            changes["name"] = body["name"]
+        if "owner" in body:
+            changes["owner"] = [row["creator_username"], body["owner"]]
+        row = self.feeds.table.update(row["id"], **changes)
+        return web.json_response(self._render_feed(self._view_feed(row), _api(request)))
+
+    async def _delete_feed(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        row = self._get_or_404(self.feeds, request)
+        for plinst_id in list(self._feed_instance_ids(row["id"])):
+            self.plugin_instances.table.delete(plinst_id)
+        self.feeds.table.delete(row["id"])
+        return web.Response(status=204)
+
+    async def _get_feed_files(self, request: web.Request) -> web.Response:
+        feed_id = int(request.match_info["id"])
+        file_ids = (
+            file_id
+            for plinst_id in self._feed_instance_ids(feed_id)
+            for file_id in self._instance_file_ids(plinst_id)
+        )
+        return self._page(request, self.files, file_ids, visible=self._is_registered)
+
+    async def _get_feed_instances(self, request: web.Request) -> web.Response:
+        feed_id = int(request.match_info["id"])
+        return self._page(
+            request, self.plugin_instances, self._feed_instance_ids(feed_id)
+        )
+
+    def _synthetic_note(self, i: int) -> dict:
+        return {"id": i, "title": "Description", "content": "", "feed_id": i}
+
+    def _render_note(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}note{row['id']}/",
+            "id": row["id"],
+            "title": row["title"],
+            "content": row["content"],
+            "feed": f"{api}{row['feed_id']}/",
+        }
+
+    async def _get_note(self, request: web.Request) -> web.Response:
+        row = self._get_or_404(self.notes, request)
+        return web.json_response(self._render_note(row, _api(request)))
+
+    async def _put_note(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        row = self._get_or_404(self.notes, request)
+        body = await request.json()
+        changes = {k: body[k] for k in ("title", "content") if k in body}
+        row = self.notes.table.update(row["id"], **changes)
+        return web.json_response(self._render_note(row, _api(request)))
+
+    # ============================================================
+    # Compute resources and plugins
+    # ============================================================
+
+    def _add_compute_resource(self, **fields) -> dict:
+        now = isoformat(datetime.datetime.now(datetime.timezone.utc))
+        max_seconds = fields.pop("max_job_exec_seconds", None)
+        return self.compute_resources.table.add(
+            creation_date=now,
+            modification_date=now,
+            compute_url=fields.pop("compute_url", "http://pfcon.local:5005/api/v1/"),
+            compute_auth_url=fields.pop(
+                "compute_auth_url", "http://pfcon.local:5005/api/v1/auth-token/"
+            ),
+            description=fields.pop("description", None) or "",
+            max_job_exec_seconds=int(max_seconds or 86400),
+            **fields,
+        )
+
+    def _compute_resource_named(self, name: str) -> Optional[dict]:
+        table = self.compute_resources.table
+        return next(
+            (r for r in map(table.get, table.ids()) if r and r["name"] == name), None
+        )
+
+    def _render_cr(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}computeresources/{row['id']}/",
+            "id": row["id"],
+            "creation_date": row["creation_date"],
+            "modification_date": row["modification_date"],
+            "name": row["name"],
+            "compute_url": row["compute_url"],
+            "compute_auth_url": row["compute_auth_url"],
+            "description": row["description"],
+            "max_job_exec_seconds": row["max_job_exec_seconds"],
+        }
+
+    def _synthetic_plugin(self, i: int) -> dict:
+        return {
+            "id": i,
+            "name": f"pl-synthetic{(i - 1) // 3}",
+            "version": f"1.0.{(i - 1) % 3}",
+            "type": "ds",
+            "dock_image": f"localhost/fnndsc/pl-synthetic{(i - 1) // 3}:1.0.{(i - 1) % 3}",
+            "public_repo": "https://github.com/FNNDSC/pl-synthetic",
+            "compute_resources": [1],
+        }
+
+    def _synthetic_plugin_parameter(self, i: int) -> dict:
+        plugin_id = (i - 1) // 2 + 1
+        if i % 2:
+            param = {"name": "threshold", "type": "float", "default": 0.5}
+        else:
+            param = {"name": "label", "type": "string", "default": "synthetic"}
+        return {"id": i, **_parameter(plugin_id, param)}
+
+    def _plugin_param_ids(self, plugin_id: int) -> Iterable[int]:
+        if plugin_id <= self.data.plugins:
+            return range(2 * plugin_id - 1, 2 * plugin_id + 1)
+        return self._plugin_params.get(plugin_id, [])
+
+    def _add_plugin(self, description: dict, compute_resources: list[int]) -> dict:
+        name = description["name"]
+        version = description["version"]
+        plugin = self.plugins.table.add(
+            name=name,
+            version=version,
+            type=description["type"],
+            dock_image=description.get(
+                "dock_image", f"localhost/fnndsc/{name}:{version}"
+            ),
+            public_repo=description.get(
+                "public_repo", f"https://github.com/FNNDSC/{name}"
+            ),
+            compute_resources=compute_resources,
+        )
+        self._plugin_ids[(name, version)] = plugin["id"]
+        self._plugin_params[plugin["id"]] = [
+            self.plugin_parameters.table.add(**_parameter(plugin["id"], param))["id"]
+            for param in description["parameters"]
+        ]
+        return plugin
+
+    def _render_plugin(self, row: dict, api: str) -> dict:
+        url = f"{api}plugins/{row['id']}/"
+        return {
+            "url": url,
+            "id": row["id"],
+            "name": row["name"],
+            "version": row["version"],
+            "dock_image": row["dock_image"],
+            "public_repo": row["public_repo"],
+            "type": row["type"],
+            "compute_resources": f"{url}computeresources/",
+            "parameters": f"{url}parameters/",
+            "instances": f"{url}instances/",
+        }
+
+    def _render_plugin_parameter(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}plugins/parameters/{row['id']}/",
+            **{k: v for k, v in row.items() if k != "plugin_id"},
+            "plugin": f"{api}plugins/{row['plugin_id']}/",
+        }
+
+    async def _get_plugin_params(self, request: web.Request) -> web.Response:
+        plugin = self._get_or_404(self.plugins, request)
+        return self._page(
+            request, self.plugin_parameters, self._plugin_param_ids(plugin["id"])
+        )
+
+    async def _get_plugin_compute_resources(self, request: web.Request) -> web.Response:
+        plugin = self._get_or_404(self.plugins, request)
+        return self._page(request, self.compute_resources, plugin["compute_resources"])
+
+    # ============================================================
+    # Plugin instances
+    # ============================================================
+
+    def _synthetic_plugin_instance(self, i: int) -> dict:
+        row = self.data.plugin_instance(i)
+        row["plugin_id"] = self._plugin_ids[(row["plugin_name"], row["plugin_version"])]
+        row["compute_resource_id"] = 1
+        row["compute_resource_name"] = "host"
+        return row
+
+    def _script_of(self, row: dict) -> JobScript:
+        return self.plugin_job_scripts.get(row["plugin_name"], self.job_script)
+
+    def _view_plugin_instance(self, row: dict) -> dict:
+        if "created_at" not in row or row.get("status_override"):
+            return row
+        view = dict(row)
+        elapsed = self.clock() - row["created_at"]
+        script = self._script_of(row)
+        for status, duration in script:
+            if elapsed < duration:
+                view["status"] = status
+                break
+            elapsed -= duration
+        else:
+            view["status"] = script[-1][0]
+            view["end_date"] = row["finish_date"]
+        return view
+
+    def _render_plugin_instance(self, view: dict, api: str) -> dict:
+        url = f"{api}plugins/instances/{view['id']}/"
+        hidden = (
+            "created_at",
+            "status_override",
+            "finish_date",
+            "compute_resource_id",
+            "workflow_id",
+        )
+        return {
+            "url": url,
+            **{k: v for k, v in view.items() if k not in hidden},
+            "plugin_type": self.plugins.table.get(view["plugin_id"])["type"],
+            "pipeline_inst": None,
+            "summary": "",
+            "raw": "",
+            "error_code": "",
+            "previous": (
+                f"{api}plugins/instances/{view['previous_id']}/"
+                if view["previous_id"] is not None
+                else None
+            ),
+            "feed": f"{api}{view['feed_id']}/",
+            "plugin": f"{api}plugins/{view['plugin_id']}/",
+            "descendants": f"{url}descendants/",
+            "files": f"{url}files/",
+            "parameters": f"{url}parameters/",
+            "compute_resource": f"{api}computeresources/{view['compute_resource_id']}/",
+            "splits": f"{url}splits/",
+        }
+
+    def _instance_file_ids(self, plugin_instance_id: int) -> Iterable[int]:
+        if plugin_instance_id <= self.data.plugin_instances:
+            return self.data.output_files_of(plugin_instance_id)
+        return self._instance_files.get(plugin_instance_id, [])
+
+    def _is_registered(self, file: dict) -> bool:
+        return file.get("registered_at", 0) <= self.clock()
+
+    async def _post_instance(self, request: web.Request) -> web.Response:
+        username = self._check_auth(request)
+        plugin = self._get_or_404(self.plugins, request)
+        body = await request.json()
+        errors, previous, params, cr = self._check_instance(plugin, body)
+        if errors:
+            return web.json_response(errors, status=400)
+        plinst = self._add_instance(username, plugin, body, previous, params, cr)
+        return web.json_response(
+            self._render_plugin_instance(
+                self._view_plugin_instance(plinst), _api(request)
+            ),
+            status=201,
+        )
+
+    def _check_instance(
+        self, plugin: dict, body: dict
+    ) -> tuple[dict, Optional[dict], list[tuple[dict, Any]], Optional[dict]]:
+        """
+        Validate the body of a request to create a plugin instance.
+
+        Returns
+        -------
+        errors
+            error messages by field name
+        previous
+            previous plugin instance
+        params
+            plugin parameters and their values
+        cr
+            compute resource
+        """
+        errors = {}
+
+        previous = None
+        if plugin["type"] != "fs":
+            if (previous_id := body.get("previous_id")) is None:
+                errors["previous_id"] = ["This field is required."]
+            elif (
+                previous := self.plugin_instances.table.get(int(previous_id))
+            ) is None:
+                errors["previous_id"] = ["Invalid plugin instance id."]
+
+        params = []
+        for param_id in self._plugin_param_ids(plugin["id"]):
+            param = self.plugin_parameters.table.get(param_id)
+            value = body.get(param["name"])
+            if value is None:
+                if not param["optional"]:
+                    errors[param["name"]] = ["This field is required."]
+                elif param["default"] is not None:
+                    params.append((param, param["default"]))
+            else:
+                try:
+                    params.append((param, coerce(param["type"], value)))
+                except ValueError as e:
+                    errors[param["name"]] = [str(e)]
+
+        cr_name = body.get("compute_resource_name")
+        if cr_name is None:
+            cr = self.compute_resources.table.get(plugin["compute_resources"][0])
+        else:
+            cr = self._compute_resource_named(cr_name)
+            if cr is None or cr["id"] not in plugin["compute_resources"]:
+                errors["compute_resource_name"] = ["Invalid compute resource."]
+
+        return errors, previous, params, cr
+
+    def _add_instance(
+        self,
+        username: str,
+        plugin: dict,
+        body: dict,
+        previous: Optional[dict],
+        params: list[tuple[dict, Any]],
+        cr: dict,
+        **extra,
+    ) -> dict:
+        """
+        Create a plugin instance, its parameters, and its output files.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if previous is None:
+            feed = self.feeds.table.add(
+                creation_date=isoformat(now),
+                modification_date=isoformat(now),
+                name="",
+                creator_username=username,
+            )
+            self.notes.table.rows[feed["id"]] = self._synthetic_note(feed["id"])
+            feed_id = feed["id"]
+            parent_path = f"{username}/feed_{feed_id}"
+        else:
+            feed_id = previous["feed_id"]
+            parent_path = previous["output_path"].removesuffix("/data")
+
+        script = self.plugin_job_scripts.get(plugin["name"], self.job_script)
+        created_at = self.clock()
+        total = sum(duration for _, duration in script)
+        plinst = self.plugin_instances.table.add(
+            title=body.get("title", ""),
+            plugin_id=plugin["id"],
+            plugin_name=plugin["name"],
+            plugin_version=plugin["version"],
+            previous_id=None if previous is None else previous["id"],
+            feed_id=feed_id,
+            start_date=isoformat(now),
+            end_date=isoformat(now),
+            finish_date=isoformat(now + datetime.timedelta(seconds=total)),
+            status=script[0][0],
+            owner_username=username,
+            compute_resource_id=cr["id"],
+            compute_resource_name=cr["name"],
+            cpu_limit=_parse_quantity(body.get("cpu_limit", 1000)),
+            memory_limit=_parse_quantity(body.get("memory_limit", 200)),
+            number_of_workers=int(body.get("number_of_workers", 1)),
+            gpu_limit=int(body.get("gpu_limit", 0)),
+            created_at=created_at,
+            **extra,
+        )
+        plinst_id = plinst["id"]
+        plinst["output_path"] = f"{parent_path}/{plugin['name']}_{plinst_id}/data"
+        self._feed_instances.setdefault(feed_id, []).append(plinst_id)
+
+        param_ids = self._instance_params[plinst_id] = []
+        for param, value in params:
+            row = self.plugin_instance_parameters.table.add(
+                param_name=param["name"],
+                value=value,
+                type=param["type"],
+                plugin_inst_id=plinst_id,
+                plugin_param_id=param["id"],
+            )
+            param_ids.append(row["id"])
+
+        file_ids = self._instance_files[plinst_id] = []
+        registration_start, registration_duration = _stage_of(
+            script, "registeringFiles"
+        )
+        for k in range(self.outputs_per_job):
+            fraction = (k + 1) / (self.outputs_per_job + 1)
+            row = self.files.table.add(
+                fname=f"{plinst['output_path']}/out{k}.dat",
+                fsize=self.output_fsize,
+                plugin_inst_id=plinst_id,
+                feed_id=feed_id,
+                registered_at=created_at
+                + registration_start
+                + fraction * registration_duration,
+            )
+            file_ids.append(row["id"])
+        return plinst
+
+    async def _put_instance(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        row = self._get_or_404(self.plugin_instances, request)
+        body = await request.json() if request.can_read_body else {}
+        changes = {}
+        if body.get("title") is not None:
+            changes["title"] = body["title"]
+        if body.get("status") == "cancelled":
+            view = self._view_plugin_instance(row)
+            if view["status"] not in ("finishedSuccessfully", "finishedWithError"):
+                changes["status"] = "cancelled"
+                changes["status_override"] = True
+        if changes:
+            row = self.plugin_instances.table.update(row["id"], **changes)
+        return web.json_response(
+            self._render_plugin_instance(self._view_plugin_instance(row), _api(request))
+        )
+
+    async def _search_instances(self, request: web.Request) -> web.Response:
+        feed_id = request.query.get("feed_id")
+        candidates = None if feed_id is None else self._feed_instance_ids(int(feed_id))
+        return self._page(request, self.plugin_instances, candidates)
+
+    async def _delete_instance(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        row = self._get_or_404(self.plugin_instances, request)
+        self.plugin_instances.table.delete(row["id"])
+        return web.Response(status=204)
+
+    async def _get_instance_params(self, request: web.Request) -> web.Response:
+        plinst_id = int(request.match_info["id"])
+        return self._page(
+            request,
+            self.plugin_instance_parameters,
+            self._instance_params.get(plinst_id, []),
+        )
+
+    async def _get_instance_files(self, request: web.Request) -> web.Response:
+        plinst_id = int(request.match_info["id"])
+        return self._page(
+            request,
+            self.files,
+            self._instance_file_ids(plinst_id),
+            visible=self._is_registered,
+        )
+
+    def _render_plugin_instance_parameter(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}plugins/instances/parameters/{row['id']}/",
+            "id": row["id"],
+            "param_name": row["param_name"],
+            "value": row["value"],
+            "type": row["type"],
+            "plugin_inst": f"{api}plugins/instances/{row['plugin_inst_id']}/",
+            "plugin_param": f"{api}plugins/parameters/{row['plugin_param_id']}/",
+        }
+
+    # ============================================================
+    # Files
+    # ============================================================
+
+    def _file_renderer(self, kind: str) -> Callable[[dict, str], dict]:
+        def render(row: dict, api: str) -> dict:
+            url = f"{api}{kind}/{row['id']}/"
+            basename = row["fname"].rsplit("/", 1)[-1]
+            hidden = ("content", "registered_at", "plugin_inst_id")
+            rendered = {
+                "url": url,
+                **{k: v for k, v in row.items() if k not in hidden},
+                "file_resource": f"{url}{basename}",
+            }
+            if "plugin_inst_id" in row:
+                rendered["plugin_inst"] = (
+                    f"{api}plugins/instances/{row['plugin_inst_id']}/"
+                )
+            return rendered
+
+        return render
+
+    async def _post_uploadedfile(self, request: web.Request) -> web.Response:
+        username = self._check_auth(request)
+        if self.require_content_length and request.content_length is None:
+            return web.json_response({"detail": "Length Required"}, status=411)
+        upload_path = None
+        content = bytearray()
+        reader = await request.multipart()
+        while (part := await reader.next()) is not None:
+            if part.name == "upload_path":
+                upload_path = await part.text()
+            elif part.name == "fname":
+                while chunk := await part.read_chunk():
+                    content.extend(chunk)
+        if not upload_path or not upload_path.startswith(f"{username}/uploads/"):
+            return web.json_response(
+                {"upload_path": [f"File path must start with '{username}/uploads/'."]},
+                status=400,
+            )
+        row = self.uploadedfiles.table.add(
+            fname=upload_path,
+            fsize=len(content),
+            content=bytes(content),
+            owner_username=username,
+            creation_date=isoformat(datetime.datetime.now(datetime.timezone.utc)),
+        )
+        return web.json_response(
+            self.uploadedfiles.render(row, _api(request)), status=201
+        )
+
+    # ============================================================
+    # Pipelines and workflows
+    # ============================================================
+
+    def add_pipeline(
+        self,
+        name: str,
+        plugin_tree: Sequence[dict],
+        description: str = "",
+        category: str = "",
+        authors: str = "",
+        locked: bool = True,
+        owner: Optional[str] = None,
+    ) -> dict:
+        """
+        Add a pipeline.
+
+        Parameters
+        ----------
+        name
+            name of the pipeline
+        plugin_tree
+            Pipings of the pipeline, in the format of *CUBE*'s `plugin_tree`:
+            each piping is a `dict` with the keys `plugin_name`, `plugin_version`,
+            `previous_index` (index of an earlier piping, or `None` for the root),
+            and optionally `title` and `plugin_parameter_defaults`, which is a
+            list of `{"name": ..., "default": ...}`.
+        owner
+            username of the owner. Default is the admin user.
+        """
+        now = isoformat(datetime.datetime.now(datetime.timezone.utc))
+        pipeline = self.pipelines.table.add(
+            name=name,
+            locked=locked,
+            authors=authors,
+            category=category,
+            description=description,
+            owner_username=owner or self.admin_username,
+            creation_date=now,
+            modification_date=now,
+        )
+        piping_ids = self._pipeline_pipings[pipeline["id"]] = []
+        for index, node in enumerate(plugin_tree):
+            key = (node["plugin_name"], node["plugin_version"])
+            if (plugin_id := self._plugin_ids.get(key)) is None:
+                raise ValueError(f"Plugin not found: {key}")
+            previous_index = node.get("previous_index")
+            if previous_index is not None and not 0 <= previous_index < index:
+                raise ValueError(f"Invalid previous_index of piping {index}")
+            previous_id = None if previous_index is None else piping_ids[previous_index]
+            piping = self.pipings.table.add(
+                title=node.get("title", f"{node['plugin_name']} {index}"),
+                previous_id=previous_id,
+                plugin_id=plugin_id,
+                plugin_name=key[0],
+                plugin_version=key[1],
+                pipeline_id=pipeline["id"],
+            )
+            piping_ids.append(piping["id"])
+            overrides = {
+                d["name"]: d["default"]
+                for d in node.get("plugin_parameter_defaults", [])
+            }
+            param_ids = self._piping_params[piping["id"]] = []
+            for param_id in self._plugin_param_ids(plugin_id):
+                param = self.plugin_parameters.table.get(param_id)
+                value = overrides.get(param["name"], param["default"])
+                if value is None:
+                    continue
+                row = self.pipeline_parameters.table.add(
+                    value=value,
+                    type=param["type"],
+                    plugin_piping_id=piping["id"],
+                    plugin_piping_title=piping["title"],
+                    previous_plugin_piping_id=previous_id,
+                    param_name=param["name"],
+                    param_id=param_id,
+                    plugin_name=key[0],
+                    plugin_version=key[1],
+                    plugin_id=plugin_id,
+                )
+                param_ids.append(row["id"])
+        return pipeline
+
+    def _render_pipeline(self, row: dict, api: str) -> dict:
+        url = f"{api}pipelines/{row['id']}/"
+        return {
+            "url": url,
+            **row,
+            "plugins": f"{url}plugins/",
+            "plugin_pipings": f"{url}pipings/",
+            "default_parameters": f"{url}parameters/",
+            "workflows": f"{url}workflows/",
+        }
+
+    def _render_piping(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}pipelines/pipings/{row['id']}/",
+            **row,
+            "previous": (
+                f"{api}pipelines/pipings/{row['previous_id']}/"
+                if row["previous_id"] is not None
+                else None
+            ),
+            "pipeline": f"{api}pipelines/{row['pipeline_id']}/",
+            "plugin": f"{api}plugins/{row['plugin_id']}/",
+        }
+
+    def _render_pipeline_parameter(self, row: dict, api: str) -> dict:
+        return {
+            "url": f"{api}pipelines/{row['type']}-parameter/{row['id']}/",
+            **row,
+            "plugin_piping": f"{api}pipelines/pipings/{row['plugin_piping_id']}/",
+            "plugin_param": f"{api}plugins/parameters/{row['param_id']}/",
+        }
+
+    def _view_workflow(self, row: dict) -> dict:
+        return {**row, **self._job_counts(self._workflow_instances[row["id"]])}
+
+    def _render_workflow(self, view: dict, api: str) -> dict:
+        url = f"{api}pipelines/workflows/{view['id']}/"
+        return {
+            "url": url,
+            **view,
+            "pipeline": f"{api}pipelines/{view['pipeline_id']}/",
+            "plugin_instances": f"{url}plugininstances/",
+        }
+
+    async def _get_pipeline_pipings(self, request: web.Request) -> web.Response:
+        pipeline = self._get_or_404(self.pipelines, request)
+        return self._page(request, self.pipings, self._pipeline_pipings[pipeline["id"]])
+
+    async def _get_pipeline_params(self, request: web.Request) -> web.Response:
+        pipeline = self._get_or_404(self.pipelines, request)
+        param_ids = (
+            param_id
+            for piping_id in self._pipeline_pipings[pipeline["id"]]
+            for param_id in self._piping_params[piping_id]
+        )
+        return self._page(request, self.pipeline_parameters, param_ids)
+
+    async def _get_pipeline_workflows(self, request: web.Request) -> web.Response:
+        pipeline = self._get_or_404(self.pipelines, request)
+        return self._page(
+            request,
+            self.workflows,
+            visible=lambda v: v["pipeline_id"] == pipeline["id"],
+        )
+
+    async def _get_workflow_instances(self, request: web.Request) -> web.Response:
+        workflow = self._get_or_404(self.workflows, request)
+        return self._page(
+            request, self.plugin_instances, self._workflow_instances[workflow["id"]]
+        )
+
+    async def _post_workflow(self, request: web.Request) -> web.Response:
+        username = self._check_auth(request)
+        pipeline = self._get_or_404(self.pipelines, request)
+        body = await request.json()
+        errors = {}
+
+        previous = None
+        if (previous_id := body.get("previous_plugin_inst_id")) is None:
+            errors["previous_plugin_inst_id"] = ["This field is required."]
+        elif (previous := self.plugin_instances.table.get(int(previous_id))) is None:
+            errors["previous_plugin_inst_id"] = ["Invalid plugin instance id."]
+
+        piping_ids = self._pipeline_pipings[pipeline["id"]]
+        nodes = {}
+        if (nodes_info := body.get("nodes_info")) is not None:
+            try:
+                nodes = {int(n["piping_id"]): n for n in json.loads(nodes_info)}
+            except (ValueError, TypeError, KeyError):
+                errors["nodes_info"] = ["Invalid JSON list of nodes."]
+            if set(nodes) - set(piping_ids):
+                errors["nodes_info"] = ["Invalid piping id."]
+        if errors:
+            return web.json_response(errors, status=400)
+
+        plans = []
+        for piping_id in piping_ids:
+            piping = self.pipings.table.get(piping_id)
+            node = nodes.get(piping_id, {})
+            instance_body = {
+                row["param_name"]: row["value"]
+                for row in map(
+                    self.pipeline_parameters.table.get, self._piping_params[piping_id]
+                )
+            }
+            instance_body.update(
+                (d["name"], d["default"])
+                for d in node.get("plugin_parameter_defaults", [])
+            )
+            instance_body["title"] = node.get("title", piping["title"])
+            instance_body["previous_id"] = previous["id"]
+            if "compute_resource_name" in node:
+                instance_body["compute_resource_name"] = node["compute_resource_name"]
+            plugin = self.plugins.table.get(piping["plugin_id"])
+            node_errors, _, params, cr = self._check_instance(plugin, instance_body)
+            if node_errors:
+                errors[piping["title"]] = node_errors
+            plans.append((piping, plugin, instance_body, params, cr))
+        if errors:
+            return web.json_response({"nodes_info": errors}, status=400)
+
+        workflow = self.workflows.table.add(
+            title=body.get("title", ""),
+            pipeline_id=pipeline["id"],
+            pipeline_name=pipeline["name"],
+            owner_username=username,
+            creation_date=isoformat(datetime.datetime.now(datetime.timezone.utc)),
+        )
+        created: dict[int, dict] = {}
+        plinst_ids = self._workflow_instances[workflow["id"]] = []
+        for piping, plugin, instance_body, params, cr in plans:
+            parent = (
+                previous
+                if piping["previous_id"] is None
+                else created[piping["previous_id"]]
+            )
+            plinst = self._add_instance(
+                username,
+                plugin,
+                instance_body,
+                parent,
+                params,
+                cr,
+                workflow_id=workflow["id"],
+            )
+            created[piping["id"]] = plinst
+            plinst_ids.append(plinst["id"])
+        return web.json_response(
+            self._render_workflow(self._view_workflow(workflow), _api(request)),
+            status=201,
+        )
+
+    # ============================================================
+    # Filebrowser
+    # ============================================================
+
+    def _folder_index(self) -> dict[str, "_Folder"]:
+        """
+        Get the folders of all files except the synthetic PACS files,
+        rebuilding the index if files were added or deleted.
+        """
+        resources = (self.uploadedfiles, self.files, self.pacsfiles)
+        version = tuple((r.table.next_id, len(r.table.deleted)) for r in resources)
+        if version == self._folders_version:
+            return self._folders
+        folders = {"": _Folder()}
+        for resource in resources:
+            table = resource.table
+            ids = table.ids()
+            if resource is self.pacsfiles:
+                ids = table.ids(within=range(table.synthetic + 1, table.next_id))
+            for i in ids:
+                parts = table.get(i)["fname"].split("/")
+                parent = folders[""]
+                for depth in range(1, len(parts)):
+                    parent.subfolders.setdefault(parts[depth - 1])
+                    path = "/".join(parts[:depth])
+                    parent = folders.setdefault(path, _Folder())
+                parent.files.append((resource, i))
+        self._folders = folders
+        self._folders_version = version
+        return folders
+
+    def _folder(self, path: str) -> Optional["_Folder"]:
+        """
+        Get a folder of the filebrowser. Folders of synthetic PACS files are
+        computed when they are requested.
+        """
+        stored = self._folder_index().get(path)
+        if (synthetic := self.data.pacs_folder(path)) is None:
+            return stored
+        subfolders, ids = synthetic
+        folder = _Folder()
+        if stored is not None:
+            folder.subfolders.update(stored.subfolders)
+            folder.files.extend(stored.files)
+        folder.subfolders.update(dict.fromkeys(subfolders))
+        folder.files.extend((self.pacsfiles, i) for i in ids)
+        return folder
+
+    def _render_folder(self, path: str, folder: "_Folder", api: str) -> dict:
+        url = f"{api}filebrowser/{path}/" if path else f"{api}filebrowser/"
+        return {
+            "url": url,
+            "path": path,
+            "subfolders": json.dumps(list(folder.subfolders)),
+            "files": f"{url}files/",
+        }
+
+    def _folder_or_404(self, request: web.Request) -> tuple[str, "_Folder"]:
+        path = request.match_info.get("path", "").strip("/")
+        if (folder := self._folder(path)) is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"detail": "Not found."}),
+                content_type="application/json",
+            )
+        return path, folder
+
+    async def _search_filebrowser(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        path = request.query.get("path", "").strip("/")
+        folder = self._folder(path)
+        results = (
+            [] if folder is None else [self._render_folder(path, folder, _api(request))]
+        )
+        return web.json_response(
+            {"count": len(results), "next": None, "previous": None, "results": results}
+        )
+
+    async def _get_folder(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        path, folder = self._folder_or_404(request)
+        return web.json_response(self._render_folder(path, folder, _api(request)))
+
+    async def _get_folder_files(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        _, folder = self._folder_or_404(request)
+        limit = int(request.query.get("limit", self.page_size))
+        offset = int(request.query.get("offset", 0))
+        files = [
+            (resource, row)
+            for resource, i in folder.files
+            if (row := resource.table.get(i)) is not None and self._is_registered(row)
+        ]
+        api = _api(request)
+        return web.json_response(
+            {
+                "count": len(files),
+                "next": (
+                    _page_url(request, limit, offset + limit)
+                    if offset + limit < len(files)
+                    else None
+                ),
+                "previous": (
+                    _page_url(request, limit, max(offset - limit, 0))
+                    if offset > 0
+                    else None
+                ),
+                "results": [
+                    resource.render(row, api)
+                    for resource, row in files[offset : offset + limit]
+                ],
+            }
+        )
+
+    # ============================================================
+    # Admin API
+    # ============================================================
+
+    def _check_admin(self, request: web.Request) -> None:
+        if self._check_auth(request) != self.admin_username:
+            raise web.HTTPForbidden()
+
+    async def _get_admin(self, request: web.Request) -> web.Response:
+        self._check_admin(request)
+        return web.json_response(
+            {
+                "collection_links": {
+                    "compute_resources": f"{request.url.origin()}/chris-admin/api/v1/computeresources/"
+                }
+            }
+        )
+
+    async def _post_admin_plugin(self, request: web.Request) -> web.Response:
+        self._check_admin(request)
+        form = await request.post()
+        description = json.loads(form["fname"].file.read())
+        compute_ids = []
+        for name in form["compute_names"].split(","):
+            if (cr := self._compute_resource_named(name)) is None:
+                return web.json_response(
+                    {"compute_names": [f"Compute resource {name} not found."]},
+                    status=400,
+                )
+            compute_ids.append(cr["id"])
+        if (description["name"], description["version"]) in self._plugin_ids:
+            return web.json_response(
+                {"name": ["Plugin with this name and version already exists."]},
+                status=400,
+            )
+        for param in description["parameters"]:
+            param["type"] = _PARAMETER_TYPES.get(param["type"], param["type"])
+        plugin = self._add_plugin(description, compute_ids)
+        return web.json_response(self._render_plugin(plugin, _api(request)), status=201)
+
+    async def _post_admin_compute_resource(self, request: web.Request) -> web.Response:
+        self._check_admin(request)
+        body = await request.json()
+        if self._compute_resource_named(body["name"]) is not None:
+            return web.json_response(
+                {"name": ["compute resource with this name already exists."]},
+                status=400,
+            )
+        fields = ("name", "compute_url", "description", "compute_auth_url")
+        cr = self._add_compute_resource(
+            max_job_exec_seconds=body.get("max_job_exec_seconds"),
+            **{k: body[k] for k in fields if body.get(k) is not None},
+        )
+        return web.json_response(self._render_cr(cr, _api(request)), status=201)
+
+
+def _api(request: web.Request) -> str:
+    return f"{request.url.origin()}/api/v1/"
+
+
+def _parse_range(request: web.Request, fsize: int) -> Optional[tuple[int, int]]:
+    """
+    Get the byte range `[start, end)` requested by a `Range` header, if any.
+    """
+    if "Range" not in request.headers:
+        return None
+    try:
+        requested = request.http_range
+    except ValueError:
+        return None
+    start, stop = requested.start, requested.stop
+    if start is None and stop is None:
+        return None
+    if start is not None and start < 0:  # suffix range, e.g. "bytes=-500"
+        return max(0, fsize + start), fsize
+    start = 0 if start is None else start
+    stop = fsize if stop is None else min(stop, fsize)
+    return start, stop
+
+
+def _page_url(request: web.Request, limit: int, offset: int) -> str:
+    return str(request.url.update_query(limit=limit, offset=offset))
+
+
+def _matches(view: dict, filters: dict[str, str]) -> bool:
+    """
+    Evaluate query parameters similarly to *CUBE*'s filters.
+
+    - `{field}_exact`: case-sensitive equality
+    - `{field}_icontains`, `name`: case-insensitive substring
+    - `fname`: prefix
+    - `min_{field}`, `max_{field}`: inclusive bounds
+    - `{field}`: equality
+    - unknown fields are ignored
+    """
+    for key, expected in filters.items():
+        if key.endswith("_exact") and key[:-6] in view:
+            if str(view[key[:-6]]) != expected:
+                return False
+        elif key.endswith("_icontains") and key[:-10] in view:
+            if expected.lower() not in str(view[key[:-10]]).lower():
+                return False
+        elif key.startswith(("min_", "max_")) and key[4:] in view:
+            actual = view[key[4:]]
+            bound = type(actual)(expected) if isinstance(actual, int) else expected
+            if key.startswith("min_") and actual < bound:
+                return False
+            if key.startswith("max_") and actual > bound:
+                return False
+        elif key == "name" and key in view:
+            if expected.lower() not in str(view[key]).lower():
+                return False
+        elif key == "fname" and key in view:
+            if not view[key].startswith(expected):
+                return False
+        elif key in view:
+            if str(view[key]).lower() != expected.lower():
+                return False
+    return True
+
+
+def _parameter(plugin_id: int, param: dict) -> dict:
+    name = param["name"]
+    return {
+        "name": name,
+        "type": param["type"],
+        "optional": param.get("optional", True),
+        "default": param.get("default"),
+        "flag": param.get("flag", f"--{name}"),
+        "short_flag": param.get("short_flag", f"--{name}"),
+        "action": param.get("action", "store"),
+        "help": param.get("help", f"the {name} parameter"),
+        "ui_exposed": param.get("ui_exposed", True),
+        "plugin_id": plugin_id,
+    }
+
+
+def _parse_quantity(value: str | int) -> int:
+    """
+    Parse a resource quantity like `"1000m"`, `"2Gi"`, or `"500Mi"`.
+    CPU is returned in millicores and memory is returned in MiB.
+    """
+    if isinstance(value, int):
+        return value
+    if value.endswith("Gi"):
+        return int(value[:-2]) * 1024
+    if value.endswith(("Mi", "m")):
+        return int(value.rstrip("Mim"))
+    return int(value)
+
+
+def _stage_of(script: JobScript, status: str) -> tuple[float, float]:
+    """
+    Get the start time and duration of a stage. If the stage is not in the script,
+    the start of the final stage is returned.
+    """
+    start = 0.0
+    for stage, duration in script:
+        if stage == status:
+            return start, duration
+        start += duration
+    return start - script[-1][1], 0.0
@@ -86,6 +86,9 @@ PluginInstanceUrl = NewType("PluginInstanceUrl", str)
 PluginInstancesUrl = NewType("PluginInstancesUrl", str)
 DescendantsUrl = NewType("DescendantsUrl", str)
 PipelineInstancesUrl = NewType("PipelineInstancesUrl", str)
+WorkflowsUrl = NewType("WorkflowsUrl", str)
+WorkflowUrl = NewType("WorkflowUrl", str)
+WorkflowId = NewType("WorkflowId", int)
 PluginInstanceParamtersUrl = NewType("PluginInstanceParametersUrl", str)
 ComputeResourceUrl = NewType("ComputeResourceUrl", str)
 SplitsUrl = NewType("SplitsUrl", str)
@@ -108,3 +111,14 @@ CommentsUrl = NewType("CommentsUrl", str)
 PluginParameterUrl = NewType("PluginParameterUrl", str)
 
 PacsFileId = NewType("PacsFileId", int)
+
+FolderPath = NewType("FolderPath", str)
+"""
+A path of the filebrowser, without leading nor trailing slashes.
+
+## Examples
+
+- `chris/uploads`
+- `""` (the root)
+"""
+FolderUrl = NewType("FolderUrl", str)
@@ -0,0 +1,397 @@
+"""
+Client-side admission control of plugin instances, by the resources they request.
+
+*CUBE* accepts every plugin instance it is given, even if its compute resource
+is already busy. An `AdmissionController` holds back new plugin instances until
+the plugin instances which it created before have finished, so that the
+resources requested by unfinished plugin instances stay within a budget.
+
+Examples
+--------
+
+```python
+from aiochris.util.admission import AdmissionController, ResourceBudget
+
+budgets = {"galena": ResourceBudget(cpu=64000, memory=256 * 1024, gpu=4)}
+async with AdmissionController(chris, budgets) as admission:
+    async for result in plugin.create_instances(
+        previous_list, admission=admission, cpu_limit="4000m", memory_limit="16Gi"
+    ):
+        ...
+```
+"""
+
+import asyncio
+import dataclasses
+import logging
+from collections.abc import Mapping
+from typing import Any, Optional, Self, TYPE_CHECKING
+
+import aiohttp
+
+from aiochris.errors import StatusError, UnauthorizedError
+from aiochris.util.search import acollect
+from aiochris.util.wait import FINAL_STATUSES, plan_searches
+
+if TYPE_CHECKING:
+    from aiochris.client.authed import AuthenticatedClient
+    from aiochris.models.logged_in import Plugin, PluginInstance
+
+logger = logging.getLogger(__name__)
+
+
+def parse_quantity(value: str | int) -> int:
+    """
+    Parse a resource quantity like `"1000m"`, `"2Gi"`, or `"500Mi"`.
+    CPU is returned in millicores and memory is returned in MiB.
+    """
+    if isinstance(value, int):
+        return value
+    if value.endswith("Gi"):
+        return int(value[:-2]) * 1024
+    if value.endswith("Mi"):
+        return int(value[:-2])
+    if value.endswith("m"):
+        return int(value[:-1])
+    return int(value)
+
+
+@dataclasses.dataclass(frozen=True)
+class Usage:
+    """
+    Resources requested by plugin instances. Every worker of a plugin instance
+    requests its `cpu_limit`, `memory_limit` and `gpu_limit`.
+    """
+
+    cpu: int = 0
+    """millicores"""
+    memory: int = 0
+    """MiB"""
+    gpu: int = 0
+    jobs: int = 0
+    """Number of plugin instances."""
+
+    @classmethod
+    def of_params(cls, params: Mapping[str, Any]) -> "Usage":
+        """
+        Resources which will be requested by a plugin instance created with `params`,
+        using the defaults of *CUBE* for the limits which are not given.
+        """
+        workers = int(params.get("number_of_workers") or 1)
+        return cls(
+            cpu=parse_quantity(params.get("cpu_limit") or 1000) * workers,
+            memory=parse_quantity(params.get("memory_limit") or 200) * workers,
+            gpu=int(params.get("gpu_limit") or 0) * workers,
+            jobs=1,
+        )
+
+    @classmethod
+    def of_instance(cls, plinst: "PluginInstance") -> "Usage":
+        """Resources requested by a plugin instance."""
+        workers = plinst.number_of_workers
+        return cls(
+            cpu=plinst.cpu_limit * workers,
+            memory=plinst.memory_limit * workers,
+            gpu=plinst.gpu_limit * workers,
+            jobs=1,
+        )
+
+    def __add__(self, other: "Usage") -> "Usage":
+        return Usage(
+            self.cpu + other.cpu,
+            self.memory + other.memory,
+            self.gpu + other.gpu,
+            self.jobs + other.jobs,
+        )
+
+    def __sub__(self, other: "Usage") -> "Usage":
+        return Usage(
+            self.cpu - other.cpu,
+            self.memory - other.memory,
+            self.gpu - other.gpu,
+            self.jobs - other.jobs,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceBudget:
+    """
+    Maximum resources requested by unfinished plugin instances of a compute resource.
+    `None` means unlimited.
+    """
+
+    cpu: Optional[int] = None
+    """millicores"""
+    memory: Optional[int] = None
+    """MiB"""
+    gpu: Optional[int] = None
+    jobs: Optional[int] = None
+    """Number of plugin instances."""
+
+    def allows(self, usage: Usage) -> bool:
+        """Whether `usage` is within this budget."""
+        return all(
+            limit is None or used <= limit
+            for limit, used in (
+                (self.cpu, usage.cpu),
+                (self.memory, usage.memory),
+                (self.gpu, usage.gpu),
+                (self.jobs, usage.jobs),
+            )
+        )
+
+
+@dataclasses.dataclass
+class AdmissionStats:
+    """Counters of an `AdmissionController`."""
+
+    admitted: int = 0
+    """Number of plugin instances created."""
+    held: int = 0
+    """Number of plugin instances which had to wait for capacity."""
+    peak: dict[str, Usage] = dataclasses.field(default_factory=dict)
+    """Highest usage of each compute resource."""
+    requests: int = 0
+    """Number of searches made to refresh the statuses of plugin instances."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _Tracked:
+    compute_resource_name: str
+    feed_id: int
+    usage: Usage
+
+
+@dataclasses.dataclass(frozen=True)
+class _InDoubt:
+    """A plugin instance which may or may not have been created."""
+
+    compute_resource_name: str
+    plugin_id: int
+    previous_id: Optional[int]
+    usage: Usage
+
+
+class AdmissionController:
+    """
+    Holds back new plugin instances until their compute resource has enough
+    budget for them.
+
+    The usage of a compute resource is the sum of the resources requested by
+    the unfinished plugin instances which were created through this controller,
+    and of the plugin instances being created. The statuses of unfinished
+    plugin instances are refreshed every `interval` seconds using batched
+    searches (see `aiochris.util.wait.WaitManager`).
+
+    Plugin instances of compute resources without a budget are not held back.
+
+    If creating a plugin instance is interrupted (e.g. it is cancelled) after
+    the request might have been sent, its budget stays reserved until the next
+    refresh, which looks for a plugin instance of the same plugin and previous
+    plugin instance that this controller has not seen yet.
+    """
+
+    def __init__(
+        self,
+        client: "AuthenticatedClient",
+        budgets: Mapping[str, ResourceBudget],
+        interval: float = 5,
+        page_size: int = 100,
+    ):
+        """
+        Parameters
+        ----------
+        client
+            client used to search for plugin instances
+        budgets
+            budgets by compute resource name
+        interval
+            Number of seconds to wait between refreshing statuses
+        page_size
+            Number of plugin instances per page of search results
+        """
+        self.client = client
+        self.budgets = dict(budgets)
+        self.interval = interval
+        self.page_size = page_size
+        self.stats = AdmissionStats()
+        self._usage: dict[str, Usage] = {}
+        self._tracked: dict[int, _Tracked] = {}
+        self._in_doubt: list[_InDoubt] = []
+        self._seen: set[int] = set()
+        self._waiting = 0
+        self._condition = asyncio.Condition()
+        self._default_resources: dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop refreshing statuses."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def usage(self, compute_resource_name: str) -> Usage:
+        """Current usage of a compute resource."""
+        return self._usage.get(compute_resource_name, Usage())
+
+    async def submit(
+        self, plugin: "Plugin", params: Mapping[str, Any]
+    ) -> "PluginInstance":
+        """
+        Create a plugin instance once its compute resource has enough budget for it.
+
+        Parameters
+        ----------
+        plugin
+            plugin of the plugin instance
+        params
+            request body of the plugin instance, e.g. `{"previous_id": 5, "cpu_limit": "2000m"}`
+
+        Raises
+        ------
+        ValueError
+            If the plugin instance requests more than the budget of its compute resource.
+        """
+        name = params.get("compute_resource_name") or await self._default_of(plugin)
+        if (budget := self.budgets.get(name)) is None:
+            return await plugin._create_instance_raw(**params)
+        request = Usage.of_params(params)
+        if not budget.allows(request):
+            raise ValueError(
+                f"{request} is more than the budget of compute resource {name}: {budget}"
+            )
+        await self._reserve(name, budget, request)
+        try:
+            plinst = await plugin._create_instance_raw(**params)
+        except (StatusError, UnauthorizedError, aiohttp.ClientConnectorError):
+            # CUBE did not create the plugin instance
+            async with self._condition:
+                self._add_usage(name, Usage() - request)
+                self._condition.notify_all()
+            raise
+        except BaseException:
+            previous_id = params.get("previous_id")
+            self._in_doubt.append(_InDoubt(name, plugin.id, previous_id, request))
+            self._start_polling()
+            raise
+        async with self._condition:
+            actual = Usage.of_instance(plinst)
+            self._add_usage(name, actual - request)
+            self._track(plinst, name, actual)
+            self.stats.admitted += 1
+            self._condition.notify_all()  # CUBE may have lowered the limits
+        self._start_polling()
+        return plinst
+
+    async def refresh(self) -> None:
+        """
+        Get the current statuses of the unfinished plugin instances,
+        and release the budget of those which finished.
+        """
+        by_feed: dict[int, list[int]] = {}
+        for plinst_id, tracked in self._tracked.items():
+            by_feed.setdefault(tracked.feed_id, []).append(plinst_id)
+        queries = plan_searches(by_feed, self.page_size)
+        in_doubt, self._in_doubt = self._in_doubt, []
+        self.stats.requests += len(queries) + len(in_doubt)
+        try:
+            pages, candidates = await asyncio.gather(
+                asyncio.gather(
+                    *(
+                        acollect(
+                            self.client.plugin_instances(limit=self.page_size, **query)
+                        )
+                        for query in queries
+                    )
+                ),
+                asyncio.gather(*(self._find(d) for d in in_doubt)),
+            )
+        except BaseException:
+            self._in_doubt.extend(in_doubt)  # try again next time
+            raise
+        found = {p.id: p for page in pages for p in page}
+        async with self._condition:
+            for plinst_id in (i for ids in by_feed.values() for i in ids):
+                plinst = found.get(plinst_id)
+                if plinst is None or plinst.status in FINAL_STATUSES:
+                    self._untrack(plinst_id)  # finished or deleted
+            for doubt, plinsts in zip(in_doubt, candidates):
+                self._add_usage(doubt.compute_resource_name, Usage() - doubt.usage)
+                unseen = [p for p in plinsts if p.id not in self._seen]
+                if unseen:  # it was created after all
+                    plinst = max(unseen, key=lambda p: p.id)
+                    actual = Usage.of_instance(plinst)
+                    self._add_usage(doubt.compute_resource_name, actual)
+                    self._track(plinst, doubt.compute_resource_name, actual)
+            self._condition.notify_all()
+
+    async def _reserve(self, name: str, budget: ResourceBudget, request: Usage) -> None:
+        async with self._condition:
+            if not budget.allows(self.usage(name) + request):
+                self.stats.held += 1
+                self._waiting += 1
+                self._start_polling()
+                try:
+                    await self._condition.wait_for(
+                        lambda: budget.allows(self.usage(name) + request)
+                    )
+                finally:
+                    self._waiting -= 1
+            self._add_usage(name, request)
+
+    def _add_usage(self, name: str, delta: Usage) -> None:
+        usage = self._usage[name] = self.usage(name) + delta
+        peak = self.stats.peak.get(name, Usage())
+        self.stats.peak[name] = Usage(
+            max(peak.cpu, usage.cpu),
+            max(peak.memory, usage.memory),
+            max(peak.gpu, usage.gpu),
+            max(peak.jobs, usage.jobs),
+        )
+
+    def _track(self, plinst: "PluginInstance", name: str, usage: Usage) -> None:
+        self._seen.add(plinst.id)
+        self._tracked[plinst.id] = _Tracked(name, plinst.feed_id, usage)
+        if plinst.status in FINAL_STATUSES:
+            self._untrack(plinst.id)
+
+    def _untrack(self, plinst_id: int) -> None:
+        if (tracked := self._tracked.pop(plinst_id, None)) is not None:
+            self._add_usage(tracked.compute_resource_name, Usage() - tracked.usage)
+
+    async def _default_of(self, plugin: "Plugin") -> str:
+        """The compute resource which *CUBE* uses if none is given."""
+        if (name := self._default_resources.get(plugin.url)) is None:
+            cr = await plugin.get_compute_resources().first()
+            name = self._default_resources[plugin.url] = cr.name
+        return name
+
+    async def _find(self, doubt: _InDoubt) -> list["PluginInstance"]:
+        """Plugin instances which might be the one described by `doubt`."""
+        query = {"plugin_id": doubt.plugin_id}
+        if doubt.previous_id is not None:
+            query["previous_id"] = doubt.previous_id
+        return await acollect(
+            self.client.plugin_instances(limit=self.page_size, **query)
+        )
+
+    def _start_polling(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while self._tracked or self._in_doubt or self._waiting:
+            await asyncio.sleep(self.interval)
+            if not (self._tracked or self._in_doubt):
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.debug("failed to refresh plugin instances: %s", e)
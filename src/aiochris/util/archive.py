@@ -0,0 +1,235 @@
+"""
+Streaming tar and zip archives of *CUBE* files.
+
+Files are downloaded with bounded concurrency and the archive is produced chunk
+by chunk, so it can be sent to a socket, an HTTP response, or a file without
+temporary copies. Memory usage is bounded by the number of files fetched
+ahead and the number of chunks buffered per file, regardless of file sizes.
+
+Examples
+--------
+
+Write every output of a feed to a tar file:
+
+```python
+from aiochris.util.archive import stream_archive
+
+with open("feed.tar", "wb") as f:
+    async for chunk in stream_archive(feed.get_files(), format="tar"):
+        f.write(chunk)
+```
+
+Serve a zip using `aiohttp.web`:
+
+```python
+async def handler(request):
+    res = web.StreamResponse(headers={"Content-Type": "application/zip"})
+    await res.prepare(request)
+    async for chunk in stream_archive(plinst.get_files(), format="zip"):
+        await res.write(chunk)
+    return res
+```
+"""
+
+import asyncio
+import contextlib
+import io
+import tarfile
+import time
+import zipfile
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from typing import Literal, Optional, TYPE_CHECKING
+
+from aiochris.util.payload import DEFAULT_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    from aiochris.models.logged_in import File
+
+ArchiveFormat = Literal["tar", "zip"]
+
+
+async def stream_archive(
+    files: AsyncIterable["File"],
+    format: ArchiveFormat = "tar",
+    concurrency: int = 4,
+    arcname: Callable[["File"], str] = lambda f: f.fname,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    buffer_chunks: int = 4,
+    mtime: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Produce a tar or zip archive of files, chunk by chunk.
+
+    Entries are in the order of `files`. Zip archives are uncompressed (*stored*),
+    and use ZIP64 extensions for large files.
+
+    If a file fails to download, the exception is raised and the archive is incomplete.
+
+    Parameters
+    ----------
+    files
+        files to archive, e.g. a `aiochris.util.search.Search`
+    format
+        `"tar"` or `"zip"`
+    concurrency
+        maximum number of files to download at the same time
+    arcname
+        function which maps a file to its name in the archive
+    chunk_size
+        number of bytes to download at a time
+    buffer_chunks
+        maximum number of chunks buffered per file which is downloaded ahead
+    mtime
+        modification time of entries. Default is the current time.
+    """
+    if format not in ("tar", "zip"):
+        raise ValueError(f'Unknown archive format: "{format}"')
+    mtime = time.time() if mtime is None else mtime
+    writer = _TarWriter() if format == "tar" else _ZipWriter()
+    entries = _prefetch(files, concurrency, chunk_size, buffer_chunks)
+    async with contextlib.aclosing(entries):
+        async for file, chunks in entries:
+            yield writer.start(arcname(file), file.fsize, mtime)
+            async for chunk in chunks:
+                if data := writer.write(chunk):
+                    yield data
+            if data := writer.end():
+                yield data
+    yield writer.close()
+
+
+_END = object()
+
+
+async def _prefetch(
+    files: AsyncIterable["File"],
+    concurrency: int,
+    chunk_size: int,
+    buffer_chunks: int,
+) -> AsyncIterator[tuple["File", AsyncIterator[bytes]]]:
+    """
+    Download up to `concurrency` files ahead, producing them in order.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency))
+    order: asyncio.Queue = asyncio.Queue()
+    tasks: set[asyncio.Task] = set()
+
+    async def fetch(file: "File", queue: asyncio.Queue) -> None:
+        try:
+            async for chunk in file.iter_chunks(chunk_size):
+                await queue.put(chunk)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+
+    async def produce() -> None:
+        try:
+            async for file in files:
+                await slots.acquire()
+                queue = asyncio.Queue(maxsize=max(1, buffer_chunks))
+                task = asyncio.create_task(fetch(file, queue))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await order.put((file, queue))
+            await order.put(_END)
+        except Exception as e:
+            await order.put(e)
+
+    async def drain(queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        while (item := await queue.get()) is not _END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await order.get()) is not _END:
+            if isinstance(item, Exception):
+                raise item
+            file, queue = item
+            yield file, drain(queue)
+            slots.release()
+    finally:
+        for task in (producer, *tasks):
+            task.cancel()
+        await asyncio.gather(producer, *tasks, return_exceptions=True)
+
+
+class _TarWriter:
+    def __init__(self):
+        self._offset = 0
+        self._size = 0
+
+    def start(self, name: str, size: int, mtime: float) -> bytes:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        self._size = size
+        header = info.tobuf(format=tarfile.PAX_FORMAT)
+        self._offset += len(header) + size
+        return header
+
+    def write(self, chunk: bytes) -> bytes:
+        return chunk
+
+    def end(self) -> bytes:
+        padding = -self._size % tarfile.BLOCKSIZE
+        self._offset += padding
+        return bytes(padding)
+
+    def close(self) -> bytes:
+        end = 2 * tarfile.BLOCKSIZE
+        end += -(self._offset + end) % tarfile.RECORDSIZE
+        return bytes(end)
+
+
+class _Buffer(io.RawIOBase):
+    """
+    An unseekable stream which keeps what is written until it is drained.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ZipWriter:
+    def __init__(self):
+        self._buffer = _Buffer()
+        self._zip = zipfile.ZipFile(
+            self._buffer, "w", compression=zipfile.ZIP_STORED, allowZip64=True
+        )
+        self._entry = None
+
+    def start(self, name: str, size: int, mtime: float) -> bytes:
+        info = zipfile.ZipInfo(name, date_time=time.localtime(mtime)[:6])
+        info.file_size = size
+        info.compress_type = zipfile.ZIP_STORED
+        info.external_attr = 0o644 << 16
+        self._entry = self._zip.open(info, "w", force_zip64=size > zipfile.ZIP64_LIMIT)
+        return self._buffer.drain()
+
+    def write(self, chunk: bytes) -> bytes:
+        self._entry.write(chunk)
+        return self._buffer.drain()
+
+    def end(self) -> bytes:
+        self._entry.close()
+        self._entry = None
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._buffer.drain()
@@ -0,0 +1,146 @@
+"""
+Creating many plugin instances of the same plugin with bounded concurrency.
+
+Examples
+--------
+
+```python
+failed = []
+async for result in plugin.create_instances(previous_list, concurrency=16, rate=50):
+    if not result.ok:
+        failed.append(result)
+for result in failed:
+    print(result.previous_id, result.error, result.request_data)
+```
+"""
+
+import asyncio
+import dataclasses
+import time
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from typing import Any, Optional, TYPE_CHECKING
+
+import aiohttp
+
+from aiochris.errors import BaseClientError
+from aiochris.util.admission import AdmissionController, Usage
+from aiochris.util.compute import ComputeResourceSelector
+from aiochris.util.parameters import ParameterCache
+
+if TYPE_CHECKING:
+    from aiochris.models.logged_in import Plugin, PluginInstance
+
+
+class RateLimiter:
+    """
+    Spaces out the starts of operations to at most `rate` per second.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.interval = 1 / rate
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until the next operation may start."""
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+@dataclasses.dataclass(frozen=True)
+class CreateResult:
+    """
+    Outcome of creating one plugin instance, produced by
+    `aiochris.models.logged_in.Plugin.create_instances`.
+    """
+
+    previous_id: int
+    """ID number of the previous plugin instance."""
+    plinst: Optional["PluginInstance"] = None
+    """The created plugin instance, if it was created."""
+    error: Optional[BaseException] = None
+    """Why the plugin instance could not be created, if it was not."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def request_data(self) -> Optional[Any]:
+        """Request body which was rejected, if the error was a `aiochris.errors.StatusError`."""
+        return getattr(self.error, "request_data", None)
+
+
+async def create_instances(
+    plugin: "Plugin",
+    previous: Iterable["PluginInstance | int"],
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    params: Mapping[str, Any] = None,
+    validate: "bool | ParameterCache" = True,
+    selector: Optional[ComputeResourceSelector] = None,
+    admission: Optional[AdmissionController] = None,
+) -> AsyncIterator[CreateResult]:
+    """
+    Create a plugin instance after each of `previous`, producing results as they complete.
+
+    See `aiochris.models.logged_in.Plugin.create_instances`.
+    """
+    params = dict(params or {})
+    if validate:
+        cache = ParameterCache.default() if validate is True else validate
+        params = (await cache.get(plugin)).validate(params)
+    if admission is not None:
+        Usage.of_params(params)  # raises ValueError for malformed quantities
+    limiter = None if rate is None else RateLimiter(rate)
+    previous_ids = iter(p if isinstance(p, int) else p.id for p in previous)
+    results: asyncio.Queue = asyncio.Queue(maxsize=2 * max(1, concurrency))
+    done = object()
+
+    async def create_one(previous_id: int) -> CreateResult:
+        if limiter is not None:
+            await limiter.acquire()
+        extra = {}
+        try:
+            if selector is not None and "compute_resource_name" not in params:
+                extra["compute_resource_name"] = await selector.select(plugin)
+            body = {"previous_id": previous_id, **params, **extra}
+            if admission is None:
+                plinst = await plugin._create_instance_raw(**body)
+            else:
+                plinst = await admission.submit(plugin, body)
+        except (
+            aiohttp.ClientError,
+            BaseClientError,
+            asyncio.TimeoutError,
+            ValueError,  # no eligible compute resource, or more than its budget
+        ) as e:
+            return CreateResult(previous_id, error=e)
+        return CreateResult(previous_id, plinst=plinst)
+
+    async def worker() -> None:
+        for previous_id in previous_ids:
+            await results.put(await create_one(previous_id))
+
+    async def finish(workers: Sequence[asyncio.Task]) -> None:
+        try:
+            await asyncio.gather(*workers)
+        except Exception as e:
+            await results.put(e)
+        await results.put(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    tasks = [*workers, asyncio.create_task(finish(workers))]
+    try:
+        while (item := await results.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
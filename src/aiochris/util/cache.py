@@ -0,0 +1,359 @@
+"""
+An on-disk cache of downloaded *CUBE* files.
+
+Files are keyed by their `file_resource` URL and `fsize`. The cache has a size
+budget: when it is exceeded, the least recently used files are evicted.
+Concurrent downloads of the same file are deduplicated, both between tasks
+and between processes on the same host which share a cache directory.
+
+Examples
+--------
+
+```python
+from aiochris.util.cache import FileCache
+
+cache = FileCache("~/.cache/aiochris", max_bytes=50 * 1024**3)
+await file.download("./brain.nii.gz", cache=cache)  # downloaded
+await file.download("./copy.nii.gz", cache=cache)   # copied from the cache
+```
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import weakref
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+import aiohttp
+
+from aiochris.util.download import (
+    DEFAULT_PART_SIZE,
+    download_ranges,
+    iter_response,
+    write_file,
+)
+from aiochris.util.payload import DEFAULT_CHUNK_SIZE, read_file
+
+if TYPE_CHECKING:
+    from aiochris.models.logged_in import File
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Counters of a `FileCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+
+
+class FileCache:
+    """
+    A directory of cached file downloads with a size budget and LRU eviction.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: Optional[int] = None,
+        revalidate: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        directory
+            where to store cached files. It may be shared by several processes.
+        max_bytes
+            size budget of the cache. `None` means unlimited.
+        revalidate
+            If `True` and the server gave an `ETag` for a cached file, then a
+            conditional request is made to check that the cached file is still
+            current before it is used.
+        """
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self.stats = CacheStats()
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    @staticmethod
+    def key(url: str, fsize: int) -> str:
+        """Cache key of a file."""
+        return hashlib.sha256(f"{url}\0{fsize}".encode()).hexdigest()
+
+    async def get(
+        self,
+        file: "File",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        concurrency: int = 1,
+        part_size: int = DEFAULT_PART_SIZE,
+    ) -> Path:
+        """
+        Get the path of a cached file, downloading it if it is not cached.
+
+        The returned path must not be modified.
+        See `aiochris.models.logged_in.File.download` for the other parameters.
+        """
+        key = self.key(file.file_resource, file.fsize)
+        data = self._data_path(key)
+        if await self._is_cached(file, key):
+            self.stats.hits += 1
+            return data
+        async with self._lock(key):
+            if await self._is_cached(file, key):
+                self.stats.hits += 1
+                return data
+            self.stats.misses += 1
+            etag = await self._download(file, data, chunk_size, concurrency, part_size)
+            await asyncio.to_thread(
+                self._write_meta, key, {"url": file.file_resource, "etag": etag}
+            )
+        if self.max_bytes is not None:
+            await asyncio.to_thread(self._evict, data)
+        return data
+
+    async def copy(self, file: "File", path: str | os.PathLike, **kwargs) -> Path:
+        """
+        Copy a file from the cache to `path`, downloading it if it is not cached.
+        """
+        path = Path(path)
+        async with self._pinned(file, **kwargs) as cached:
+            await asyncio.to_thread(_copy, cached, path)
+        return path
+
+    async def iter_chunks(
+        self, file: "File", chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Read a file from the cache, downloading it if it is not cached.
+        """
+        async with self._pinned(file, chunk_size=chunk_size) as cached:
+            async for chunk in read_file(cached, chunk_size):
+                yield chunk
+
+    def size(self) -> int:
+        """Total size of cached files, in bytes."""
+        return sum(st.st_size for _, st in self._entries())
+
+    @contextlib.asynccontextmanager
+    async def _pinned(self, file: "File", **kwargs) -> AsyncIterator[Path]:
+        """
+        Get the path of a cached file, which is not evicted until the context exits.
+        """
+        key = self.key(file.file_resource, file.fsize)
+        while True:
+            cached = await self.get(file, **kwargs)
+            async with self._reading(key):
+                if await asyncio.to_thread(_has_size, cached, file.fsize):
+                    yield cached
+                    return
+            # evicted by another task or process between get and _reading
+
+    async def _download(
+        self,
+        file: "File",
+        data: Path,
+        chunk_size: int,
+        concurrency: int,
+        part_size: int,
+    ) -> Optional[str]:
+        etag = None
+
+        def on_response(res: aiohttp.ClientResponse) -> None:
+            nonlocal etag
+            etag = res.headers.get("ETag")
+
+        if concurrency > 1 and file.fsize > part_size:
+            await download_ranges(
+                file.s,
+                file.file_resource,
+                data,
+                file.fsize,
+                concurrency,
+                part_size,
+                chunk_size,
+                on_response,
+            )
+        else:
+            chunks = iter_response(
+                file.s, file.file_resource, file.fsize, chunk_size, on_response
+            )
+            await write_file(chunks, data)
+        return etag
+
+    async def _is_cached(self, file: "File", key: str) -> bool:
+        data = self._data_path(key)
+        try:
+            stat = await asyncio.to_thread(data.stat)
+        except FileNotFoundError:
+            return False
+        if stat.st_size != file.fsize:
+            return False
+        if self.revalidate and not await self._is_current(file, key):
+            return False
+        with contextlib.suppress(FileNotFoundError):
+            await asyncio.to_thread(os.utime, data)  # mark as recently used
+        return True
+
+    async def _is_current(self, file: "File", key: str) -> bool:
+        etag = (await asyncio.to_thread(self._read_meta, key)).get("etag")
+        if etag is None:
+            return True
+        headers = {"If-None-Match": etag}
+        async with file.s.get(file.file_resource, headers=headers) as res:
+            return res.status == 304
+
+    def _data_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read_meta(self, key: str) -> dict:
+        try:
+            return json.loads(self._meta_path(key).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        path = self._meta_path(key)
+        partial = path.with_name(path.name + ".part")
+        partial.write_text(json.dumps(meta))
+        os.replace(partial, path)
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.directory.glob("??/*"):
+            if path.suffix:  # metadata, partial downloads, locks
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                entries.append((path, path.stat()))
+        return entries
+
+    def _evict(self, keep: Path) -> None:
+        """
+        Delete the least recently used files until the cache is within its budget.
+        Files which are being read or downloaded are skipped.
+        """
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime_ns)
+        total = sum(st.st_size for _, st in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            fd = self._open_lock(path.name)
+            try:
+                if not _try_lock_fd(fd):
+                    continue
+                try:
+                    with contextlib.suppress(FileNotFoundError):
+                        path.unlink()
+                        self._meta_path(path.name).unlink(missing_ok=True)
+                        self.stats.evictions += 1
+                        self.stats.evicted_bytes += stat.st_size
+                finally:
+                    _unlock_fd(fd)
+            finally:
+                os.close(fd)
+            total -= stat.st_size
+
+    def _open_lock(self, key: str) -> int:
+        lock_path = self.directory / key[:2] / f"{key}.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(lock_path, os.O_RDWR | os.O_CREAT)
+
+    @contextlib.asynccontextmanager
+    async def _lock(self, key: str) -> AsyncIterator[None]:
+        """
+        Lock a key, first between tasks of this process, then between processes.
+        """
+        if (task_lock := self._locks.get(key)) is None:
+            task_lock = self._locks[key] = asyncio.Lock()
+        async with task_lock:
+            fd = await asyncio.to_thread(self._open_lock, key)
+            try:
+                await asyncio.to_thread(_lock_fd, fd)
+                try:
+                    yield
+                finally:
+                    _unlock_fd(fd)
+            finally:
+                os.close(fd)
+
+    @contextlib.asynccontextmanager
+    async def _reading(self, key: str) -> AsyncIterator[None]:
+        """
+        Share-lock a key, so that its file is not evicted while it is read.
+        """
+        fd = await asyncio.to_thread(self._open_lock, key)
+        try:
+            await asyncio.to_thread(_lock_fd, fd, True)
+            try:
+                yield
+            finally:
+                _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+
+def _lock_fd(fd: int, shared: bool = False) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return
+    # msvcrt has no shared locks, so readers of the same file take turns
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:  # gave up after 10 seconds, try again
+            continue
+
+
+def _try_lock_fd(fd: int) -> bool:
+    """Lock exclusively if no one else holds a lock."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock_fd(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _copy(src: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    partial = dst.with_name(dst.name + ".part")
+    shutil.copyfile(src, partial)
+    os.replace(partial, dst)
+
+
+def _has_size(path: Path, size: int) -> bool:
+    try:
+        return path.stat().st_size == size
+    except FileNotFoundError:
+        return False
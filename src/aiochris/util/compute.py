@@ -0,0 +1,175 @@
+"""
+Choosing the least loaded compute resource for new plugin instances.
+
+Examples
+--------
+
+```python
+from aiochris.util.compute import ComputeResourceSelector
+
+selector = ComputeResourceSelector(chris)
+name = await selector.select(plugin)
+await plugin.create_instance(previous=plinst, compute_resource_name=name)
+
+# or for many plugin instances
+async for result in plugin.create_instances(previous_list, selector=selector):
+    ...
+```
+"""
+
+import asyncio
+import dataclasses
+import time
+from collections.abc import Callable, Sequence
+from typing import Optional, TYPE_CHECKING
+
+from aiochris.enums import Status
+from aiochris.util.search import acollect
+
+if TYPE_CHECKING:
+    from aiochris.client.authed import AuthenticatedClient
+    from aiochris.models.public import ComputeResource, PublicPlugin
+
+QUEUED_STATUSES = (Status.created, Status.waiting, Status.scheduled)
+"""Statuses of plugin instances which are waiting for a compute resource."""
+
+RUNNING_STATUSES = (Status.started, Status.registeringFiles)
+"""Statuses of plugin instances which are using a compute resource."""
+
+
+@dataclasses.dataclass(frozen=True)
+class ComputeLoad:
+    """Plugin instances of a compute resource which are not finished."""
+
+    name: str
+    queued: int
+    running: int
+    measured: float
+    """Time when the counts were measured, according to the selector's clock."""
+
+    @property
+    def total(self) -> int:
+        return self.queued + self.running
+
+
+class ComputeResourceSelector:
+    """
+    Picks the compute resource of a plugin which has the fewest unfinished
+    plugin instances.
+
+    The load of a compute resource is counted using one `limit=1` search of
+    plugin instances per unfinished status, and is reused for `ttl` seconds.
+    Plugin instances which were assigned by this selector since the count
+    started are added to it, so that a batch of plugin instances is spread out
+    over the compute resources instead of being sent to whichever was least
+    loaded at the start of the batch.
+    """
+
+    def __init__(
+        self,
+        client: "AuthenticatedClient",
+        ttl: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Parameters
+        ----------
+        client
+            client used to search for plugin instances
+        ttl
+            Number of seconds for which the load of a compute resource is reused
+        clock
+            Source of time, in seconds
+        """
+        self.client = client
+        self.ttl = ttl
+        self.clock = clock
+        self.requests = 0
+        """Number of count queries made."""
+        self._loads: dict[str, ComputeLoad] = {}
+        self._assigned: dict[str, list[float]] = {}
+        """Times when plugin instances were assigned to each compute resource."""
+        self._measuring: dict[str, asyncio.Task] = {}
+        self._plugin_resources: dict[str, Sequence["ComputeResource"]] = {}
+
+    async def load(self, name: str) -> ComputeLoad:
+        """
+        Count the unfinished plugin instances of a compute resource,
+        unless they were counted in the last `ttl` seconds.
+        """
+        cached = self._loads.get(name)
+        if cached is not None and self.clock() - cached.measured <= self.ttl:
+            return cached
+        if (task := self._measuring.get(name)) is None or task.done():
+            task = self._measuring[name] = asyncio.create_task(self._measure(name))
+        return await asyncio.shield(task)
+
+    async def select(
+        self, plugin: "PublicPlugin", min_exec_seconds: Optional[int] = None
+    ) -> str:
+        """
+        Get the name of the least loaded compute resource of a plugin.
+
+        Ties are broken in favor of the compute resource with the longest
+        `max_job_exec_seconds`, then by name.
+
+        Parameters
+        ----------
+        plugin
+            the plugin of the new plugin instance
+        min_exec_seconds
+            If given, compute resources whose `max_job_exec_seconds` is less
+            than this are not considered.
+
+        Raises
+        ------
+        ValueError
+            If the plugin has no eligible compute resource.
+        """
+        resources = [
+            cr
+            for cr in await self._resources_of(plugin)
+            if min_exec_seconds is None or cr.max_job_exec_seconds >= min_exec_seconds
+        ]
+        if not resources:
+            raise ValueError(f"No eligible compute resource for {plugin.name}")
+        loads = await asyncio.gather(*(self.load(cr.name) for cr in resources))
+        best, _ = min(
+            zip(resources, loads),
+            key=lambda pair: (
+                pair[1].total + len(self._assigned.get(pair[0].name, ())),
+                -pair[0].max_job_exec_seconds,
+                pair[0].name,
+            ),
+        )
+        best = best.name
+        self._assigned.setdefault(best, []).append(self.clock())
+        return best
+
+    async def _resources_of(
+        self, plugin: "PublicPlugin"
+    ) -> Sequence["ComputeResource"]:
+        if (resources := self._plugin_resources.get(plugin.url)) is None:
+            resources = await acollect(plugin.get_compute_resources())
+            self._plugin_resources[plugin.url] = resources
+        return resources
+
+    async def _measure(self, name: str) -> ComputeLoad:
+        started = self.clock()
+        statuses = QUEUED_STATUSES + RUNNING_STATUSES
+        self.requests += len(statuses)
+        counts = await asyncio.gather(
+            *(
+                self.client.plugin_instances(
+                    compute_resource_name=name, status=status.value
+                ).count()
+                for status in statuses
+            )
+        )
+        queued = sum(counts[: len(QUEUED_STATUSES)])
+        load = ComputeLoad(name, queued, sum(counts) - queued, self.clock())
+        self._loads[name] = load
+        # plugin instances assigned before the count started are counted by it,
+        # but those assigned since then might not have been created yet
+        self._assigned[name] = [t for t in self._assigned.get(name, ()) if t >= started]
+        return load
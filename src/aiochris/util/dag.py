@@ -0,0 +1,256 @@
+"""
+Launching graphs of plugin instances which are not registered as pipelines.
+
+Examples
+--------
+
+```python
+from aiochris.util.dag import Dag
+
+dag = Dag()
+root = dag.add("pl-dircopy", dir="chris/uploads/subject1")
+masks = [dag.add("pl-mask", previous=root, threshold=t) for t in (0.1, 0.2, 0.3)]
+for mask in masks:
+    dag.add("pl-stats", previous=mask)
+
+run = await dag.launch(chris)
+assert run.ok
+elapsed, plinsts = await run.wait()
+```
+"""
+
+import asyncio
+import dataclasses
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, Optional, TYPE_CHECKING
+
+from aiochris.enums import Status
+from aiochris.util.search import NoneSearchError, acollect
+from aiochris.util.wait import FINAL_STATUSES, WaitManager
+
+if TYPE_CHECKING:
+    from aiochris.client.authed import AuthenticatedClient
+    from aiochris.models.logged_in import Plugin, PluginInstance
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class DagNode:
+    """
+    A plugin instance to create, produced by `Dag.add`.
+    """
+
+    plugin: "Plugin | str"
+    """The plugin, or the name of the plugin."""
+    version: Optional[str]
+    """Version of the plugin, if `plugin` is a name. `None` means the latest version."""
+    params: Mapping[str, Any]
+    """Parameters of the plugin instance."""
+    previous: "Optional[DagNode | PluginInstance]"
+    """Node or existing plugin instance which this plugin instance runs after."""
+
+    @property
+    def key(self) -> tuple[str, Optional[str]]:
+        """Name and version of the plugin."""
+        if isinstance(self.plugin, str):
+            return self.plugin, self.version
+        return self.plugin.name, self.plugin.version
+
+
+class Dag:
+    """
+    A directed acyclic graph of plugin instances to create, where edges are
+    `previous` relationships.
+
+    Nodes can only be added after their previous node, so the order in which
+    nodes are added is a topological order and there cannot be cycles.
+    """
+
+    def __init__(self):
+        self.nodes: list[DagNode] = []
+
+    def add(
+        self,
+        plugin: "Plugin | str",
+        previous: "Optional[DagNode | PluginInstance]" = None,
+        version: Optional[str] = None,
+        **params,
+    ) -> DagNode:
+        """
+        Add a plugin instance to create.
+
+        Parameters
+        ----------
+        plugin
+            The plugin, or the name of a plugin to look up when the DAG is launched.
+        previous
+            Node of this DAG or existing plugin instance which this plugin instance runs after.
+        version
+            Version of the plugin if `plugin` is a name. By default, the latest version.
+        params
+            Parameters of the plugin instance, passed to `aiochris.models.logged_in.Plugin.create_instance`
+        """
+        if isinstance(previous, DagNode) and not any(n is previous for n in self.nodes):
+            raise ValueError(f"{previous} is not a node of this DAG.")
+        node = DagNode(plugin, version, params, previous)
+        self.nodes.append(node)
+        return node
+
+    def children(self) -> dict[DagNode, list[DagNode]]:
+        """Nodes which run after each node."""
+        children = {node: [] for node in self.nodes}
+        for node in self.nodes:
+            if isinstance(node.previous, DagNode):
+                children[node.previous].append(node)
+        return children
+
+    async def launch(
+        self, client: "AuthenticatedClient", concurrency: int = 8
+    ) -> "DagRun":
+        """
+        Create the plugin instances of this DAG.
+
+        Plugins given by name are searched for once per name and version.
+        Every plugin instance is created as soon as the plugin instance before it
+        was created, without waiting for it to finish since *CUBE* queues it,
+        so sibling branches are created concurrently.
+
+        If a plugin instance could not be created, the plugin instances after it
+        are not created either. Check `DagRun.ok`!
+
+        Parameters
+        ----------
+        client
+            client used to search for plugins and create plugin instances
+        concurrency
+            maximum number of plugin instances to create at the same time
+        """
+        plugins = await resolve_plugins(
+            client, (n.key for n in self.nodes if isinstance(n.plugin, str))
+        )
+        children = self.children()
+        run = DagRun(self)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def create(node: DagNode, previous: "Optional[PluginInstance]") -> None:
+            plugin = plugins[node.key] if isinstance(node.plugin, str) else node.plugin
+            try:
+                async with semaphore:
+                    plinst = await plugin.create_instance(
+                        previous=previous, **node.params
+                    )
+            except Exception as e:
+                run.failed[node] = e
+                run.skipped.extend(_descendants(children, node))
+                return
+            run.instances[node] = plinst
+            await asyncio.gather(*(create(c, plinst) for c in children[node]))
+
+        await asyncio.gather(
+            *(
+                create(node, node.previous)
+                for node in self.nodes
+                if not isinstance(node.previous, DagNode)
+            )
+        )
+        return run
+
+
+@dataclasses.dataclass(eq=False)
+class DagRun(Mapping[DagNode, "PluginInstance"]):
+    """
+    The plugin instances created by `Dag.launch`, by node.
+    """
+
+    dag: Dag
+    instances: dict[DagNode, "PluginInstance"] = dataclasses.field(default_factory=dict)
+    """Plugin instances which were created."""
+    failed: dict[DagNode, BaseException] = dataclasses.field(default_factory=dict)
+    """Errors by nodes whose plugin instance could not be created."""
+    skipped: list[DagNode] = dataclasses.field(default_factory=list)
+    """Nodes which were not created because a node before them failed."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether every plugin instance was created."""
+        return not self.failed
+
+    def __getitem__(self, node: DagNode) -> "PluginInstance":
+        return self.instances[node]
+
+    def __iter__(self) -> Iterator[DagNode]:
+        return iter(self.instances)
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    async def wait(
+        self,
+        status: Status | Sequence[Status] = FINAL_STATUSES,
+        timeout: float = 300.0,
+        manager: Optional[WaitManager] = None,
+        **kwargs,
+    ) -> tuple[float, dict[DagNode, "PluginInstance"]]:
+        """
+        Wait until every created plugin instance finishes (or some other desired status).
+
+        Parameters
+        ----------
+        manager
+            If given, statuses are polled in batches. Recommended for large DAGs,
+            see `aiochris.util.wait.WaitManager`.
+        kwargs
+            passed to `aiochris.models.logged_in.PluginInstance.wait`
+
+        Returns
+        -------
+        elapsed_seconds
+            Number of seconds elapsed and the last states of the plugin instances.
+            Plugin instances which timed out are included too. Make sure you check
+            their statuses!
+        """
+        start = time.monotonic()
+        nodes = list(self.instances)
+        results = await asyncio.gather(
+            *(
+                self.instances[n].wait(
+                    status, float(timeout), manager=manager, **kwargs
+                )
+                for n in nodes
+            )
+        )
+        return time.monotonic() - start, {
+            n: plinst for n, (_, plinst) in zip(nodes, results)
+        }
+
+
+async def resolve_plugins(
+    client: "AuthenticatedClient", keys: Iterable[tuple[str, Optional[str]]]
+) -> dict[tuple[str, Optional[str]], "Plugin"]:
+    """
+    Search for plugins by name and version, once per name and version.
+
+    If the version is `None`, the most recently registered version is chosen.
+    """
+    keys = set(keys)
+    plugins = await asyncio.gather(*(_get_plugin(client, *k) for k in keys))
+    return dict(zip(keys, plugins))
+
+
+async def _get_plugin(
+    client: "AuthenticatedClient", name: str, version: Optional[str]
+) -> "Plugin":
+    if version is not None:
+        return await client.search_plugins(name_exact=name, version=version).get_only()
+    versions = await acollect(client.search_plugins(name_exact=name))
+    if not versions:
+        raise NoneSearchError(client.search_plugins(name_exact=name).url)
+    return max(versions, key=lambda p: p.id)
+
+
+def _descendants(
+    children: dict[DagNode, list[DagNode]], node: DagNode
+) -> Iterator[DagNode]:
+    for child in children[node]:
+        yield child
+        yield from _descendants(children, child)
@@ -0,0 +1,212 @@
+"""
+Opt-in diagnostics for finding inefficient request patterns.
+
+A `RequestWatcher` observes the HTTP requests made by *aiochris* clients
+within its context. It detects the "N+1 request" anti-pattern, which is
+where a link method (such as `aiochris.models.logged_in.PluginInstance.get_feed`)
+is called once per item of a `aiochris.util.search.Search`, and it logs
+requests which are slower than a threshold.
+
+Examples
+--------
+
+```python
+from aiochris.util.diagnostics import RequestWatcher
+
+with RequestWatcher(repeat_threshold=10, slow_threshold=0.5):
+    async for plinst in chris.plugin_instances(feed_id=4):
+        feed = await plinst.get_feed()  # warns after 10 iterations
+```
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import dataclasses
+import logging
+import os
+import traceback
+import warnings
+import weakref
+from collections.abc import Iterator
+from typing import Optional, Self
+
+import aiohttp
+import yarl
+
+logger = logging.getLogger(__name__)
+
+_current_watcher: contextvars.ContextVar[Optional["RequestWatcher"]] = (
+    contextvars.ContextVar("aiochris_request_watcher", default=None)
+)
+
+_AIOCHRIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RepeatedRequestWarning(UserWarning):
+    """
+    The same link was requested many times in a row during the iteration of a search.
+    This usually means a request is being made for every item of a search.
+    """
+
+    pass
+
+
+@dataclasses.dataclass
+class _TaskState:
+    """Request pattern of a single `asyncio.Task`."""
+
+    searches: int = 0
+    """Number of searches which this task is currently iterating over."""
+    link_name: Optional[str] = None
+    """Name of the most recently requested link."""
+    repeats: int = 0
+    """Number of times `link_name` was requested in a row."""
+    warned: bool = False
+    """Whether a warning was issued for the current run of `link_name`."""
+
+    @property
+    def iterating(self) -> bool:
+        """Whether this task is iterating over a search."""
+        return self.searches > 0
+
+    def reset_run(self) -> None:
+        """Forget the most recently requested link."""
+        self.link_name = None
+        self.repeats = 0
+        self.warned = False
+
+
+@dataclasses.dataclass
+class RequestWatcher:
+    """
+    A context manager which watches for inefficient HTTP requests.
+
+    While active, every request made by *aiochris* in the same context
+    (including tasks created within the context) is observed.
+    Request patterns are tracked separately per `asyncio.Task`.
+    """
+
+    repeat_threshold: Optional[int] = 10
+    """
+    Issue a `RepeatedRequestWarning` when the same link is requested more than
+    this many times in a row while a search is being iterated over.
+    `None` disables the check.
+    """
+    slow_threshold: Optional[float] = 1.0
+    """
+    Log requests which take longer than this number of seconds.
+    `None` disables the check.
+    """
+    stack_depth: int = 5
+    """Number of stack frames to show in the warning's summary."""
+
+    _tasks: weakref.WeakKeyDictionary = dataclasses.field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False
+    )
+    _token: Optional[contextvars.Token] = dataclasses.field(
+        default=None, init=False, repr=False
+    )
+
+    def __enter__(self) -> Self:
+        if self._token is not None:
+            raise RuntimeError(f"{self} is already active")
+        self._token = _current_watcher.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current_watcher.reset(self._token)
+        self._token = None
+
+    def record_call(self, link_name: str) -> None:
+        """
+        Called when a method decorated by `aiochris.link.http` is called.
+        """
+        state = self._task_state()
+        if state is None:
+            return
+        if state.link_name != link_name:
+            state.reset_run()
+            state.link_name = link_name
+        state.repeats += 1
+        if (
+            self.repeat_threshold is not None
+            and state.iterating
+            and not state.warned
+            and state.repeats > self.repeat_threshold
+        ):
+            state.warned = True
+            warnings.warn(
+                RepeatedRequestWarning(
+                    f'Link "{link_name}" was requested {state.repeats} times in a row '
+                    "while iterating over a search. Is a request being made for every item?\n"
+                    + self._stack_summary()
+                ),
+                stacklevel=2,
+            )
+
+    @contextlib.contextmanager
+    def record_search(self, url: yarl.URL | str) -> Iterator[None]:
+        """
+        Context of the pages of a `aiochris.util.search.Search` being requested,
+        from its first page until it is exhausted or closed.
+
+        Repeated requests are only counted while a search is being iterated over,
+        so the count starts over when the outermost search of a task starts and ends.
+        """
+        state = self._task_state()
+        if state is None:
+            yield
+            return
+        if state.searches == 0:
+            state.reset_run()
+        state.searches += 1
+        try:
+            yield
+        finally:
+            state.searches -= 1
+            if state.searches == 0:
+                state.reset_run()
+
+    def record_response(
+        self, res: aiohttp.ClientResponse, elapsed: float, payload_size: int
+    ) -> None:
+        """
+        Called after the body of a response was received.
+        """
+        if self.slow_threshold is None or elapsed <= self.slow_threshold:
+            return
+        logger.warning(
+            "slow request: %s %s took %.3fs (status=%d, payload=%d bytes)",
+            res.method,
+            res.url,
+            elapsed,
+            res.status,
+            payload_size,
+        )
+
+    def _task_state(self) -> Optional[_TaskState]:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        if (state := self._tasks.get(task)) is None:
+            state = self._tasks[task] = _TaskState()
+        return state
+
+    def _stack_summary(self) -> str:
+        frames = [
+            frame
+            for frame in traceback.extract_stack()
+            if not os.path.abspath(frame.filename).startswith(_AIOCHRIS_DIR)
+        ]
+        return "".join(traceback.format_list(frames[-self.stack_depth :]))
+
+
+def current_watcher() -> Optional[RequestWatcher]:
+    """
+    Get the active `RequestWatcher`, if any.
+    """
+    return _current_watcher.get()
@@ -0,0 +1,468 @@
+"""
+Helpers for streaming downloads to local files without blocking the event loop.
+"""
+
+import asyncio
+import collections
+import os
+import threading
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from pathlib import Path, PurePosixPath
+from typing import Optional, Any, TYPE_CHECKING
+
+import aiohttp
+
+from aiochris.errors import (
+    raise_for_status,
+    BaseClientError,
+    DownloadSizeError,
+    NonsenseResponseError,
+)
+from aiochris.util.payload import DEFAULT_CHUNK_SIZE
+from aiochris.util.transfer import (
+    ProgressCallback,
+    SyncReport,
+    TransferProgress,
+    TransferReport,
+)
+
+if TYPE_CHECKING:
+    from aiochris.models.logged_in import File
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+"""Size of byte ranges for parallel downloads."""
+
+ResponseCallback = Callable[[aiohttp.ClientResponse], Any]
+"""A function which is given the response of a download, before its body is read."""
+
+
+async def iter_response(
+    session: aiohttp.ClientSession,
+    url: str,
+    expected_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_response: Optional[ResponseCallback] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the body of a GET request in chunks of `chunk_size` bytes
+    (except for the last chunk, which may be smaller).
+
+    Raises
+    ------
+    aiochris.errors.DownloadSizeError
+        If the size of the body is not `expected_size`.
+    """
+    async with session.get(url) as res:
+        await raise_for_status(res)
+        if on_response is not None:
+            on_response(res)
+        received = 0
+        while True:
+            try:
+                chunk = await res.content.readexactly(chunk_size)
+            except asyncio.IncompleteReadError as e:
+                chunk = e.partial
+            if not chunk:
+                break
+            received += len(chunk)
+            if received > expected_size:
+                raise DownloadSizeError(url, expected_size, received)
+            yield chunk
+            if len(chunk) < chunk_size:
+                break
+        if received != expected_size:
+            raise DownloadSizeError(url, expected_size, received)
+
+
+async def write_file(chunks: AsyncIterable[bytes], path: str | os.PathLike) -> int:
+    """
+    Write chunks to a file using a thread pool.
+
+    Each chunk is written while the next one is being received, so at most two
+    chunks are held in memory. The data is written to a temporary file next to
+    `path` which is renamed to `path` when complete. Parent directories are created
+    as needed.
+
+    Returns
+    -------
+    int
+        number of bytes written
+    """
+    path = Path(path)
+    partial = path.with_name(path.name + ".part")
+    await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+    f = await asyncio.to_thread(open, partial, "wb")
+    written = 0
+    pending = None
+    try:
+        async for chunk in chunks:
+            if pending is not None:
+                await pending
+            pending = asyncio.ensure_future(asyncio.to_thread(f.write, chunk))
+            written += len(chunk)
+        if pending is not None:
+            await pending
+    except BaseException:
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+        await asyncio.to_thread(_discard, f, partial)
+        raise
+    await asyncio.to_thread(f.close)
+    await asyncio.to_thread(os.replace, partial, path)
+    return written
+
+
+def _discard(f, partial: Path) -> None:
+    f.close()
+    partial.unlink(missing_ok=True)
+
+
+async def download_ranges(
+    session: aiohttp.ClientSession,
+    url: str,
+    path: str | os.PathLike,
+    fsize: int,
+    concurrency: int,
+    part_size: int = DEFAULT_PART_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_response: Optional[ResponseCallback] = None,
+) -> None:
+    """
+    Download a file by requesting byte ranges of it concurrently.
+
+    The output file is preallocated, and each range is written at its offset using
+    a thread pool. If the server does not respond to the first request with
+    "206 Partial Content", then its response, which is the whole file, is written
+    instead and no other request is made.
+
+    Like `write_file`, data is written to `{path}.part` which is renamed to `path`
+    when complete.
+
+    Raises
+    ------
+    aiochris.errors.DownloadSizeError
+        If the size of the file or of a range is not as expected.
+    """
+    path = Path(path)
+    partial = path.with_name(path.name + ".part")
+    await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+    flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = await asyncio.to_thread(os.open, partial, flags, 0o666)
+    writer = _PositionalWriter(fd)
+    try:
+        await asyncio.to_thread(os.ftruncate, fd, fsize)
+        parts = collections.deque(
+            (start, min(start + part_size, fsize))
+            for start in range(0, fsize, part_size)
+        )
+        if parts:
+            first = parts.popleft()
+            ranged = await _get_part(
+                session, url, writer, fsize, *first, chunk_size, on_response
+            )
+            if not ranged:
+                parts.clear()
+
+        async def worker() -> None:
+            while parts:
+                start, end = parts.popleft()
+                if not await _get_part(
+                    session, url, writer, fsize, start, end, chunk_size
+                ):
+                    raise NonsenseResponseError(
+                        f"{url} stopped responding to Range requests"
+                    )
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(min(concurrency, len(parts)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    except BaseException:
+        await asyncio.to_thread(os.close, fd)
+        await asyncio.to_thread(partial.unlink, missing_ok=True)
+        raise
+    await asyncio.to_thread(os.close, fd)
+    await asyncio.to_thread(os.replace, partial, path)
+
+
+async def _get_part(
+    session: aiohttp.ClientSession,
+    url: str,
+    writer: "_PositionalWriter",
+    fsize: int,
+    start: int,
+    end: int,
+    chunk_size: int,
+    on_response: Optional[ResponseCallback] = None,
+) -> bool:
+    """
+    Request the bytes `[start, end)` of a file and write them.
+
+    Returns
+    -------
+    bool
+        `False` if the server ignored the `Range` header and the whole file was written.
+    """
+    headers = {"Range": f"bytes={start}-{end - 1}"}
+    async with session.get(url, headers=headers) as res:
+        await raise_for_status(res)
+        if on_response is not None:
+            on_response(res)
+        if res.status == 206:
+            content_range = res.headers.get("Content-Range", "")
+            if content_range != f"bytes {start}-{end - 1}/{fsize}":
+                total = content_range.rpartition("/")[2]
+                if total.isdigit() and int(total) != fsize:
+                    raise DownloadSizeError(url, fsize, int(total))
+                raise NonsenseResponseError(
+                    f"requested bytes {start}-{end - 1} of {url}, "
+                    f'got Content-Range "{content_range}"'
+                )
+            expected, ranged = end - start, True
+        else:
+            start, expected, ranged = 0, fsize, False
+        written = await writer.write_stream(
+            res.content.iter_chunked(chunk_size), start, expected
+        )
+    if written != expected:
+        raise DownloadSizeError(url, expected, written)
+    return ranged
+
+
+class _PositionalWriter:
+    """
+    Writes to offsets of a file from a thread pool.
+    """
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self._lock = None if hasattr(os, "pwrite") else threading.Lock()
+
+    def pwrite(self, data: bytes, offset: int) -> None:
+        view = memoryview(data)
+        if self._lock is None:
+            while view:
+                n = os.pwrite(self.fd, view, offset)
+                view, offset = view[n:], offset + n
+            return
+        with self._lock:  # Windows does not have os.pwrite
+            os.lseek(self.fd, offset, os.SEEK_SET)
+            while view:
+                view = view[os.write(self.fd, view) :]
+
+    async def write_stream(
+        self, chunks: AsyncIterable[bytes], offset: int, limit: int
+    ) -> int:
+        """
+        Write chunks starting at `offset`. Each chunk is written while the next one
+        is being received. Stops early if more than `limit` bytes are received.
+
+        Returns
+        -------
+        int
+            number of bytes received
+        """
+        received = 0
+        pending = None
+        try:
+            async for chunk in chunks:
+                if received + len(chunk) > limit:
+                    return received + len(chunk)
+                if pending is not None:
+                    await pending
+                pending = asyncio.ensure_future(
+                    asyncio.to_thread(self.pwrite, chunk, offset + received)
+                )
+                received += len(chunk)
+            if pending is not None:
+                await pending
+        finally:
+            if pending is not None and not pending.done():
+                await asyncio.gather(pending, return_exceptions=True)
+        return received
+
+
+async def download_files(
+    files: AsyncIterable["File"],
+    dest: str | os.PathLike,
+    relative_path: Callable[["File"], str],
+    concurrency: int = 4,
+    progress: Optional[ProgressCallback] = None,
+    dry_run: bool = False,
+    **kwargs,
+) -> TransferReport[Path]:
+    """
+    Download files to a local directory with bounded concurrency.
+
+    Downloads start while `files` is still being iterated over, e.g. while the
+    pages of a `aiochris.util.search.Search` are being requested.
+    Local files which already exist with the same size are skipped.
+
+    Parameters
+    ----------
+    files
+        files to download
+    dest
+        local directory to download to
+    relative_path
+        function which maps a file to its path relative to `dest`
+    concurrency
+        maximum number of files to download at the same time
+    progress
+        function which is called whenever a file is finished
+    dry_run
+        If `True`, nothing is downloaded. The paths of files which
+        would be downloaded are reported as transferred.
+    kwargs
+        passed to `aiochris.models.logged_in.File.download`
+    """
+    dest = Path(dest)
+    report = TransferReport(TransferProgress())
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def list_files() -> None:
+        async for file in files:
+            report.progress.total_files += 1
+            report.progress.total_bytes += file.fsize
+            await queue.put(file)
+
+    async def download_one(file: "File") -> None:
+        rel = relative_path(file)
+        try:
+            path = dest / safe_relative_path(rel)
+            if await asyncio.to_thread(_has_size, path, file.fsize):
+                report.skipped.append(rel)
+                report.progress.skipped_files += 1
+                report.progress.skipped_bytes += file.fsize
+            elif dry_run:
+                report.transferred.append(path)
+                report.progress.files += 1
+                report.progress.bytes += file.fsize
+            else:
+                report.transferred.append(await file.download(path, **kwargs))
+                report.progress.files += 1
+                report.progress.bytes += file.fsize
+        except (aiohttp.ClientError, BaseClientError, OSError, ValueError) as e:
+            report.failed[rel] = e
+            report.progress.failed_files += 1
+        if progress is not None:
+            progress(report.progress)
+
+    async def worker() -> None:
+        while (file := await queue.get()) is not None:
+            await download_one(file)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        await list_files()
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    return report
+
+
+async def sync_files(
+    files: AsyncIterable["File"],
+    cube_prefix: str,
+    local_dir: str | os.PathLike,
+    delete: bool = False,
+    dry_run: bool = False,
+    concurrency: int = 4,
+    progress: Optional[ProgressCallback] = None,
+    **kwargs,
+) -> SyncReport:
+    """
+    Make a local directory mirror the files under a path in *CUBE*.
+
+    Files are compared by their path relative to `cube_prefix` and by size.
+    Files of `files` which are not under `cube_prefix` are ignored.
+    See `download_files` for the other parameters.
+
+    Parameters
+    ----------
+    delete
+        If `True`, local files which are not in `files` are deleted
+        (after all of `files` were listed).
+    """
+    local_dir = Path(local_dir)
+    prefix = cube_prefix.rstrip("/") + "/"
+    listed: set[str] = set()
+
+    async def under_prefix() -> AsyncIterator["File"]:
+        async for file in files:
+            if file.fname.startswith(prefix):
+                listed.add(file.fname.removeprefix(prefix))
+                yield file
+
+    report = await download_files(
+        under_prefix(),
+        local_dir,
+        lambda f: f.fname.removeprefix(prefix),
+        concurrency,
+        progress,
+        dry_run,
+        **kwargs,
+    )
+    sync_report = SyncReport(
+        progress=report.progress,
+        transferred=report.transferred,
+        skipped=report.skipped,
+        failed=report.failed,
+    )
+    if delete:
+        sync_report.deleted = await asyncio.to_thread(
+            _delete_unlisted, local_dir, listed, dry_run
+        )
+    return sync_report
+
+
+def _delete_unlisted(local_dir: Path, listed: set[str], dry_run: bool) -> list[str]:
+    """
+    Delete files which are not listed, then empty directories.
+    """
+    deleted = []
+    if not local_dir.is_dir():
+        return deleted
+    for root, dirs, names in os.walk(local_dir, topdown=False):
+        root = Path(root)
+        for name in names:
+            rel = (root / name).relative_to(local_dir).as_posix()
+            if rel in listed:
+                continue
+            deleted.append(rel)
+            if not dry_run:
+                (root / name).unlink()
+        if not dry_run and root != local_dir and not any(root.iterdir()):
+            root.rmdir()
+    return sorted(deleted)
+
+
+def safe_relative_path(rel: str) -> PurePosixPath:
+    """
+    Check that a relative path from *CUBE* stays inside of the directory it is joined to.
+
+    Raises
+    ------
+    ValueError
+        If `rel` is empty, absolute, or has a `..` component.
+    """
+    path = PurePosixPath(rel)
+    if path.is_absolute() or ".." in path.parts or not path.parts:
+        raise ValueError(f'Unsafe file path: "{rel}"')
+    return path
+
+
+def _has_size(path: Path, size: int) -> bool:
+    try:
+        return path.stat().st_size == size
+    except FileNotFoundError:
+        return False
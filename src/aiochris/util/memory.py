@@ -0,0 +1,234 @@
+"""
+Opt-in memory instrumentation of `aiochris.util.search.Search` iteration, using
+[`tracemalloc`](https://docs.python.org/3/library/tracemalloc.html).
+
+A `MemoryProfiler` measures memory allocated while iterating over searches within
+its context. For every page it records how much memory was allocated to receive
+the response, to parse it, and to deserialize its items. It also aggregates the
+bytes allocated per model type, and the peak and retained memory per link name,
+i.e. the name of the collection being searched.
+
+Tracing memory allocations slows down Python significantly, so a `MemoryProfiler`
+should only be used for diagnosis.
+
+Examples
+--------
+
+```python
+from aiochris.util.memory import MemoryProfiler
+
+with MemoryProfiler() as profiler:
+    plinsts = await acollect(chris.plugin_instances(feed_id=4))
+print(profiler.links["plugin_instances"].retained_bytes)
+print(profiler.report())
+```
+
+Notes
+-----
+Memory is traced process-wide, so allocations made by concurrent tasks
+are counted towards whatever iteration is measuring at the time.
+
+The peak of `tracemalloc` is never reset, so that other users of `tracemalloc`
+in the same process are not affected. Consequently, a peak which is lower than
+an earlier peak of the process is only seen as the memory traced when it is sampled.
+"""
+
+import collections
+import contextvars
+import dataclasses
+import tracemalloc
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Optional, Self, TypeVar, Any
+
+T = TypeVar("T")
+
+_current_profiler: contextvars.ContextVar[Optional["MemoryProfiler"]] = (
+    contextvars.ContextVar("aiochris_memory_profiler", default=None)
+)
+
+
+@dataclasses.dataclass
+class PageMemory:
+    """Memory allocated while processing one page of a search."""
+
+    link_name: str
+    url: str
+    items: int = 0
+    body_bytes: int = 0
+    """Size of the response body, in bytes."""
+    received_bytes: int = 0
+    """Memory allocated while receiving and decoding the response body."""
+    parsed_bytes: int = 0
+    """Memory allocated while parsing the response into a list of results."""
+    deserialized_bytes: int = 0
+    """Memory allocated while deserializing the results into models."""
+
+
+@dataclasses.dataclass
+class ModelMemory:
+    """Memory allocated while deserializing models of one type."""
+
+    count: int = 0
+    allocated_bytes: int = 0
+
+    @property
+    def bytes_per_item(self) -> float:
+        return self.allocated_bytes / self.count if self.count else 0.0
+
+
+@dataclasses.dataclass
+class LinkMemory:
+    """Memory usage of iterating over searches of one link name."""
+
+    iterations: int = 0
+    pages: int = 0
+    items: int = 0
+    peak_bytes: int = 0
+    """
+    Greatest increase in traced memory during an iteration, relative to
+    the amount of memory traced when the iteration started.
+    """
+    retained_bytes: int = 0
+    """
+    Increase in traced memory between the start and the end of iterations, summed.
+    This is memory which is still referenced after iteration, e.g. by the list
+    produced by `aiochris.util.search.acollect`, or which was leaked.
+    """
+
+
+@dataclasses.dataclass
+class _Iteration:
+    link_name: str
+    baseline: int
+    peak: int = 0
+
+
+@dataclasses.dataclass
+class MemoryProfiler:
+    """
+    A context manager which measures the memory used by iterating over searches.
+
+    `tracemalloc` is started when the context is entered if it is not already
+    tracing, in which case it is stopped when the context is exited.
+    """
+
+    nframes: int = 1
+    """Number of frames stored per traceback by `tracemalloc`."""
+    max_pages: Optional[int] = 1000
+    """Number of most recent pages to keep in `pages`. `None` keeps every page."""
+
+    pages: collections.deque[PageMemory] = dataclasses.field(init=False)
+    """Measurements of the most recent pages."""
+    models: dict[str, ModelMemory] = dataclasses.field(default_factory=dict, init=False)
+    """Measurements per model type name."""
+    links: dict[str, LinkMemory] = dataclasses.field(default_factory=dict, init=False)
+    """Measurements per link name."""
+
+    _active: list[_Iteration] = dataclasses.field(
+        default_factory=list, init=False, repr=False
+    )
+    _started_tracing: bool = dataclasses.field(default=False, init=False, repr=False)
+    _last_peak: int = dataclasses.field(default=0, init=False, repr=False)
+    _token: Optional[contextvars.Token] = dataclasses.field(
+        default=None, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.pages = collections.deque(maxlen=self.max_pages)
+
+    def __enter__(self) -> Self:
+        if self._token is not None:
+            raise RuntimeError(f"{self} is already active")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+            self._started_tracing = True
+        self._last_peak = tracemalloc.get_traced_memory()[1]
+        self._token = _current_profiler.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current_profiler.reset(self._token)
+        self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def sample(self) -> int:
+        """
+        Get the current size of traced memory, and update the peak of active iterations.
+        """
+        if not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        if peak > self._last_peak:  # the peak was reached since the last sample
+            self._last_peak = peak
+        else:  # the highest memory since the last sample is not known
+            peak = current
+        for iteration in self._active:
+            iteration.peak = max(iteration.peak, peak - iteration.baseline)
+        return current
+
+    async def track(self, link_name: str, it: AsyncIterable[T]) -> AsyncIterator[T]:
+        """
+        Measure the peak and retained memory of iterating over `it`.
+        """
+        iteration = _Iteration(link_name=link_name, baseline=self.sample())
+        self._active.append(iteration)
+        try:
+            async for item in it:
+                yield item
+        finally:
+            retained = self.sample() - iteration.baseline
+            self._active.remove(iteration)
+            link = self._link(link_name)
+            link.iterations += 1
+            link.peak_bytes = max(link.peak_bytes, iteration.peak)
+            link.retained_bytes += retained
+
+    def start_page(self, link_name: str, url: Any) -> tuple[PageMemory, int]:
+        """
+        Called before a page of a search is requested.
+        """
+        page = PageMemory(link_name=link_name, url=str(url))
+        self.pages.append(page)
+        self._link(link_name).pages += 1
+        return page, self.sample()
+
+    def record_model(self, page: PageMemory, model: type, before: int) -> None:
+        """
+        Called after an item of `page` was deserialized.
+        """
+        allocated = self.sample() - before
+        page.items += 1
+        page.deserialized_bytes += allocated
+        self._link(page.link_name).items += 1
+        stats = self.models.get(model.__name__)
+        if stats is None:
+            stats = self.models[model.__name__] = ModelMemory()
+        stats.count += 1
+        stats.allocated_bytes += allocated
+
+    def report(self) -> dict[str, Any]:
+        """
+        Produce a JSON-serializable summary of the measurements.
+        """
+        return {
+            "links": {k: dataclasses.asdict(v) for k, v in self.links.items()},
+            "models": {
+                k: {**dataclasses.asdict(v), "bytes_per_item": v.bytes_per_item}
+                for k, v in self.models.items()
+            },
+            "pages": [dataclasses.asdict(p) for p in self.pages],
+        }
+
+    def _link(self, link_name: str) -> LinkMemory:
+        if (link := self.links.get(link_name)) is None:
+            link = self.links[link_name] = LinkMemory()
+        return link
+
+
+def current_profiler() -> Optional[MemoryProfiler]:
+    """
+    Get the active `MemoryProfiler`, if any.
+    """
+    return _current_profiler.get()
@@ -0,0 +1,276 @@
+"""
+Cached parameter schemas of plugins, for validating the parameters of
+plugin instances locally before they are created.
+
+Plugins are immutable in *CUBE*, so the parameters of a plugin are requested once
+and saved to a directory shared by every client on the same host.
+
+Examples
+--------
+
+```python
+from aiochris.util.parameters import ParameterCache
+
+validator = await ParameterCache.default().get(plugin)
+params = validator.validate({"sleepLength": "five"})  # raises InvalidParametersError
+
+# or equivalently
+await plugin.create_instance(previous=plinst, validate=True, sleepLength="five")
+```
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import re
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Optional, TYPE_CHECKING
+
+from aiochris.errors import InvalidParametersError
+from aiochris.util.search import acollect
+
+if TYPE_CHECKING:
+    from aiochris.models.public import PublicPlugin, PluginParameter
+
+COMMON_INSTANCE_PARAMETERS = frozenset(
+    (
+        "previous_id",
+        "title",
+        "compute_resource_name",
+        "memory_limit",
+        "cpu_limit",
+        "gpu_limit",
+        "number_of_workers",
+    )
+)
+"""Parameters which every plugin instance accepts, besides those of its plugin."""
+
+_TRUE = frozenset(("t", "T", "y", "Y", "yes", "Yes", "YES", "true", "True", "TRUE"))
+_TRUE |= frozenset(("on", "On", "ON", "1", 1, True))
+_FALSE = frozenset(("f", "F", "n", "N", "no", "No", "NO", "false", "False", "FALSE"))
+_FALSE |= frozenset(("off", "Off", "OFF", "0", 0, 0.0, False))
+_INTEGER = re.compile(r"\s*[+-]?\d+(\.0*)?\s*")
+
+
+def coerce(param_type: str, value: Any) -> Any:
+    """
+    Convert the value of a plugin parameter to its type, the same way *CUBE*
+    (i.e. Django REST framework) does. For example, `"5"` is a valid integer.
+
+    Unknown types are not converted.
+
+    Raises
+    ------
+    ValueError
+        If *CUBE* would reject the value, with *CUBE*'s error message.
+    """
+    if param_type == "boolean":
+        if isinstance(value, (str, int, float)) and value in _TRUE:
+            return True
+        if isinstance(value, (str, int, float)) and value in _FALSE:
+            return False
+        raise ValueError("Must be a valid boolean.")
+    if param_type == "integer":
+        if isinstance(value, bool):
+            pass
+        elif isinstance(value, int):
+            return value
+        elif isinstance(value, float) and value.is_integer():
+            return int(value)
+        elif isinstance(value, str) and _INTEGER.fullmatch(value):
+            return int(value.strip().split(".")[0])
+        raise ValueError("A valid integer is required.")
+    if param_type == "float":
+        if isinstance(value, (str, int, float)):
+            with contextlib.suppress(ValueError):
+                return float(value)
+        raise ValueError("A valid number is required.")
+    if param_type in ("string", "path", "unextpath"):
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError("Not a valid string.")
+        return str(value)
+    return value
+
+
+@dataclasses.dataclass(frozen=True)
+class ParameterSpec:
+    """The parts of a `aiochris.models.public.PluginParameter` needed for validation."""
+
+    name: str
+    type: str
+    optional: bool
+    default: Optional[Any]
+    action: str
+
+    @classmethod
+    def of(cls, param: "PluginParameter") -> "ParameterSpec":
+        return cls(param.name, param.type, param.optional, param.default, param.action)
+
+    def check(self, value: Any) -> Optional[str]:
+        """Error message if *CUBE* would not accept `value` for this parameter."""
+        # flags, i.e. store_true or store_false, are booleans
+        param_type = self.type if self.action == "store" else "boolean"
+        try:
+            coerce(param_type, value)
+        except ValueError as e:
+            return str(e)
+        return None
+
+
+class ParameterValidator:
+    """
+    Checks the parameters of a plugin instance, without making any requests.
+    """
+
+    def __init__(self, plugin: str, specs: Sequence[ParameterSpec]):
+        """
+        Parameters
+        ----------
+        plugin
+            name and version of the plugin, for error messages
+        specs
+            parameters of the plugin
+        """
+        self.plugin = plugin
+        self.specs = {spec.name: spec for spec in specs}
+        self._required = [s.name for s in specs if not s.optional]
+        self._defaults = {
+            s.name: s.default for s in specs if s.optional and s.default is not None
+        }
+
+    def validate(self, params: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Check the names, types and presence of parameters, and fill in the defaults
+        of optional parameters which are not given.
+
+        Parameters given as `None` are treated as not given.
+
+        Raises
+        ------
+        aiochris.errors.InvalidParametersError
+            If a parameter is unknown, has the wrong type, or is required but missing.
+        """
+        errors: dict[str, list[str]] = {}
+        values = {k: v for k, v in params.items() if v is not None}
+        for name, value in values.items():
+            if (spec := self.specs.get(name)) is None:
+                if name not in COMMON_INSTANCE_PARAMETERS:
+                    errors[name] = ["Unknown parameter."]
+            elif (message := spec.check(value)) is not None:
+                errors[name] = [message]
+        for name in self._required:
+            if name not in values:
+                errors[name] = ["This field is required."]
+        if errors:
+            raise InvalidParametersError(self.plugin, errors)
+        return {**self._defaults, **values}
+
+
+@dataclasses.dataclass
+class ParameterCacheStats:
+    """Counters of a `ParameterCache`."""
+
+    hits: int = 0
+    """Validators which were in memory or on disk."""
+    misses: int = 0
+    """Validators for which the parameters of the plugin were requested."""
+
+
+class ParameterCache:
+    """
+    Validators of plugins, by plugin URL, kept in memory and optionally in a directory.
+    """
+
+    _defaults: dict[Path, "ParameterCache"] = {}
+
+    def __init__(self, directory: Optional[str | os.PathLike] = None):
+        """
+        Parameters
+        ----------
+        directory
+            where to save the parameters of plugins. It may be shared by several
+            processes. If `None`, parameters are only kept in memory.
+        """
+        self.directory = None if directory is None else Path(directory).expanduser()
+        self.stats = ParameterCacheStats()
+        self._validators: dict[str, ParameterValidator] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def default(cls) -> "ParameterCache":
+        """
+        The cache shared by this process, saved under `$XDG_CACHE_HOME/aiochris/parameters`
+        (by default, `~/.cache/aiochris/parameters`).
+        """
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        directory = Path(cache_home) / "aiochris" / "parameters"
+        if (cache := cls._defaults.get(directory)) is None:
+            cache = cls._defaults[directory] = cls(directory)
+        return cache
+
+    @staticmethod
+    def key(plugin: "PublicPlugin") -> str:
+        """Cache key of a plugin."""
+        ident = f"{plugin.url}\0{plugin.name}\0{plugin.version}"
+        return hashlib.sha256(ident.encode()).hexdigest()
+
+    async def get(self, plugin: "PublicPlugin") -> ParameterValidator:
+        """
+        Get the validator of a plugin, requesting its parameters if they are not cached.
+
+        Concurrent calls for the same plugin make at most one request.
+        """
+        key = self.key(plugin)
+        if (validator := self._validators.get(key)) is not None:
+            self.stats.hits += 1
+            return validator
+        if (pending := self._pending.get(key)) is not None:
+            self.stats.hits += 1
+        else:
+            # the load does not belong to any caller, so cancelling one caller
+            # does not cancel the others
+            pending = self._pending[key] = asyncio.create_task(self._load(plugin, key))
+            pending.add_done_callback(lambda task: self._finish(key, task))
+        return await asyncio.shield(pending)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        del self._pending[key]
+        if not task.cancelled() and task.exception() is None:
+            self._validators[key] = task.result()
+
+    async def _load(self, plugin: "PublicPlugin", key: str) -> ParameterValidator:
+        name = f"{plugin.name} {plugin.version}"
+        if (specs := await asyncio.to_thread(self._read, key)) is not None:
+            self.stats.hits += 1
+            return ParameterValidator(name, specs)
+        self.stats.misses += 1
+        params = await acollect(plugin.get_parameters())
+        specs = [ParameterSpec.of(p) for p in params]
+        await asyncio.to_thread(self._write, key, specs)
+        return ParameterValidator(name, specs)
+
+    def _path(self, key: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[list[ParameterSpec]]:
+        if (path := self._path(key)) is None:
+            return None
+        try:
+            return [ParameterSpec(**d) for d in json.loads(path.read_text())]
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def _write(self, key: str, specs: Sequence[ParameterSpec]) -> None:
+        if (path := self._path(key)) is None:
+            return
+        with contextlib.suppress(OSError):  # the cache is only an optimization
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{path.name}.{os.getpid()}.part")
+            partial.write_text(json.dumps([dataclasses.asdict(s) for s in specs]))
+            os.replace(partial, path)
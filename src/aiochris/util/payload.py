@@ -0,0 +1,110 @@
+"""
+Request bodies for streaming uploads.
+
+*CUBE* rejects chunked uploads with "411 Length Required", so every part of
+an upload must have a known size. The payloads here stream their data without
+blocking the event loop, and declare their size so that *aiohttp* can send a
+`Content-Length` header.
+"""
+
+import asyncio
+import os
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+from aiohttp.payload import AsyncIterablePayload, Payload
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+"""Number of bytes read from a local file at a time."""
+
+
+class SizedAsyncIterablePayload(AsyncIterablePayload):
+    """
+    A payload from an async iterable of bytes, where the total number of bytes is known.
+
+    A `ValueError` is raised during the upload if the iterable produces a different
+    number of bytes than `size`.
+    """
+
+    def __init__(self, value: AsyncIterable[bytes], size: int, **kwargs: Any):
+        if size < 0:
+            raise ValueError(f"size must not be negative: {size}")
+        super().__init__(_exactly(value, size), **kwargs)
+        self._size = size
+
+
+async def _exactly(stream: AsyncIterable[bytes], size: int) -> AsyncIterator[bytes]:
+    sent = 0
+    async for chunk in stream:
+        sent += len(chunk)
+        if sent > size:
+            raise ValueError(f"stream produced more than the declared {size} bytes")
+        yield chunk
+    if sent != size:
+        raise ValueError(f"stream produced {sent} bytes but {size} were declared")
+
+
+async def read_file(
+    path: str | os.PathLike, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Read a file in a thread pool, in chunks of `chunk_size`.
+
+    The next chunk is read while the current one is being consumed.
+    """
+    f = await asyncio.to_thread(open, path, "rb")
+    pending = asyncio.ensure_future(asyncio.to_thread(f.read, chunk_size))
+    try:
+        while chunk := await pending:
+            pending = asyncio.ensure_future(asyncio.to_thread(f.read, chunk_size))
+            yield chunk
+    finally:
+        if not pending.done():
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        await asyncio.to_thread(f.close)
+
+
+async def file_payload(
+    path: str | os.PathLike, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Payload:
+    """
+    Create a payload which streams the content of a local file.
+    """
+    stat = await asyncio.to_thread(os.stat, path)
+    return SizedAsyncIterablePayload(
+        read_file(path, chunk_size),
+        stat.st_size,
+        filename=os.path.basename(path),
+    )
+
+
+async def _slices(view: memoryview) -> AsyncIterator[memoryview]:
+    for start in range(0, len(view), DEFAULT_CHUNK_SIZE):
+        yield view[start : start + DEFAULT_CHUNK_SIZE]
+
+
+def payload_of(
+    data: bytes | bytearray | memoryview | AsyncIterable[bytes],
+    size: int | None = None,
+    **kwargs: Any,
+) -> Payload:
+    """
+    Create a payload from in-memory data or an async iterable of known size.
+
+    In-memory data is sent in slices, without being copied.
+
+    Raises
+    ------
+    ValueError
+        If `data` is an async iterable and `size` is not given.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        view = view.cast("B") if view.c_contiguous else memoryview(view.tobytes())
+        return SizedAsyncIterablePayload(_slices(view), view.nbytes, **kwargs)
+    if isinstance(data, AsyncIterable):
+        if size is None:
+            raise ValueError("size must be given for async iterables")
+        return SizedAsyncIterablePayload(data, size, **kwargs)
+    raise TypeError(f"cannot upload object of type {type(data)}")
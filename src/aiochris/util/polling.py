@@ -0,0 +1,202 @@
+"""
+Strategies for how often `aiochris.models.logged_in.PluginInstance.wait`
+checks on the status of a plugin instance.
+
+Strategies do not keep state between polls, so one strategy object can be
+shared by many concurrent waits. Every strategy counts the polls it was used for.
+
+Examples
+--------
+
+```python
+from aiochris.util.polling import ExponentialBackoff, LearnedRuntime
+
+backoff = ExponentialBackoff(initial=1, max_interval=60)
+await plinst.wait(polling=backoff)
+
+learned = await LearnedRuntime.from_history(chris, "pl-fshack")
+await asyncio.gather(*(p.wait(polling=learned) for p in plinsts))
+print(f"{learned.polls} polls")
+```
+"""
+
+import abc
+import datetime
+import math
+import statistics
+from collections.abc import Mapping
+from typing import Optional, TYPE_CHECKING
+
+from aiochris.enums import Status
+
+if TYPE_CHECKING:
+    from aiochris.client.authed import AuthenticatedClient
+    from aiochris.models.logged_in import PluginInstance
+
+
+class PollingStrategy(abc.ABC):
+    """
+    Decides how long to wait before checking on a plugin instance again.
+    """
+
+    def __init__(self):
+        self.polls = 0
+        """Number of polls made using this strategy."""
+
+    @abc.abstractmethod
+    def interval(self, plinst: "PluginInstance", elapsed: float, polls: int) -> float:
+        """
+        Number of seconds to wait before the next poll.
+
+        Parameters
+        ----------
+        plinst
+            last state of the plugin instance
+        elapsed
+            number of seconds since the wait started
+        polls
+            number of polls made so far by this wait, at least 1
+        """
+        ...
+
+
+class FixedInterval(PollingStrategy):
+    """Poll every `interval` seconds."""
+
+    def __init__(self, interval: float = 5):
+        super().__init__()
+        self._interval = interval
+
+    def interval(self, plinst: "PluginInstance", elapsed: float, polls: int) -> float:
+        return self._interval
+
+
+class ExponentialBackoff(PollingStrategy):
+    """
+    Poll after `initial` seconds, then multiply the interval by `factor`
+    after every poll, up to `max_interval`.
+
+    Short jobs are noticed quickly, and long jobs are polled rarely.
+    """
+
+    def __init__(
+        self, initial: float = 0.5, factor: float = 2, max_interval: float = 60
+    ):
+        super().__init__()
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self._max_polls = self._polls_to_max()
+
+    def interval(self, plinst: "PluginInstance", elapsed: float, polls: int) -> float:
+        if self._max_polls is not None and polls >= self._max_polls:
+            return self.max_interval  # factor ** polls would overflow eventually
+        return min(self.initial * self.factor ** (polls - 1), self.max_interval)
+
+    def _polls_to_max(self) -> Optional[int]:
+        """Number of polls after which the interval is `max_interval`, if ever."""
+        if self.factor <= 1 or self.initial <= 0:
+            return None
+        if self.initial >= self.max_interval:
+            return 1
+        return math.ceil(math.log(self.max_interval / self.initial, self.factor)) + 1
+
+
+class StatusIntervals(PollingStrategy):
+    """
+    Poll at an interval which depends on the last status of the plugin instance.
+
+    Examples
+    --------
+
+    Poll slowly while the job runs, and quickly while its files are registered:
+
+    ```python
+    StatusIntervals({Status.started: 30, Status.registeringFiles: 0.5}, default=5)
+    ```
+    """
+
+    def __init__(self, intervals: Mapping[Status, float], default: float = 5):
+        super().__init__()
+        self.intervals = dict(intervals)
+        self.default = default
+
+    def interval(self, plinst: "PluginInstance", elapsed: float, polls: int) -> float:
+        return self.intervals.get(plinst.status, self.default)
+
+
+class LearnedRuntime(PollingStrategy):
+    """
+    Poll around when a plugin instance is expected to finish,
+    according to an estimate of its runtime.
+
+    Before the expected end, the interval is the time remaining (at least
+    `min_interval`). After the expected end, the plugin instance is polled every
+    `overdue_fraction` of the estimate. Intervals are at most `max_interval`.
+    """
+
+    def __init__(
+        self,
+        estimate: float,
+        min_interval: float = 0.5,
+        max_interval: float = 60,
+        overdue_fraction: float = 0.1,
+    ):
+        """
+        Parameters
+        ----------
+        estimate
+            expected number of seconds between `start_date` and `end_date`
+        """
+        super().__init__()
+        self.estimate = estimate
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.overdue_fraction = overdue_fraction
+
+    @classmethod
+    async def from_history(
+        cls,
+        client: "AuthenticatedClient",
+        plugin_name: str,
+        plugin_version: Optional[str] = None,
+        samples: int = 20,
+        default: float = 5,
+        **kwargs,
+    ) -> "LearnedRuntime":
+        """
+        Estimate the runtime of a plugin as the median runtime of its
+        (at most `samples`) past plugin instances which finished successfully.
+
+        Parameters
+        ----------
+        client
+            client used to search for plugin instances
+        plugin_name
+            name of the plugin
+        plugin_version
+            version of the plugin. By default, all versions are considered.
+        samples
+            maximum number of past plugin instances to consider
+        default
+            estimate if there are no past plugin instances
+        kwargs
+            passed to the constructor
+        """
+        query = {"plugin_name": plugin_name, "status": "finishedSuccessfully"}
+        if plugin_version is not None:
+            query["plugin_version"] = plugin_version
+        runtimes = []
+        async for plinst in client.plugin_instances(limit=samples, **query):
+            runtimes.append((plinst.end_date - plinst.start_date).total_seconds())
+            if len(runtimes) >= samples:
+                break
+        estimate = statistics.median(runtimes) if runtimes else default
+        return cls(estimate, **kwargs)
+
+    def interval(self, plinst: "PluginInstance", elapsed: float, polls: int) -> float:
+        now = datetime.datetime.now(plinst.start_date.tzinfo or datetime.timezone.utc)
+        remaining = self.estimate - (now - plinst.start_date).total_seconds()
+        if remaining <= 0:
+            remaining = self.overdue_fraction * self.estimate
+        return min(max(remaining, self.min_interval), self.max_interval)
@@ -0,0 +1,212 @@
+"""
+An in-memory index of the plugins of *CUBE*, for looking up plugins by name and
+version or by image without making a request every time.
+
+Examples
+--------
+
+```python
+registry = chris.plugin_registry
+dircopy = await registry.get("pl-dircopy")           # loads the catalog once
+dcm2niix = await registry.get("pl-dcm2niix", "0.1.0")  # no request
+same = registry.lookup("pl-dircopy")                 # synchronous, cached only
+```
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+from collections.abc import Callable, Iterable
+from typing import Optional, TYPE_CHECKING
+
+from aiochris.util.search import acollect
+
+if TYPE_CHECKING:
+    from aiochris.client.authed import AuthenticatedClient
+    from aiochris.models.logged_in import Plugin
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class RegistryStats:
+    """Counters of a `PluginRegistry`."""
+
+    hits: int = 0
+    """Lookups answered from memory, including cached misses."""
+    misses: int = 0
+    """Lookups which made a search."""
+    refreshes: int = 0
+    """Number of times the whole catalog was loaded."""
+
+
+class PluginRegistry:
+    """
+    Plugins of a *CUBE*, indexed by name and version and by image.
+
+    The whole catalog of plugins is loaded on first use. Plugins which are not
+    in the catalog (e.g. they were registered after it was loaded) are searched
+    for individually and added to it. Plugins which do not exist are remembered
+    for `negative_ttl` seconds. After `ttl` seconds, the catalog is reloaded in
+    the background while lookups keep being answered from the old catalog.
+    """
+
+    def __init__(
+        self,
+        client: "AuthenticatedClient",
+        ttl: float = 300,
+        negative_ttl: float = 30,
+        page_size: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Parameters
+        ----------
+        client
+            client used to search for plugins
+        ttl
+            Number of seconds after which the catalog is reloaded
+        negative_ttl
+            Number of seconds for which a plugin which was not found is not searched for again
+        page_size
+            Number of plugins per page while loading the catalog
+        clock
+            Source of time, in seconds
+        """
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.page_size = page_size
+        self.clock = clock
+        self.stats = RegistryStats()
+        self._by_version: dict[tuple[str, str], "Plugin"] = {}
+        self._latest: dict[str, "Plugin"] = {}
+        self._by_image: dict[str, "Plugin"] = {}
+        self._not_found: dict[tuple[str, ...], float] = {}
+        self._searching: dict[tuple[str, ...], asyncio.Task] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    def lookup(self, name: str, version: Optional[str] = None) -> Optional["Plugin"]:
+        """
+        Get a plugin from memory, without making any request.
+
+        If `version` is `None`, the most recently registered version is returned.
+        """
+        if version is None:
+            return self._latest.get(name)
+        return self._by_version.get((name, version))
+
+    def lookup_image(self, dock_image: str) -> Optional["Plugin"]:
+        """Get a plugin by its image from memory, without making any request."""
+        return self._by_image.get(dock_image)
+
+    async def get(self, name: str, version: Optional[str] = None) -> Optional["Plugin"]:
+        """
+        Get a plugin by name, and by version unless `version` is `None`,
+        in which case the most recently registered version is returned.
+
+        Returns `None` if there is no such plugin.
+        """
+        await self._ensure_loaded()
+        if (plugin := self.lookup(name, version)) is not None:
+            self.stats.hits += 1
+            return plugin
+        query = {"name_exact": name}
+        if version is not None:
+            query["version"] = version
+        await self._search(("name", name, version or ""), query)
+        return self.lookup(name, version)
+
+    async def get_image(self, dock_image: str) -> Optional["Plugin"]:
+        """
+        Get a plugin by its image, e.g. `ghcr.io/fnndsc/pl-dircopy:2.1.1`.
+
+        Returns `None` if there is no such plugin.
+        """
+        await self._ensure_loaded()
+        if (plugin := self.lookup_image(dock_image)) is not None:
+            self.stats.hits += 1
+            return plugin
+        await self._search(("image", dock_image), {"dock_image": dock_image})
+        return self.lookup_image(dock_image)
+
+    async def refresh(self) -> None:
+        """Load the whole catalog of plugins (again)."""
+        plugins = await acollect(self.client.search_plugins(limit=self.page_size))
+        self.stats.refreshes += 1
+        self._by_version = {}
+        self._latest = {}
+        self._by_image = {}
+        self._add(plugins)
+        self._not_found.clear()
+        self._loaded_at = self.clock()
+
+    def invalidate(self) -> None:
+        """Forget every plugin, so that the catalog is loaded again on next use."""
+        self._by_version = {}
+        self._latest = {}
+        self._by_image = {}
+        self._not_found.clear()
+        self._loaded_at = None
+
+    async def close(self) -> None:
+        """Cancel the background refresh and searches, if any."""
+        tasks = [*self._searching.values()]
+        if self._refreshing is not None:
+            tasks.append(self._refreshing)
+            self._refreshing = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            if self._refreshing is None or self._refreshing.done():
+                self._refreshing = asyncio.create_task(self.refresh())
+            await asyncio.shield(self._refreshing)
+        elif self.clock() - self._loaded_at > self.ttl:
+            if self._refreshing is None or self._refreshing.done():
+                self._refreshing = asyncio.create_task(self._refresh_in_background())
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.debug("failed to refresh plugin registry: %s", e)
+
+    async def _search(self, key: tuple[str, ...], query: dict) -> None:
+        """
+        Search for plugins which are not in the catalog. Concurrent searches
+        for the same key make one request.
+        """
+        if (expires := self._not_found.get(key)) is not None:
+            if self.clock() < expires:
+                self.stats.hits += 1
+                return
+            del self._not_found[key]
+        if (pending := self._searching.get(key)) is not None:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            pending = self._searching[key] = asyncio.create_task(
+                self._search_once(key, query)
+            )
+            pending.add_done_callback(lambda _: self._searching.pop(key, None))
+        await asyncio.shield(pending)
+
+    async def _search_once(self, key: tuple[str, ...], query: dict) -> None:
+        plugins = await acollect(self.client.search_plugins(**query))
+        if plugins:
+            self._add(plugins)
+        else:
+            self._not_found[key] = self.clock() + self.negative_ttl
+
+    def _add(self, plugins: Iterable["Plugin"]) -> None:
+        for plugin in plugins:
+            self._by_version[(plugin.name, plugin.version)] = plugin
+            self._by_image[plugin.dock_image] = plugin
+            latest = self._latest.get(plugin.name)
+            if latest is None or plugin.id > latest.id:
+                self._latest[plugin.name] = plugin
@@ -1,5 +1,7 @@
+import contextlib
 import copy
 import logging
+import time
 from collections.abc import AsyncIterable, AsyncIterator, AsyncGenerator
 from dataclasses import dataclass
 from typing import (
@@ -20,6 +22,8 @@ from aiochris.errors import (
     NonsenseResponseError,
 )
 from aiochris.link.linked import deserialize_linked, Linked
+from aiochris.util.diagnostics import current_watcher
+from aiochris.util.memory import current_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +73,8 @@ class Search(Generic[T], AsyncIterable[T]):
     Item: Type[T]
     max_requests: int = 100
     subpath: str = "search/"
+    link_name: Optional[str] = None
+    """Name of the collection link being searched, used for diagnostics."""
 
     def __aiter__(self) -> AsyncIterator[T]:
         return self._paginate(self.url)
@@ -144,12 +150,17 @@ class Search(Generic[T], AsyncIterable[T]):
             return from_json(_Paginated, await res.text())
 
     def _paginate(self, url: yarl.URL) -> AsyncIterator[T]:
-        return _get_paginated(
+        link_name = self.link_name or self.base_url
+        pages = _get_paginated(
             client=self.client,
             url=url,
             item_type=self.Item,
             max_requests=self.max_requests,
+            link_name=link_name,
         )
+        if (profiler := current_profiler()) is not None:
+            return profiler.track(link_name, pages)
+        return pages
 
     @property
     def url(self) -> yarl.URL:
@@ -178,6 +189,7 @@ async def _get_paginated(
     url: yarl.URL | str,
     item_type: Type[T],
     max_requests: int,
+    link_name: Optional[str] = None,
 ) -> AsyncGenerator[T, None]:
     """
     Make HTTP GET requests to a paginated endpoint. Further requests to the
@@ -190,14 +202,41 @@ async def _get_paginated(
             f"If this is expected, then pass the argument max_search_requests=-1 to "
             f"the client constructor classmethod."
         )
-    async with client.s.get(url) as res:  # N.B. not checking for 4XX, 5XX statuses
-        data: _Paginated = from_json(_Paginated, await res.text())
-        for element in data.results:
-            yield deserialize_linked(client, item_type, element)
-    if data.next is not None:
-        next_results = _get_paginated(client, data.next, item_type, max_requests - 1)
-        async for next_element in next_results:
-            yield next_element
+    watcher = current_watcher()
+    with contextlib.nullcontext() if watcher is None else watcher.record_search(url):
+        if (profiler := current_profiler()) is not None:
+            page, memory = profiler.start_page(link_name or str(url), url)
+        start = time.perf_counter()
+        async with client.s.get(url) as res:
+            await raise_for_status(res)
+            body = await res.text()
+            if watcher is not None:
+                payload_size = len(await res.read())
+                watcher.record_response(res, time.perf_counter() - start, payload_size)
+            if profiler is not None:
+                page.body_bytes = len(await res.read())
+                page.received_bytes, memory = _allocated_since(profiler, memory)
+            data: _Paginated = from_json(_Paginated, body)
+            if profiler is not None:
+                page.parsed_bytes, _ = _allocated_since(profiler, memory)
+            for element in data.results:
+                if profiler is not None:
+                    memory = profiler.sample()
+                item = deserialize_linked(client, item_type, element)
+                if profiler is not None:
+                    profiler.record_model(page, item_type, memory)
+                yield item
+        if data.next is not None:
+            next_results = _get_paginated(
+                client, data.next, item_type, max_requests - 1, link_name
+            )
+            async for next_element in next_results:
+                yield next_element
+
+
+def _allocated_since(profiler, before: int) -> tuple[int, int]:
+    now = profiler.sample()
+    return now - before, now
 
 
 async def acollect(async_iterable: AsyncIterable[T]) -> list[T]:
@@ -209,6 +248,10 @@ async def acollect(async_iterable: AsyncIterable[T]) -> list[T]:
     # nb: using tuple here causes
     #     TypeError: 'async_generator' object is not iterable
     # return tuple(e async for e in async_iterable)
+    profiler = current_profiler()
+    if profiler is not None and not isinstance(async_iterable, Search):
+        # searches are measured by Search.__aiter__
+        async_iterable = profiler.track(type(async_iterable).__name__, async_iterable)
     return [e async for e in async_iterable]
 
 
@@ -0,0 +1,185 @@
+"""
+Bookkeeping for transfers of many files: progress reports and resume manifests.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Optional, Any, Generic, Self, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MANIFEST_NAME = ".aiochris-manifest.jsonl"
+"""File name of a `Manifest` which is kept in the local directory of a transfer."""
+
+
+def default_manifest_path(local_dir: str | os.PathLike, destination: str) -> Path:
+    """
+    Path of the `Manifest` of a transfer between a local directory and a destination,
+    under `$XDG_CACHE_HOME/aiochris/manifests` (by default, `~/.cache/aiochris/manifests`).
+    """
+    ident = f"{Path(local_dir).resolve()}\0{destination}"
+    name = hashlib.sha256(ident.encode()).hexdigest()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "aiochris" / "manifests" / f"{name}.jsonl"
+
+
+@dataclasses.dataclass
+class TransferProgress:
+    """
+    Aggregate progress of a transfer of many files.
+    """
+
+    total_files: int = 0
+    """Number of files to transfer, including skipped files."""
+    total_bytes: int = 0
+    """Number of bytes to transfer, including skipped files."""
+    files: int = 0
+    """Number of files transferred."""
+    bytes: int = 0
+    """Number of bytes transferred, including files which are still being transferred."""
+    skipped_files: int = 0
+    """Number of files which did not need to be transferred."""
+    skipped_bytes: int = 0
+    failed_files: int = 0
+    started: float = dataclasses.field(default_factory=time.monotonic)
+    """Value of `time.monotonic()` when the transfer started."""
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the transfer started."""
+        return time.monotonic() - self.started
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / max(self.elapsed, 1e-9)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / max(self.elapsed, 1e-9)
+
+    @property
+    def done(self) -> bool:
+        """Whether every file was transferred, skipped, or failed."""
+        return self.files + self.skipped_files + self.failed_files >= self.total_files
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files + self.skipped_files}/{self.total_files} files "
+            f"({self.skipped_files} skipped, {self.failed_files} failed), "
+            f"{self.bytes_per_second / 1024 / 1024:.1f} MiB/s, "
+            f"{self.files_per_second:.1f} files/s"
+        )
+
+
+ProgressCallback = Callable[[TransferProgress], Any]
+"""A function which is called whenever a file of a transfer is finished."""
+
+
+@dataclasses.dataclass
+class TransferReport(Generic[T]):
+    """
+    Outcome of a transfer of many files.
+    """
+
+    progress: TransferProgress
+    transferred: list[T] = dataclasses.field(default_factory=list)
+    """Results of the files which were transferred."""
+    skipped: list[str] = dataclasses.field(default_factory=list)
+    """Relative paths of files which did not need to be transferred."""
+    failed: dict[str, BaseException] = dataclasses.field(default_factory=dict)
+    """Errors by relative paths of files which could not be transferred."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether no file failed to transfer."""
+        return not self.failed
+
+
+@dataclasses.dataclass
+class SyncReport(TransferReport[Path]):
+    """
+    Outcome of synchronizing a local directory with *CUBE*.
+    """
+
+    deleted: list[str] = dataclasses.field(default_factory=list)
+    """Relative paths of local files which were deleted."""
+
+
+@dataclasses.dataclass(frozen=True)
+class ManifestEntry:
+    """
+    A record of a finished transfer of a local file.
+    """
+
+    path: str
+    """Path of the local file, relative to the root of the transfer."""
+    fname: str
+    """Path of the file in *CUBE*."""
+    fsize: int
+    mtime_ns: int
+    """Modification time of the local file when it was transferred."""
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Whether the local file has not changed since this entry was recorded."""
+        return self.fsize == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+
+class Manifest:
+    """
+    An append-only record of finished transfers, saved as JSON lines.
+
+    An interrupted transfer can be resumed by skipping the files
+    which have a matching entry in its manifest.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = path
+        self.entries: dict[str, ManifestEntry] = {}
+        self._file = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> Self:
+        self.entries = await asyncio.to_thread(self._load)
+        await asyncio.to_thread(
+            Path(self.path).parent.mkdir, parents=True, exist_ok=True
+        )
+        self._file = await asyncio.to_thread(open, self.path, "a")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await asyncio.to_thread(self._file.close)
+        self._file = None
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        return self.entries.get(path)
+
+    async def add(self, entry: ManifestEntry) -> None:
+        """Record a finished transfer."""
+        self.entries[entry.path] = entry
+        line = json.dumps(dataclasses.asdict(entry)) + "\n"
+        async with self._lock:
+            await asyncio.to_thread(self._write, line)
+
+    def _write(self, line: str) -> None:
+        self._file.write(line)
+        self._file.flush()
+
+    def _load(self) -> dict[str, ManifestEntry]:
+        entries = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = ManifestEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        continue  # line was cut off by an interruption
+                    entries[entry.path] = entry
+        except FileNotFoundError:
+            pass
+        return entries
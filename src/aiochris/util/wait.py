@@ -0,0 +1,306 @@
+"""
+Waiting on many plugin instances using a shared poller, and on feeds and workflows.
+
+Examples
+--------
+
+```python
+from aiochris.util.wait import WaitManager
+
+manager = WaitManager(chris, interval=5)
+results = await asyncio.gather(*(manager.wait(p) for p in plinsts))
+print(f"{len(plinsts)} plugin instances took {manager.requests} searches")
+```
+"""
+
+import asyncio
+import dataclasses
+import logging
+import math
+import time
+from collections.abc import AsyncIterator, Iterable, Sequence
+from typing import Optional, TypeVar, TYPE_CHECKING
+
+import aiohttp
+
+from aiochris.enums import Status
+from aiochris.errors import InternalServerError
+from aiochris.util.search import acollect
+
+if TYPE_CHECKING:
+    from aiochris.client.authed import AuthenticatedClient
+    from aiochris.models.logged_in import Feed, PluginInstance
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+FINAL_STATUSES = (
+    Status.finishedSuccessfully,
+    Status.finishedWithError,
+    Status.cancelled,
+)
+
+JOB_COUNTERS = (
+    "created_jobs",
+    "waiting_jobs",
+    "scheduled_jobs",
+    "started_jobs",
+    "registering_jobs",
+    "finished_jobs",
+    "errored_jobs",
+    "cancelled_jobs",
+)
+"""Fields of a feed which count its plugin instances by status."""
+
+ACTIVE_JOB_COUNTERS = JOB_COUNTERS[:5]
+"""Counters of plugin instances which are not finished."""
+
+
+def active_jobs(resource) -> int:
+    """Number of plugin instances counted by a feed or workflow which are not finished."""
+    return sum(getattr(resource, counter) for counter in ACTIVE_JOB_COUNTERS)
+
+
+def count_changes(before, after) -> dict[str, int]:
+    """Differences of the job counters of two states of a feed or workflow."""
+    return {
+        counter: diff
+        for counter in JOB_COUNTERS
+        if (diff := getattr(after, counter) - getattr(before, counter))
+    }
+
+
+async def watch_job_counters(
+    resource: T,
+    min_interval: float,
+    max_interval: float,
+    backoff: float,
+    timeout: Optional[float],
+) -> AsyncIterator[tuple[T, dict[str, int]]]:
+    """
+    Poll a feed or workflow, producing its new state and the changes of its job counters.
+
+    See `aiochris.models.logged_in.Feed.watch`.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    interval = min_interval
+    cur = resource
+    while True:
+        sleep = interval
+        if deadline is not None:
+            if (remaining := deadline - time.monotonic()) <= 0:
+                raise TimeoutError(f"Stopped watching {resource.url} after {timeout}s")
+            sleep = min(sleep, remaining)
+        await asyncio.sleep(sleep)
+        prev, cur = cur, await cur.get()
+        if changes := count_changes(prev, cur):
+            interval = min_interval
+            yield cur, changes
+        else:
+            interval = min(interval * backoff, max_interval)
+
+
+@dataclasses.dataclass(frozen=True)
+class FeedDelta:
+    """
+    A change of the job counters of a feed, produced by
+    `aiochris.models.logged_in.Feed.watch`.
+    """
+
+    feed: "Feed"
+    """Current state of the feed."""
+    changes: dict[str, int]
+    """Differences of the job counters which changed, e.g. `{"finished_jobs": 3}`."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _Waiter:
+    statuses: frozenset[Status]
+    future: asyncio.Future
+
+
+class WaitManager:
+    """
+    Waits on plugin instances by polling their statuses in batches.
+
+    Plugin instances which are being waited on are refreshed every `interval` seconds
+    using `plugin_instances` searches filtered by feed or by ranges of ID numbers,
+    so that each page of results covers many plugin instances. The number of requests
+    grows with the number of pages rather than the number of plugin instances.
+
+    Polling happens in the background while there is at least one waiter.
+    If refreshing fails because of a network error or a 5XX response, it is retried
+    with exponential backoff. Waiters only fail after `max_failures` such failures
+    in a row, or on any other error.
+    """
+
+    def __init__(
+        self,
+        client: "AuthenticatedClient",
+        interval: float = 5,
+        page_size: int = 100,
+        max_failures: int = 5,
+    ):
+        """
+        Parameters
+        ----------
+        client
+            client used to search for plugin instances
+        interval
+            Number of seconds to wait between refreshing statuses
+        page_size
+            Number of plugin instances per page of search results
+        max_failures
+            Number of transient failures in a row after which waiters fail
+        """
+        self.client = client
+        self.interval = interval
+        self.page_size = page_size
+        self.max_failures = max_failures
+        self.requests = 0
+        """Number of searches made."""
+        self._waiters: dict[int, list[_Waiter]] = {}
+        self._latest: dict[int, "PluginInstance"] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(
+        self,
+        plinst: "PluginInstance",
+        status: Status | Sequence[Status] = FINAL_STATUSES,
+        timeout: float = 300,
+    ) -> tuple[float, "PluginInstance"]:
+        """
+        Wait until a plugin instance finishes (or some other desired status).
+
+        Same as `aiochris.models.logged_in.PluginInstance.wait`,
+        except that polling is shared with other waiters.
+        """
+        statuses = frozenset((status,) if isinstance(status, Status) else status)
+        if plinst.status in statuses:
+            return 0.0, plinst
+        start = time.monotonic()
+        waiter = _Waiter(statuses, asyncio.get_running_loop().create_future())
+        self._latest.setdefault(plinst.id, plinst)
+        self._waiters.setdefault(plinst.id, []).append(waiter)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        try:
+            cur = await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except TimeoutError:
+            cur = self._latest[plinst.id]
+        finally:
+            self._remove(plinst.id, waiter)
+        return time.monotonic() - start, cur
+
+    async def refresh(self) -> None:
+        """
+        Get the current statuses of all plugin instances being waited on,
+        and resolve the waiters of those which reached a desired status.
+        """
+        by_feed: dict[int, list[int]] = {}
+        for plinst_id in self._waiters:
+            by_feed.setdefault(self._latest[plinst_id].feed_id, []).append(plinst_id)
+        queries = plan_searches(by_feed, self.page_size)
+        self.requests += len(queries)
+        pages = await asyncio.gather(
+            *(
+                acollect(self.client.plugin_instances(limit=self.page_size, **query))
+                for query in queries
+            )
+        )
+        for plinst in (p for page in pages for p in page):
+            if (waiters := self._waiters.get(plinst.id)) is None:
+                continue
+            self._latest[plinst.id] = plinst
+            for waiter in waiters:
+                if plinst.status in waiter.statuses and not waiter.future.done():
+                    waiter.future.set_result(plinst)
+
+    async def _poll(self) -> None:
+        failures = 0
+        while self._waiters:
+            await asyncio.sleep(self.interval * 2**failures)
+            if not self._waiters:
+                break
+            try:
+                await self.refresh()
+            except Exception as e:
+                failures += 1
+                if _is_transient(e) and failures < self.max_failures:
+                    logger.warning(
+                        "failed to refresh plugin instances (failure %d of %d): %s",
+                        failures,
+                        self.max_failures,
+                        e,
+                    )
+                    continue
+                logger.debug("failed to refresh plugin instances: %s", e)
+                failures = 0
+                for waiter in (w for ws in self._waiters.values() for w in ws):
+                    if not waiter.future.done():
+                        waiter.future.set_exception(e)
+            else:
+                failures = 0
+
+    def _remove(self, plinst_id: int, waiter: _Waiter) -> None:
+        waiters = self._waiters.get(plinst_id, [])
+        if waiter in waiters:
+            waiters.remove(waiter)
+        if not waiters:
+            self._waiters.pop(plinst_id, None)
+            self._latest.pop(plinst_id, None)
+
+
+def _is_transient(e: Exception) -> bool:
+    """Whether a failed request is worth retrying."""
+    return isinstance(e, (aiohttp.ClientError, TimeoutError, InternalServerError))
+
+
+def plan_searches(
+    by_feed: dict[int, list[int]], page_size: int
+) -> list[dict[str, int]]:
+    """
+    Plan the queries to search for plugin instances by ID number.
+
+    The plugin instances of a feed are searched for using a `feed_id` filter when
+    that takes fewer pages than ranges of ID numbers. All other plugin instances are
+    searched for using ranges of ID numbers which each fit in a page.
+
+    Parameters
+    ----------
+    by_feed
+        ID numbers of plugin instances, by feed ID
+    page_size
+        number of items per page
+    """
+    queries = []
+    pooled = []
+    for feed_id, ids in by_feed.items():
+        ids = sorted(ids)
+        if math.ceil(len(ids) / page_size) < len(_id_ranges(ids, page_size)):
+            queries.append({"feed_id": feed_id, "min_id": ids[0], "max_id": ids[-1]})
+        else:
+            pooled.extend(ids)
+    queries.extend(
+        {"min_id": lo, "max_id": hi} for lo, hi in _id_ranges(sorted(pooled), page_size)
+    )
+    return queries
+
+
+def _id_ranges(ids: Iterable[int], width: int) -> list[tuple[int, int]]:
+    """
+    Group sorted ID numbers into inclusive ranges which span at most `width` numbers.
+    """
+    ranges = []
+    start = prev = None
+    for i in ids:
+        if start is None:
+            start = i
+        elif i - start >= width:
+            ranges.append((start, prev))
+            start = i
+        prev = i
+    if start is not None:
+        ranges.append((start, prev))
+    return ranges
@@ -0,0 +1,98 @@
+"""
+Concurrent breadth-first traversal of the *CUBE* filebrowser.
+"""
+
+import asyncio
+import dataclasses
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Sequence
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiochris.models.logged_in import File
+
+
+@dataclasses.dataclass(frozen=True)
+class WalkEntry:
+    """
+    A folder of the filebrowser, like a tuple produced by `os.walk`.
+    """
+
+    path: str
+    """Path of this folder, without a trailing slash."""
+    subfolders: Sequence[str]
+    """Names of the subfolders of this folder."""
+    files: Sequence["File"]
+    """Files directly in this folder. Empty if files were not listed."""
+
+    @property
+    def size(self) -> int:
+        """Total size of the files directly in this folder, in bytes."""
+        return sum(f.fsize for f in self.files)
+
+
+ListFolder = Callable[[str], Awaitable[Optional[WalkEntry]]]
+"""A function which lists a folder, or returns `None` if the folder does not exist."""
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+async def walk_tree(
+    list_folder: ListFolder, root: str, concurrency: int
+) -> AsyncIterator[WalkEntry]:
+    """
+    List every folder under `root` breadth-first, up to `concurrency` at a time.
+
+    Entries are produced as soon as they are listed. Folders which do not exist
+    (e.g. they were deleted during the walk) are skipped.
+    """
+    todo: asyncio.Queue[str] = asyncio.Queue()
+    results: asyncio.Queue = asyncio.Queue(maxsize=2 * max(1, concurrency))
+    done = object()
+
+    async def worker() -> None:
+        while True:
+            path = await todo.get()
+            try:
+                if (entry := await list_folder(path)) is not None:
+                    for name in entry.subfolders:
+                        todo.put_nowait(_join(path, name))
+                    await results.put(entry)
+            except Exception as e:
+                await results.put(e)
+            finally:
+                todo.task_done()
+
+    async def finish() -> None:
+        await todo.join()
+        await results.put(done)
+
+    todo.put_nowait(root.strip("/"))
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    tasks.append(asyncio.create_task(finish()))
+    try:
+        while (item := await results.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def aggregate_sizes(entries: Iterable[WalkEntry]) -> dict[str, int]:
+    """
+    Compute the total size of every folder, including all of its subfolders.
+    """
+    totals: dict[str, int] = {}
+    for entry in entries:
+        totals[entry.path] = totals.get(entry.path, 0) + entry.size
+    for path in sorted(totals, key=lambda p: p.count("/") if p else -1, reverse=True):
+        if not path:
+            continue
+        parent = path.rsplit("/", 1)[0] if "/" in path else ""
+        if parent in totals:
+            totals[parent] += totals[path]
+    return totals
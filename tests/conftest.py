@@ -2,8 +2,11 @@ from dataclasses import dataclass
 
 import aiohttp
 import pytest
+import pytest_asyncio
 from pytest_asyncio import is_async_test
 
+from aiochris import ChrisClient
+from aiochris.testing import FakeCube
 from aiochris.types import ChrisURL, Username, Password
 
 # N.B.: We're doing wacky things with asyncio, pytest, and aiohttp here.
@@ -28,6 +31,15 @@ def pytest_collection_modifyitems(items):
         async_test.add_marker(session_scope_marker, append=False)
 
 
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path_factory, monkeypatch):
+    """
+    Keep caches, e.g. `aiochris.util.parameters.ParameterCache.default()` and
+    upload manifests, out of the home directory and out of `tmp_path`.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
+
+
 @dataclass
 class UserCredentials:
     username: Username
@@ -36,9 +48,52 @@ class UserCredentials:
 
 
 @pytest.fixture(scope="session")
-def admin_credentials() -> UserCredentials:
+async def cube_url(session: aiohttp.ClientSession) -> ChrisURL:
+    """
+    URL of a live CUBE at localhost:8000 if one is running, otherwise the URL
+    of a `aiochris.testing.FakeCube`.
+    """
+    live_url = ChrisURL("http://localhost:8000/api/v1/")
+    try:
+        async with session.get(live_url):
+            pass
+    except aiohttp.ClientConnectorError:
+        async with FakeCube().serve() as url:
+            yield url
+        return
+    yield live_url
+
+
+@pytest.fixture(scope="session")
+def admin_credentials(cube_url: ChrisURL) -> UserCredentials:
     return UserCredentials(
         username=Username("chris"),
         password=Password("chris1234"),
-        url=ChrisURL("http://localhost:8000/api/v1/"),
+        url=cube_url,
     )
+
+
+@pytest.fixture
+def fake_cube(request: pytest.FixtureRequest) -> FakeCube:
+    """
+    A `aiochris.testing.FakeCube` for one test, which is configured by the keyword
+    arguments of the test's `@pytest.mark.fake_cube(...)` marker.
+    """
+    marker = request.node.get_closest_marker("fake_cube")
+    return FakeCube(**(marker.kwargs if marker else {}))
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def fake_cube_url(fake_cube: FakeCube) -> ChrisURL:
+    """URL of the `fake_cube` fixture, which is served during the test."""
+    async with fake_cube.serve() as url:
+        yield url
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def chris(fake_cube_url: ChrisURL) -> ChrisClient:
+    """A client of the `fake_cube` fixture, logged in as the user "chris"."""
+    async with await ChrisClient.from_login(
+        url=fake_cube_url, username="chris", password="chris1234"
+    ) as client:
+        yield client
@@ -59,11 +59,13 @@ class MockResponse:
     status: int = 200
     text: AsyncMock = dataclasses.field(default_factory=AsyncMock)
     json: AsyncMock = dataclasses.field(default_factory=AsyncMock)
+    read: AsyncMock = dataclasses.field(default_factory=AsyncMock)
     raise_for_status: Mock = dataclasses.field(default_factory=Mock)
 
     def __post_init__(self):
         self.text.return_value = json.dumps(self.data)
         self.json.return_value = self.data
+        self.read.return_value = self.text.return_value.encode()
 
 
 class MockRequest(AsyncContextManager[Mock]):
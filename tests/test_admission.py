@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from aiochris import ChrisClient, Status
+from aiochris.testing import FakeCube
+from aiochris.util.admission import (
+    AdmissionController,
+    ResourceBudget,
+    Usage,
+    parse_quantity,
+)
+
+
+def test_usage():
+    assert parse_quantity("2Gi") == 2048
+    assert parse_quantity("1500m") == 1500
+    assert Usage.of_params({"cpu_limit": "500m", "number_of_workers": 2}) == Usage(
+        cpu=1000, memory=400, gpu=0, jobs=1
+    )
+    budget = ResourceBudget(cpu=2000, gpu=1)
+    assert budget.allows(Usage(cpu=2000, memory=10**6, jobs=100))
+    assert not budget.allows(Usage(cpu=1000, gpu=2))
+
+
+@pytest.mark.fake_cube(job_script=(("started", 0.15), ("finishedSuccessfully", 0)))
+async def test_admission_controller(chris: ChrisClient):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+    budgets = {"host": ResourceBudget(cpu=2000)}
+    async with AdmissionController(chris, budgets, interval=0.05) as admission:
+        with pytest.raises(ValueError):
+            await ds.create_instance(root, admission=admission, cpu_limit="3000m")
+        with pytest.raises(ValueError):
+            async for _ in ds.create_instances(
+                [root], admission=admission, memory_limit="1.5Gi"
+            ):
+                pass
+        too_much = [
+            r
+            async for r in ds.create_instances(
+                [root] * 2, admission=admission, cpu_limit="3000m"
+            )
+        ]
+        assert [type(r.error) for r in too_much] == [ValueError] * 2
+        results = [
+            r
+            async for r in ds.create_instances(
+                [root] * 6,
+                concurrency=6,
+                admission=admission,
+                cpu_limit="1000m",
+            )
+        ]
+        assert all(r.ok for r in results)
+        assert admission.stats.admitted == 6
+        assert admission.stats.held >= 4
+        assert admission.stats.peak["host"].cpu == 2000
+        # plugin instances were created as earlier ones finished
+        created = sorted(r.plinst.id for r in results)
+        first = await chris.plugin_instances(id=created[0]).get_only()
+        assert first.status is Status.finishedSuccessfully
+
+
+@pytest.mark.fake_cube(job_script=(("started", 60), ("finishedSuccessfully", 0)))
+async def test_admission_keeps_reservation_when_cancelled(
+    chris: ChrisClient, fake_cube: FakeCube
+):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+    budgets = {"host": ResourceBudget(jobs=2)}
+    async with AdmissionController(chris, budgets, interval=60.0) as admission:
+        before = len(fake_cube.plugin_instances.table)
+        fake_cube.bandwidth = 5000  # the response is sent slowly
+        task = asyncio.create_task(ds.create_instance(root, admission=admission))
+        while len(fake_cube.plugin_instances.table) == before:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        fake_cube.bandwidth = 0
+        assert admission.usage("host").jobs == 1
+
+        await admission.refresh()  # it was created after all
+        assert admission.usage("host").jobs == 1
+        assert len(admission._tracked) == 1
@@ -0,0 +1,48 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from aiochris import ChrisClient
+from aiochris.util.archive import stream_archive
+
+_CONTENTS = {
+    "a.txt": b"",
+    "sub/b.dat": bytes(range(256)) * 40,
+    "sub/deeper/c.txt": b"c" * 513,
+}
+
+
+@pytest.mark.parametrize("format", ["tar", "zip"])
+async def test_stream_archive(format: str, chris: ChrisClient):
+    for name, content in _CONTENTS.items():
+        await chris.upload(content, f"arc/{name}")
+    files = chris._search_uploaded_files(fname="chris/uploads/arc/")
+    chunks = [
+        c
+        async for c in stream_archive(
+            files,
+            format=format,
+            concurrency=2,
+            arcname=lambda f: f.fname.removeprefix("chris/uploads/arc/"),
+            chunk_size=1000,
+            buffer_chunks=1,
+        )
+    ]
+    assert max(len(c) for c in chunks) <= tarfile.RECORDSIZE
+    archive = io.BytesIO(b"".join(chunks))
+    if format == "tar":
+        with tarfile.open(fileobj=archive) as tar:
+            actual = {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+    else:
+        with zipfile.ZipFile(archive) as z:
+            assert z.testzip() is None
+            actual = {n: z.read(n) for n in z.namelist()}
+    assert actual == _CONTENTS
+
+
+async def test_stream_archive_unknown_format():
+    with pytest.raises(ValueError):
+        async for _ in stream_archive([], format="rar"):
+            pass
@@ -0,0 +1,13 @@
+import json
+
+from aiochris.bench import BenchConfig, run
+
+
+async def test_bench_report():
+    config = BenchConfig(scale=0.01, repeat=1)
+    report = await run(config, only=["pagination", "deserialize", "wait"])
+    assert set(report["results"]) == {"pagination", "deserialize", "wait"}
+    assert report["results"]["pagination"]["items_per_second"] > 0
+    assert report["results"]["deserialize"]["PluginInstance_per_second"] > 0
+    assert report["config"] == {"scale": 0.01, "repeat": 1}
+    json.dumps(report)
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from aiochris import ChrisClient
+from aiochris.errors import BadRequestError
+from aiochris.testing import FakeCube
+from aiochris.util.bulk import RateLimiter
+
+
+async def test_create_instances(chris: ChrisClient, fake_cube: FakeCube):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+    previous = [await dircopy.create_instance(dir="chris/uploads") for _ in range(20)]
+    missing_id = 999999
+
+    requests_before = fake_cube.request_count
+    results = [
+        r
+        async for r in ds.create_instances(
+            [*previous, missing_id], concurrency=4, prefix="x"
+        )
+    ]
+    # one request for the parameters, one per plugin instance
+    assert fake_cube.request_count - requests_before == 1 + len(previous) + 1
+    assert sorted(r.previous_id for r in results if r.ok) == sorted(
+        p.id for p in previous
+    )
+    assert all(r.plinst.previous_id == r.previous_id for r in results if r.ok)
+    (failed,) = [r for r in results if not r.ok]
+    assert failed.previous_id == missing_id
+    assert isinstance(failed.error, BadRequestError)
+    assert failed.request_data["previous_id"] == missing_id
+    assert failed.request_data["prefix"] == "x"
+
+    with pytest.raises(ValueError, match="nope"):
+        async for _ in ds.create_instances(previous, nope=1):
+            pass
+    with pytest.raises(ValueError):
+        async for _ in dircopy.create_instances(previous, dir="chris"):
+            pass
+
+
+async def test_rate_limiter():
+    limiter = RateLimiter(100)
+    start = time.monotonic()
+    for _ in range(11):
+        await limiter.acquire()
+    assert time.monotonic() - start >= 0.1 - 0.01
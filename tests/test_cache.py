@@ -0,0 +1,77 @@
+import pytest
+import asyncio
+import dataclasses
+
+from aiochris import ChrisClient
+from aiochris.testing import FakeCube
+from aiochris.util.cache import FileCache
+
+
+async def test_file_cache(tmp_path, chris: ChrisClient, fake_cube: FakeCube):
+    cache = FileCache(tmp_path / "cache", max_bytes=25_000)
+    files = [
+        await chris.upload(bytes([i]) * 10_000, f"cached/{i}.dat") for i in range(3)
+    ]
+
+    requests_before = fake_cube.request_count
+    paths = await asyncio.gather(
+        *(files[0].download(tmp_path / f"{i}.dat", cache=cache) for i in range(5))
+    )
+    assert fake_cube.request_count - requests_before == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 4
+    assert all(p.read_bytes() == bytes([0]) * 10_000 for p in paths)
+
+    chunks = [c async for c in files[0].iter_chunks(4096, cache=cache)]
+    assert b"".join(chunks) == bytes([0]) * 10_000
+    assert fake_cube.request_count - requests_before == 1
+
+    # files[0] is the least recently used when files[2] is added
+    await files[1].download(tmp_path / "1.dat", cache=cache)
+    await files[2].download(tmp_path / "2.dat", cache=cache)
+    assert cache.stats.evictions == 1
+    assert cache.size() == 20_000
+    await files[1].download(tmp_path / "1.dat", cache=cache)
+    assert cache.stats.misses == 3
+
+    # a different fsize is a different key
+    wrong = dataclasses.replace(files[1], fsize=1)
+    assert FileCache.key(wrong.file_resource, 1) != FileCache.key(
+        files[1].file_resource, files[1].fsize
+    )
+
+
+async def test_file_cache_revalidate(tmp_path, chris: ChrisClient):
+    cache = FileCache(tmp_path / "cache", revalidate=True)
+    file = await chris.upload(b"hello", "hello.txt")
+    await cache.get(file)
+    await cache.get(file)
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+
+@pytest.mark.fake_cube(bandwidth=1_000_000)
+async def test_file_cache_shared_directory(tmp_path, chris: ChrisClient):
+    """Caches sharing a directory, as different processes would, download once."""
+    caches = [FileCache(tmp_path / "cache") for _ in range(3)]
+    file = await chris.upload(bytes(100_000), "shared.dat")
+    await asyncio.gather(*(cache.get(file) for cache in caches))
+    assert sum(cache.stats.misses for cache in caches) == 1
+
+
+async def test_file_cache_does_not_evict_while_reading(tmp_path, chris: ChrisClient):
+    cache = FileCache(tmp_path / "cache", max_bytes=15_000)
+    first = await chris.upload(bytes([1]) * 10_000, "read/1.dat")
+    second = await chris.upload(bytes([2]) * 10_000, "read/2.dat")
+
+    chunks = cache.iter_chunks(first, 4096)
+    data = await anext(chunks)
+    await cache.get(second)  # over budget, but first is being read
+    assert cache.stats.evictions == 0
+    data += b"".join([c async for c in chunks])
+    assert data == bytes([1]) * 10_000
+
+    third = await chris.upload(bytes([3]) * 10_000, "read/3.dat")
+    await cache.get(third)  # nothing is being read anymore
+    assert cache.stats.evictions == 2
+    assert cache.size() == 10_000
@@ -0,0 +1,141 @@
+import time
+
+import pytest
+
+from aiochris import ChrisClient
+from aiochris.testing import FakeCube, SyntheticData, Cassette, Recorder, Replayer
+from aiochris.testing.cassette import REDACTED
+from aiochris.types import ChrisURL
+from aiochris.util.cache import FileCache
+
+
+async def _login(url: str) -> ChrisClient:
+    return await ChrisClient.from_login(url=url, username="chris", password="chris1234")
+
+
+async def _workload(url: str) -> tuple[list[str], str]:
+    async with await _login(url) as chris:
+        fnames = [f.fname async for f in chris.search_pacsfiles(limit=7)]
+        dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+        plinst = await dircopy.create_instance(dir="chris/uploads/replayed")
+        _, finished = await plinst.wait(interval=0.02)
+        return fnames, finished.status.value
+
+
+@pytest.mark.fake_cube(data=SyntheticData(pacsfiles=50), latency=0.01)
+async def test_record_and_replay(tmp_path, fake_cube_url: ChrisURL):
+    recorder = Recorder(fake_cube_url)
+    async with recorder.serve() as proxy_url:
+        recorded = await _workload(proxy_url)
+    assert len(recorded[0]) == 50
+    assert recorded[1] == "finishedSuccessfully"
+
+    cassette_file = tmp_path / "cassette.jsonl.gz"
+    recorder.cassette.save(cassette_file)
+    cassette = Cassette.load(cassette_file)
+    assert cassette == recorder.cassette
+    assert not any(b"127.0.0.1" in i.body for i in cassette.interactions)
+
+    replayer = Replayer(cassette)
+    async with replayer.serve() as replay_url:
+        assert await _workload(replay_url) == recorded
+    assert replayer.misses == []
+
+
+@pytest.mark.fake_cube(latency=0.02)
+async def test_replay_recorded_timing(fake_cube_url: ChrisURL):
+    recorder = Recorder(fake_cube_url)
+    async with recorder.serve() as proxy_url:
+        chris = await _login(proxy_url)
+        await chris.close()
+    async with Replayer(recorder.cassette, timing="recorded").serve() as url:
+        start = time.monotonic()
+        chris = await _login(url)
+        await chris.close()
+        assert time.monotonic() - start >= 0.04
+
+
+async def _download_workload(url: str, tmp_path) -> tuple[bytes, int]:
+    cache = FileCache(tmp_path / "cache", revalidate=True)
+    async with await _login(url) as chris:
+        file = await chris.upload(_CONTENT, "ranged.dat")
+        path = await file.download(
+            tmp_path / "ranges.dat", concurrency=3, part_size=10_000
+        )
+        await cache.get(file)
+        await cache.get(file)  # revalidated with If-None-Match
+        return path.read_bytes(), cache.stats.hits
+
+
+_CONTENT = bytes(range(256)) * 128
+
+
+async def test_replay_response_headers(tmp_path, fake_cube_url: ChrisURL):
+    recorder = Recorder(fake_cube_url)
+    async with recorder.serve() as proxy_url:
+        recorded = await _download_workload(proxy_url, tmp_path / "recorded")
+    assert recorded == (_CONTENT, 1)
+    interactions = recorder.cassette.interactions
+    ranged = [i for i in interactions if "Range" in i.request_headers]
+    assert len(ranged) == 4
+    assert all("Content-Range" in i.headers for i in ranged)
+    assert any(i.status == 304 and "ETag" in i.headers for i in interactions)
+
+    replayer = Replayer(recorder.cassette)
+    async with replayer.serve() as replay_url:
+        assert await _download_workload(replay_url, tmp_path / "replayed") == recorded
+    assert replayer.misses == []
+
+
+async def test_record_redacts_tokens(
+    tmp_path, fake_cube: FakeCube, fake_cube_url: ChrisURL
+):
+    recorder = Recorder(fake_cube_url)
+    async with recorder.serve() as proxy_url:
+        async with await _login(proxy_url) as chris:
+            await chris.username()
+    (token,) = fake_cube._tokens
+    cassette_file = tmp_path / "cassette.jsonl"
+    recorder.cassette.save(cassette_file)
+    saved = cassette_file.read_text()
+    assert token not in saved
+    assert "chris1234" not in saved
+    assert "Authorization" not in saved
+    assert REDACTED in saved
+
+    replayer = Replayer(Cassette.load(cassette_file))
+    async with replayer.serve() as replay_url:
+        async with await _login(replay_url) as chris:
+            assert await chris.username() == "chris"
+    assert replayer.misses == []
+
+
+async def _repeated_download_workload(url: str, tmp_path) -> list[bytes]:
+    async with await _login(url) as chris:
+        small = await chris.upload(_CONTENT[:100], "small.dat")
+        big = await chris.upload(_CONTENT, "big.dat")
+        return [
+            (await file.download(tmp_path / f"{i}.dat")).read_bytes()
+            for i, file in enumerate((small, small, small, big))
+        ]
+
+
+async def test_save_binary_bodies_once(tmp_path, fake_cube_url: ChrisURL):
+    recorder = Recorder(fake_cube_url, max_body_bytes=len(_CONTENT) - 1)
+    async with recorder.serve() as proxy_url:
+        recorded = await _repeated_download_workload(proxy_url, tmp_path)
+    assert recorded == [_CONTENT[:100]] * 3 + [_CONTENT]
+
+    cassette_file = tmp_path / "cassette.jsonl"
+    recorder.cassette.save(cassette_file)
+    blobs = [line for line in cassette_file.open() if line.startswith('{"blob"')]
+    assert len(blobs) == 1
+    cassette = Cassette.load(cassette_file)
+    elided = [i for i in cassette.interactions if i.elided]
+    assert [(i.body, i.replayed_body) for i in elided] == [(b"", bytes(len(_CONTENT)))]
+
+    replayer = Replayer(cassette)
+    async with replayer.serve_in_thread() as replay_url:
+        replayed = await _repeated_download_workload(replay_url, tmp_path)
+    assert replayed == [_CONTENT[:100]] * 3 + [bytes(len(_CONTENT))]
+    assert replayer.misses == []
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import tests.examples.plugin_description as example_descriptions
+from aiochris import ChrisAdminClient
+from aiochris.types import ChrisURL
+from aiochris.util.compute import ComputeResourceSelector
+
+
+@pytest.mark.fake_cube(job_script=(("started", 60), ("finishedSuccessfully", 0)))
+async def test_select_least_loaded(fake_cube_url: ChrisURL):
+    async with await ChrisAdminClient.from_login(
+        url=fake_cube_url, username="chris", password="chris1234"
+    ) as chris:
+        crs = [
+            await chris.create_compute_resource(
+                name=name,
+                compute_url="http://pfcon.local:5005/api/v1/",
+                compute_user="pfcon",
+                compute_password="pfcon1234",
+                max_job_exec_seconds=seconds,
+            )
+            for name, seconds in (("a", "3600"), ("b", "86400"))
+        ]
+        plugin = await chris.add_plugin(
+            json.loads(example_descriptions.pl_nums2mask), crs
+        )
+        dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+        root = await dircopy.create_instance(dir="chris/uploads")
+        for _ in range(2):
+            await plugin.create_instance(
+                previous=root, compute_resource_name="b", value="1"
+            )
+
+        now = 0.0
+        selector = ComputeResourceSelector(chris, ttl=5, clock=lambda: now)
+        assert (await selector.load("b")).total == 2
+        picks = [await selector.select(plugin) for _ in range(4)]
+        # a is less loaded, then b wins ties because it allows longer jobs
+        assert picks == ["a", "a", "b", "a"]
+        assert await selector.select(plugin, min_exec_seconds=7200) == "b"
+        assert selector.requests == 10
+
+        now = 6.0
+        await selector.select(plugin)
+        assert selector.requests == 20
+
+        # assignments made while counting might not be counted by the search
+        selector._assigned["a"] = [5.0, 7.0]
+        await selector._measure("a")
+        assert selector._assigned["a"] == [7.0]
+        with pytest.raises(ValueError):
+            await selector.select(plugin, min_exec_seconds=10**6)
+
+        selector = ComputeResourceSelector(chris, clock=lambda: now)
+        results = [
+            r
+            async for r in plugin.create_instances(
+                [root] * 6, concurrency=1, selector=selector, value="1"
+            )
+        ]
+        names = sorted(r.plinst.compute_resource_name for r in results)
+        # loads were a=0, b=2 before the batch
+        assert names == ["a"] * 4 + ["b"] * 2
@@ -0,0 +1,45 @@
+import pytest
+
+from aiochris import ChrisClient, Status
+from aiochris.testing import FakeCube
+from aiochris.util.dag import Dag
+from aiochris.util.wait import WaitManager
+
+
+@pytest.mark.fake_cube(job_script=(("started", 0.1), ("finishedSuccessfully", 0)))
+async def test_launch_dag(chris: ChrisClient, fake_cube: FakeCube):
+    dag = Dag()
+    root = dag.add("pl-dircopy", dir="chris/uploads")
+    branches = [
+        dag.add("pl-simpledsapp", previous=root, prefix=str(i)) for i in range(5)
+    ]
+    leaves = [dag.add("pl-simpledsapp", previous=b) for b in branches]
+    with pytest.raises(ValueError):
+        Dag().add("pl-simpledsapp", previous=root)
+
+    requests_before = fake_cube.request_count
+    run = await dag.launch(chris, concurrency=4)
+    # one search per distinct plugin, one POST per node
+    assert fake_cube.request_count - requests_before == 2 + len(dag.nodes)
+    assert run.ok
+    assert len(run) == len(dag.nodes)
+    assert all(run[b].previous_id == run[root].id for b in branches)
+    assert [run[leaf].previous_id for leaf in leaves] == [run[b].id for b in branches]
+
+    elapsed, plinsts = await run.wait(
+        manager=WaitManager(chris, interval=0.05), timeout=10
+    )
+    assert all(p.status is Status.finishedSuccessfully for p in plinsts.values())
+
+
+async def test_launch_dag_failure(chris: ChrisClient):
+    dag = Dag()
+    root = dag.add("pl-dircopy", dir="chris/uploads")
+    good = dag.add("pl-simpledsapp", previous=root)
+    bad = dag.add("pl-simpledsapp", previous=root, sleepLength="nope")
+    after_bad = dag.add("pl-simpledsapp", previous=bad)
+    run = await dag.launch(chris)
+    assert not run.ok
+    assert list(run.failed) == [bad]
+    assert run.skipped == [after_bad]
+    assert set(run) == {root, good}
@@ -0,0 +1,95 @@
+import logging
+import warnings
+from types import SimpleNamespace
+
+import pytest
+from pytest_mock import MockerFixture
+
+from aiochris import ChrisClient
+from aiochris.errors import BadRequestError
+from aiochris.util.diagnostics import (
+    RequestWatcher,
+    RepeatedRequestWarning,
+    current_watcher,
+)
+from tests.link.test_http_decorators import (
+    ExampleClient,
+    MockRequest,
+    example_client,  # noqa
+)
+
+
+def test_watcher_context():
+    assert current_watcher() is None
+    with RequestWatcher() as watcher:
+        assert current_watcher() is watcher
+    assert current_watcher() is None
+
+
+async def test_repeated_request_warning(
+    example_client: ExampleClient, mocker: MockerFixture
+):
+    page = {"count": 4, "next": None, "previous": None, "results": ["a", "b", "c", "d"]}
+    example_client.s.get = MockRequest.using(mocker, page)
+    example_client.s.post = mocker.Mock(
+        side_effect=lambda *_a, **_k: MockRequest([], 200)
+    )
+    with RequestWatcher(repeat_threshold=3, slow_threshold=None):
+        with pytest.warns(RepeatedRequestWarning, match="example_collection_name"):
+            async for _ in example_client.example_search():
+                await example_client.example_method(a_param="hello")
+
+
+async def test_repeated_request_outside_search(
+    example_client: ExampleClient, mocker: MockerFixture
+):
+    example_client.s.post = mocker.Mock(
+        side_effect=lambda *_a, **_k: MockRequest([], 200)
+    )
+    with RequestWatcher(repeat_threshold=1, slow_threshold=None) as watcher:
+        for _ in range(3):
+            await example_client.example_method(a_param="hello")
+    assert not watcher._tasks[next(iter(watcher._tasks))].iterating
+
+
+async def test_repeated_request_after_search(
+    example_client: ExampleClient, mocker: MockerFixture
+):
+    page = {"count": 1, "next": None, "previous": None, "results": ["a"]}
+    example_client.s.get = MockRequest.using(mocker, page)
+    example_client.s.post = mocker.Mock(
+        side_effect=lambda *_a, **_k: MockRequest([], 200)
+    )
+    with RequestWatcher(repeat_threshold=1, slow_threshold=None) as watcher:
+        async for _ in example_client.example_search():
+            pass
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RepeatedRequestWarning)
+            for _ in range(3):
+                await example_client.example_method(a_param="hello")
+    state = watcher._tasks[next(iter(watcher._tasks))]
+    assert not state.iterating
+    assert state.repeats == 3
+
+
+def test_slow_request_logged(caplog):
+    res = SimpleNamespace(method="GET", url="https://example.com/slow/", status=200)
+    watcher = RequestWatcher(slow_threshold=0.5)
+    with caplog.at_level(logging.WARNING, logger="aiochris.util.diagnostics"):
+        watcher.record_response(res, 0.1, 10)
+        assert not caplog.records
+        watcher.record_response(res, 2.0, 1234)
+    assert "https://example.com/slow/" in caplog.text
+    assert "1234 bytes" in caplog.text
+
+
+async def test_failed_and_empty_responses_logged(chris: ChrisClient, caplog):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    plinst = await dircopy.create_instance(dir="chris/uploads")
+    with caplog.at_level(logging.WARNING, logger="aiochris.util.diagnostics"):
+        with RequestWatcher(slow_threshold=0.0):
+            await plinst.delete()
+            with pytest.raises(BadRequestError):
+                await plinst.delete()
+    assert [r.args[3] for r in caplog.records] == [204, 404]
+    assert all(str(r.args[1]) == plinst.url for r in caplog.records)
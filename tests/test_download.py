@@ -0,0 +1,174 @@
+import dataclasses
+
+import pytest
+
+from aiochris import ChrisClient
+from aiochris.errors import DownloadSizeError
+from aiochris.testing import FakeCube, SyntheticData
+
+
+async def test_iter_chunks(chris: ChrisClient):
+    content = bytes(range(256)) * 100
+    uploaded = await chris.upload(content, "chunks.dat")
+    chunks = [c async for c in uploaded.iter_chunks(chunk_size=1000)]
+    assert b"".join(chunks) == content
+    assert [len(c) for c in chunks] == [1000] * 25 + [600]
+
+
+async def test_download(tmp_path, chris: ChrisClient):
+    content = b"hello, download\n" * 1000
+    uploaded = await chris.upload(content, "hello.txt")
+    downloaded = await uploaded.download(tmp_path / "a" / "b.txt", chunk_size=100)
+    assert downloaded.read_bytes() == content
+
+    for wrong_size in (len(content) - 1, len(content) + 1):
+        wrong = dataclasses.replace(uploaded, fsize=wrong_size)
+        with pytest.raises(DownloadSizeError):
+            await wrong.download(tmp_path / "wrong.txt")
+    assert list(tmp_path.iterdir()) == [tmp_path / "a"]
+
+
+@pytest.mark.parametrize("accept_ranges", [True, False])
+async def test_download_ranges(
+    tmp_path, accept_ranges: bool, chris: ChrisClient, fake_cube: FakeCube
+):
+    fake_cube.accept_ranges = accept_ranges
+    content = bytes(range(256)) * 1000
+    uploaded = await chris.upload(content, "ranges.dat")
+    requests_before = fake_cube.request_count
+    downloaded = await uploaded.download(
+        tmp_path / "ranges.dat", concurrency=4, part_size=10_000
+    )
+    assert downloaded.read_bytes() == content
+    assert fake_cube.request_count - requests_before == (26 if accept_ranges else 1)
+
+    wrong = dataclasses.replace(uploaded, fsize=len(content) + 1)
+    with pytest.raises(DownloadSizeError):
+        await wrong.download(tmp_path / "wrong.dat", concurrency=4, part_size=10_000)
+    assert not (tmp_path / "wrong.dat.part").exists()
+
+
+@pytest.mark.fake_cube(
+    data=SyntheticData(
+        feeds=2, plugin_instances=6, outputs_per_instance=3, max_fsize=4096
+    ),
+    page_size=2,
+)
+async def test_download_feed_and_outputs(tmp_path, chris: ChrisClient):
+    feed = await chris.search_feeds(id=1).get_only()
+    expected = {f.fname: f async for f in feed.get_files()}
+    assert len(expected) == 9
+
+    progress = []
+    report = await feed.download_files(
+        tmp_path / "feed", concurrency=3, progress=progress.append
+    )
+    assert report.ok
+    assert len(report.transferred) == 9
+    assert report.progress.total_files == 9
+    assert len(progress) == 9
+    assert {
+        p.relative_to(tmp_path / "feed").as_posix() for p in report.transferred
+    } == {fname.split("/feed_1/", 1)[1] for fname in expected}
+    for fname, file in expected.items():
+        local = tmp_path / "feed" / fname.split("/feed_1/", 1)[1]
+        assert local.stat().st_size == file.fsize
+
+    report = await feed.download_files(tmp_path / "feed")
+    assert report.progress.skipped_files == 9
+
+    plinst = await chris.plugin_instances(id=3).get_only()
+    report = await plinst.download_outputs(tmp_path / "plinst")
+    assert sorted(p.name for p in report.transferred) == [
+        "out0.dat",
+        "out1.dat",
+        "out2.dat",
+    ]
+    assert all(p.parent == tmp_path / "plinst" for p in report.transferred)
+
+
+async def test_sync_down(tmp_path, chris: ChrisClient):
+    local = tmp_path / "mirror"
+    for name in ("a.txt", "sub/b.txt", "sub/c.txt"):
+        await chris.upload(name.encode(), f"synced/{name}")
+    await chris.upload(b"elsewhere", "unsynced.txt")
+
+    report = await chris.sync_down("chris/uploads/synced", local, dry_run=True)
+    assert len(report.transferred) == 3
+    assert not local.exists()
+
+    report = await chris.sync_down("chris/uploads/synced", local)
+    assert sorted(p.relative_to(local).as_posix() for p in report.transferred) == [
+        "a.txt",
+        "sub/b.txt",
+        "sub/c.txt",
+    ]
+    assert (local / "sub" / "b.txt").read_bytes() == b"sub/b.txt"
+
+    (local / "sub" / "c.txt").write_bytes(b"changed locally")
+    (local / "old" / "gone.txt").parent.mkdir()
+    (local / "old" / "gone.txt").write_bytes(b"deleted from CUBE")
+    report = await chris.sync_down(
+        "chris/uploads/synced/", local, delete=True, dry_run=True
+    )
+    assert report.deleted == ["old/gone.txt"]
+    assert (local / "old" / "gone.txt").exists()
+
+    report = await chris.sync_down("chris/uploads/synced", local, delete=True)
+    assert [p.relative_to(local).as_posix() for p in report.transferred] == [
+        "sub/c.txt"
+    ]
+    assert report.progress.skipped_files == 2
+    assert report.deleted == ["old/gone.txt"]
+    assert not (local / "old").exists()
+    assert (local / "sub" / "c.txt").read_bytes() == b"sub/c.txt"
+
+    # other paths cannot be listed from uploaded files, so they would look empty
+    with pytest.raises(ValueError, match="filebrowser=True"):
+        await chris.sync_down("chris/feed_1", local, delete=True)
+    with pytest.raises(ValueError):
+        await chris.sync_down("chris/uploads-not", local, delete=True)
+    assert (local / "a.txt").exists()
+
+
+@pytest.mark.fake_cube(
+    job_script=(
+        ("started", 0.05),
+        ("registeringFiles", 0.3),
+        ("finishedSuccessfully", 0),
+    ),
+    outputs_per_job=6,
+)
+async def test_stream_outputs(tmp_path, chris: ChrisClient):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+
+    plinst = await dircopy.create_instance(dir="chris/uploads")
+    streamed = [f async for f in plinst.stream_outputs(interval=0.02)]
+    assert [f.fname.rsplit("/", 1)[-1] for f in streamed] == [
+        f"out{k}.dat" for k in range(6)
+    ]
+    newer = [f async for f in plinst.get_files(min_id=streamed[3].id)]
+    assert [f.url for f in newer] == [f.url for f in streamed[3:]]
+
+    plinst = await dircopy.create_instance(dir="chris/uploads")
+    downloaded = [f async for f in plinst.stream_outputs(tmp_path, interval=0.02)]
+    assert len({f.url for f in downloaded}) == 6
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"out{k}.dat" for k in range(6)
+    ]
+
+    plinst = await dircopy.create_instance(dir="chris/uploads")
+    with pytest.raises(TimeoutError):
+        async for _ in plinst.stream_outputs(interval=0.02, timeout=0.01):
+            pass
+
+
+@pytest.mark.fake_cube(job_script=(("finishedSuccessfully", 0),), outputs_per_job=3)
+async def test_sync_down_filebrowser(tmp_path, chris: ChrisClient):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    plinst = await dircopy.create_instance(dir="chris/uploads")
+    _, plinst = await plinst.wait(interval=0.01)
+    report = await chris.sync_down(plinst.output_path, tmp_path, filebrowser=True)
+    assert sorted(p.name for p in report.transferred) == [
+        f"out{k}.dat" for k in range(3)
+    ]
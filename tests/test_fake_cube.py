@@ -0,0 +1,107 @@
+"""
+Tests for `aiochris.testing`, the stand-in CUBE used by offline tests and benchmarks.
+"""
+
+import pytest
+
+from aiochris import ChrisClient, Status, acollect
+from aiochris.errors import InternalServerError
+from aiochris.testing import FakeCube, SyntheticData
+from aiochris.testing.server import _matches
+from aiochris.types import ChrisURL
+
+
+def test_synthetic_data_is_deterministic():
+    a = SyntheticData(seed=4)
+    b = SyntheticData(seed=4)
+    c = SyntheticData(seed=5)
+    assert a.pacsfile(1234) == b.pacsfile(1234)
+    assert a.pacsfile(1234) != c.pacsfile(1234)
+    assert b"".join(a.content("x", 5000, 999)) == b"".join(b.content("x", 5000))
+    assert len(b"".join(a.content("x", 5000, 999))) == 5000
+
+
+@pytest.mark.fake_cube(
+    data=SyntheticData(pacsfiles=2_000_000, plugin_instances=3_000_000)
+)
+async def test_millions_of_items(chris: ChrisClient):
+    assert await chris.search_pacsfiles().count() == 2_000_000
+    assert await chris.plugin_instances().count() == 3_000_000
+    pacsfile = await chris.search_pacsfiles(id=1_999_999).get_only()
+    assert pacsfile.fname.endswith("001999999.dcm")
+    page = await acollect(chris.search_pacsfiles(limit=5, offset=1_999_998))
+    assert [f.id for f in page] == [1_999_999, 2_000_000]
+
+
+@pytest.mark.fake_cube(
+    job_script=(("scheduled", 0.05), ("started", 0.05), ("finishedWithError", 0))
+)
+async def test_status_transitions(chris: ChrisClient):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    plinst = await dircopy.create_instance(dir="chris/uploads/data")
+    assert plinst.status is Status.scheduled
+    _, finished = await plinst.wait(interval=0.01)
+    assert finished.status is Status.finishedWithError
+    feed = await finished.get_feed()
+    assert feed.errored_jobs == 1
+
+
+@pytest.mark.fake_cube(error_rate=1.0, error_status=503)
+async def test_error_injection(fake_cube_url: ChrisURL):
+    with pytest.raises(InternalServerError):
+        await ChrisClient.from_login(
+            url=fake_cube_url, username="chris", password="chris1234"
+        )
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"PatientID": "P0000001"},
+        {"PatientID": "p0000001"},
+        {"PatientID_exact": "p0000001"},
+        {"PatientName": "Anon^Patient2", "StudyInstanceUID": "1.2.840.0.12"},
+        {"AccessionNumber": "A00000007"},
+        {"SeriesInstanceUID": "1.2.840.0.3.17"},
+        {"SeriesInstanceUID": "1.2.840.0.3.18"},
+        {"fname": "SERVICES/PACS/"},
+        {"fname": "SERVICES/PACS/SYNTHETIC/P0000001-Anon^Patient1/"},
+        {"fname": "SERVICES/PACS/SYNTHETIC/P0000001-Anon^Patient1/B"},
+        {"fname": "chris/uploads/"},
+        {"PatientID": "P0000001", "Modality": "MR"},
+    ],
+)
+def test_pacsfile_ids(filters: dict[str, str]):
+    data = SyntheticData(pacsfiles=1234)
+    ids, exact = data.pacsfile_ids(filters)
+    expected = [i for i in range(1, 1235) if _matches(data.pacsfile(i), filters)]
+    assert set(expected) <= set(ids)
+    exact_filters = {k: v for k, v in filters.items() if k in exact}
+    assert all(_matches(data.pacsfile(i), exact_filters) for i in ids)
+    if exact == set(filters):
+        assert list(ids) == expected
+
+
+@pytest.mark.fake_cube(data=SyntheticData(pacsfiles=10_000_000))
+async def test_filtered_millions_of_items(chris: ChrisClient, fake_cube: FakeCube):
+    table = fake_cube.pacsfiles.table
+    computed = []
+    make = table.make
+    table.make = lambda i: computed.append(i) or make(i)
+
+    series = chris.search_pacsfiles(PatientID="P0019000", SeriesDescription="T1")
+    study = chris.search_pacsfiles(AccessionNumber="A00095000", limit=7)
+    assert len(await acollect(study)) == 100
+    assert await chris.search_pacsfiles(min_id=9_999_001).count() == 1000
+    assert await series.count() > 0
+    assert len(computed) < 2000
+
+    computed.clear()
+    files = [
+        f
+        async for f in chris.walk_files(
+            "SERVICES/PACS/SYNTHETIC/P0019999-Anon^Patient19999"
+        )
+    ]
+    assert [f.id for f in files] == list(range(9_999_501, 10_000_001))
+    assert len(computed) < 2000
@@ -0,0 +1,58 @@
+import pytest
+import tracemalloc
+
+from aiochris import ChrisClient, acollect
+from aiochris.models.logged_in import PACSFile
+from aiochris.testing import SyntheticData
+from aiochris.util.memory import MemoryProfiler, current_profiler
+
+
+@pytest.mark.fake_cube(data=SyntheticData(pacsfiles=45), page_size=10)
+async def test_memory_profiler(chris: ChrisClient):
+    with MemoryProfiler() as profiler:
+        assert current_profiler() is profiler
+        pacsfiles = await acollect(chris.search_pacsfiles())
+    assert current_profiler() is None
+    assert not tracemalloc.is_tracing()
+    assert len(pacsfiles) == 45
+
+    link = profiler.links["pacsfiles"]
+    assert link.iterations == 1
+    assert link.pages == 5
+    assert link.items == 45
+    assert link.peak_bytes >= link.retained_bytes > 0
+
+    assert profiler.models[PACSFile.__name__].count == 45
+    assert profiler.models[PACSFile.__name__].bytes_per_item > 0
+    assert [p.items for p in profiler.pages] == [10, 10, 10, 10, 5]
+    assert all(p.body_bytes > 0 for p in profiler.pages)
+    assert profiler.report()["links"]["pacsfiles"]["items"] == 45
+
+
+async def test_memory_profiler_generic_iterable():
+    async def numbers():
+        for i in range(100):
+            yield [i] * 100
+
+    with MemoryProfiler() as profiler:
+        await acollect(numbers())
+    assert profiler.links["async_generator"].retained_bytes > 100 * 100 * 8
+
+
+async def test_memory_profiler_keeps_peak():
+    async def numbers():
+        for i in range(10):
+            yield i
+
+    tracemalloc.start()
+    try:
+        big = bytes(10_000_000)
+        del big
+        _, peak_before = tracemalloc.get_traced_memory()
+        with MemoryProfiler() as profiler:
+            await acollect(numbers())
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[1] >= peak_before
+        assert profiler.links["async_generator"].peak_bytes < 10_000_000
+    finally:
+        tracemalloc.stop()
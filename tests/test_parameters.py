@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from aiochris import ChrisClient
+from aiochris.errors import InvalidParametersError
+from aiochris.testing import FakeCube
+from aiochris.util.parameters import (
+    ParameterCache,
+    ParameterSpec,
+    ParameterValidator,
+    coerce,
+)
+
+
+def test_validate():
+    validator = ParameterValidator(
+        "pl-example 1.0",
+        [
+            ParameterSpec("dir", "path", False, None, "store"),
+            ParameterSpec("count", "integer", True, 3, "store"),
+            ParameterSpec("ratio", "float", True, None, "store"),
+            ParameterSpec("verbose", "boolean", True, False, "store_true"),
+        ],
+    )
+    assert validator.validate({"dir": "a", "ratio": 1, "title": "t"}) == {
+        "dir": "a",
+        "ratio": 1,
+        "count": 3,
+        "verbose": False,
+        "title": "t",
+    }
+    # CUBE converts strings and other types like Django REST framework does
+    assert validator.validate({"dir": 5, "count": "5", "ratio": "0.5", "verbose": 1})
+    with pytest.raises(InvalidParametersError) as e:
+        validator.validate({"count": True, "verbose": "maybe", "cuont": 2})
+    assert e.value.errors == {
+        "count": ["A valid integer is required."],
+        "verbose": ["Must be a valid boolean."],
+        "cuont": ["Unknown parameter."],
+        "dir": ["This field is required."],
+    }
+
+
+def test_coerce():
+    assert coerce("integer", "5") == 5
+    assert coerce("integer", " 5.0 ") == 5
+    assert coerce("integer", 5.0) == 5
+    assert coerce("float", "3.5") == 3.5
+    assert coerce("boolean", "true") is True
+    assert coerce("boolean", 0) is False
+    assert coerce("string", 5) == "5"
+    for param_type, value in (
+        ("integer", "5.5"),
+        ("integer", False),
+        ("float", "many"),
+        ("boolean", "maybe"),
+        ("string", True),
+        ("path", ["a"]),
+    ):
+        with pytest.raises(ValueError):
+            coerce(param_type, value)
+
+
+async def test_parameter_cache(tmp_path, chris: ChrisClient, fake_cube: FakeCube):
+    ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+
+    cache = ParameterCache(tmp_path)
+    requests_before = fake_cube.request_count
+    with pytest.raises(InvalidParametersError):
+        await ds.create_instance(root, validate=cache, sleepLength="five")
+    plinst = await ds.create_instance(root, validate=cache, sleepLength="5")
+    assert fake_cube.request_count - requests_before == 2
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    params = {p.param_name: p.value async for p in plinst.get_parameters()}
+    assert params["dummyFloat"] == 3.5
+    assert params["sleepLength"] == 5
+
+    # another cache on the same directory, e.g. of another process
+    other = ParameterCache(tmp_path)
+    requests_before = fake_cube.request_count
+    await other.get(ds)
+    assert fake_cube.request_count == requests_before
+    assert (other.stats.hits, other.stats.misses) == (1, 0)
+
+
+@pytest.mark.fake_cube(latency=0.05)
+async def test_parameter_cache_cancelled_caller(chris: ChrisClient):
+    ds = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+    cache = ParameterCache()
+    first = asyncio.create_task(cache.get(ds))
+    second = asyncio.create_task(cache.get(ds))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    validator = await second
+    assert "sleepLength" in validator.specs
+    assert first.cancelled()
+    assert cache.stats.misses == 1
@@ -0,0 +1,111 @@
+import pytest
+
+from aiochris import ChrisClient, Status
+from aiochris.errors import BadRequestError
+from aiochris.testing import FakeCube
+
+TREE = [
+    {
+        "plugin_name": "pl-simpledsapp",
+        "plugin_version": "2.1.0",
+        "previous_index": None,
+        "title": "first",
+        "plugin_parameter_defaults": [{"name": "prefix", "default": "a"}],
+    },
+    {
+        "plugin_name": "pl-simpledsapp",
+        "plugin_version": "2.1.0",
+        "previous_index": 0,
+        "title": "left",
+    },
+    {
+        "plugin_name": "pl-simpledsapp",
+        "plugin_version": "2.1.0",
+        "previous_index": 0,
+        "title": "right",
+    },
+]
+
+
+@pytest.mark.fake_cube(job_script=(("started", 0.1), ("finishedSuccessfully", 0)))
+async def test_create_workflow(chris: ChrisClient, fake_cube: FakeCube):
+    fake_cube.add_pipeline("example", TREE)
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+    pipeline = await chris.search_pipelines(name="example").get_only()
+    pipings = [p async for p in pipeline.get_pipings()]
+    assert [p.title for p in pipings] == ["first", "left", "right"]
+    defaults = {
+        (p.plugin_piping_title, p.param_name): p.value
+        async for p in pipeline.get_default_parameters()
+    }
+    assert defaults[("first", "prefix")] == "a"
+
+    requests_before = fake_cube.request_count
+    workflow = await pipeline.create_workflow(
+        root,
+        params={"left": {"prefix": "b"}, pipings[2].id: {"sleepLength": 2}},
+        title="run 1",
+    )
+    # one request for the pipings and one to create the workflow
+    assert fake_cube.request_count - requests_before == 2
+    assert workflow.title == "run 1"
+    assert workflow.active_jobs == 3
+
+    elapsed, plinsts = await workflow.wait(min_interval=0.05, timeout=10.0)
+    assert all(p.status is Status.finishedSuccessfully for p in plinsts)
+    by_title = {p.title: p for p in plinsts}
+    assert by_title["first"].previous_id == root.id
+    assert by_title["left"].previous_id == by_title["first"].id
+    assert by_title["right"].previous_id == by_title["first"].id
+
+    async def params_of(title):
+        return {p.param_name: p.value async for p in by_title[title].get_parameters()}
+
+    assert (await params_of("first"))["prefix"] == "a"
+    assert (await params_of("left"))["prefix"] == "b"
+    assert (await params_of("right"))["sleepLength"] == 2
+
+    assert (await chris.search_workflows().get_only()).id == workflow.id
+
+
+async def test_create_workflow_invalid(chris: ChrisClient, fake_cube: FakeCube):
+    fake_cube.add_pipeline("example", TREE)
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+    pipeline = await chris.search_pipelines(name="example").get_only()
+    with pytest.raises(ValueError, match="nope"):
+        await pipeline.create_workflow(root, params={"nope": {}})
+    plinsts_before = await chris.plugin_instances().count()
+    with pytest.raises(BadRequestError):
+        await pipeline.create_workflow(
+            root, params={"right": {"sleepLength": "not a number"}}
+        )
+    assert await chris.plugin_instances().count() == plinsts_before
+
+
+async def test_create_workflow_ambiguous_title(chris: ChrisClient, fake_cube: FakeCube):
+    twins = [*TREE, {**TREE[2], "previous_index": 1}]
+    fake_cube.add_pipeline("twins", twins)
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+    pipeline = await chris.search_pipelines(name="twins").get_only()
+    rights = [p async for p in pipeline.get_pipings() if p.title == "right"]
+    assert len(rights) == 2
+    plinsts_before = await chris.plugin_instances().count()
+    with pytest.raises(ValueError, match="right"):
+        await pipeline.create_workflow(root, params={"right": {"prefix": "r"}})
+    assert await chris.plugin_instances().count() == plinsts_before
+
+    workflow = await pipeline.create_workflow(
+        root, params={rights[1].id: {"prefix": "r"}, "left": {"prefix": "l"}}
+    )
+    created = {p.id: p async for p in workflow.get_plugin_instances()}
+    prefixes = {}
+    for plinst in created.values():
+        params = {p.param_name: p.value async for p in plinst.get_parameters()}
+        parent = created.get(plinst.previous_id)
+        prefixes[(plinst.title, parent and parent.title)] = params["prefix"]
+    assert prefixes[("left", "first")] == "l"
+    assert prefixes[("right", "first")] == ""
+    assert prefixes[("right", "left")] == "r"
@@ -0,0 +1,67 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from aiochris import ChrisClient, Status
+from aiochris.testing import SyntheticData
+from aiochris.util.polling import (
+    ExponentialBackoff,
+    FixedInterval,
+    LearnedRuntime,
+    StatusIntervals,
+)
+
+
+def test_intervals():
+    plinst = SimpleNamespace(
+        status=Status.started,
+        start_date=datetime.datetime.now(datetime.timezone.utc)
+        - datetime.timedelta(seconds=40),
+    )
+    backoff = ExponentialBackoff(initial=1, factor=2, max_interval=10)
+    assert [backoff.interval(plinst, 0, n) for n in range(1, 7)] == [
+        1,
+        2,
+        4,
+        8,
+        10,
+        10,
+    ]
+    assert backoff.interval(plinst, 0, 10_000) == 10
+    assert ExponentialBackoff(factor=1.5).interval(plinst, 0, 10_000) == 60
+    assert ExponentialBackoff().interval(plinst, 0, 10_000) == 60
+    by_status = StatusIntervals({Status.registeringFiles: 0.5}, default=30)
+    assert by_status.interval(plinst, 0, 1) == 30
+    registering = SimpleNamespace(status=Status.registeringFiles)
+    assert by_status.interval(registering, 0, 1) == 0.5
+
+    assert LearnedRuntime(100).interval(plinst, 0, 1) == pytest.approx(60, abs=1)
+    assert LearnedRuntime(30).interval(plinst, 0, 1) == 3
+    assert LearnedRuntime(40.2, min_interval=1).interval(plinst, 0, 1) == 1
+
+
+@pytest.mark.fake_cube(
+    data=SyntheticData(feeds=0, plugin_instances=0),
+    job_script=(
+        ("started", 0.3),
+        ("registeringFiles", 0.1),
+        ("finishedSuccessfully", 0),
+    ),
+)
+async def test_polling_strategies(chris: ChrisClient):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+
+    async def run(polling):
+        plinst = await dircopy.create_instance(dir="chris/uploads")
+        _, finished = await plinst.wait(polling=polling)
+        assert finished.status is Status.finishedSuccessfully
+        return polling.polls
+
+    fixed_polls = await run(FixedInterval(0.01))
+    backoff_polls = await run(ExponentialBackoff(initial=0.01, factor=2))
+    assert backoff_polls < fixed_polls
+
+    learned = await LearnedRuntime.from_history(chris, "pl-dircopy", min_interval=0.01)
+    assert learned.estimate == pytest.approx(0.4, abs=0.01)
+    assert await run(learned) <= 3
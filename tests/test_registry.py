@@ -0,0 +1,54 @@
+import asyncio
+
+from aiochris import ChrisClient
+from aiochris.testing import FakeCube
+from aiochris.util.registry import PluginRegistry
+
+
+async def test_plugin_registry(chris: ChrisClient, fake_cube: FakeCube):
+    now = 0.0
+    assert chris.plugin_registry is chris.plugin_registry
+    registry = PluginRegistry(chris, ttl=60, negative_ttl=10, clock=lambda: now)
+    requests_before = fake_cube.request_count
+    dircopy, ds = await asyncio.gather(
+        registry.get("pl-dircopy"), registry.get("pl-simpledsapp", "2.1.0")
+    )
+    assert fake_cube.request_count - requests_before == 1
+    assert dircopy.name == "pl-dircopy"
+    assert ds.version == "2.1.0"
+    assert await registry.get_image(dircopy.dock_image) == dircopy
+    assert registry.lookup("pl-simpledsapp") == ds
+
+    # negative caching
+    assert await registry.get("pl-nope") is None
+    assert await registry.get("pl-nope") is None
+    assert fake_cube.request_count - requests_before == 2
+    now = 11.0
+    assert await registry.get("pl-nope") is None
+    assert fake_cube.request_count - requests_before == 3
+
+    # stale catalog is refreshed in the background
+    now = 61.0
+    assert await registry.get("pl-dircopy") == dircopy
+    await registry._refreshing
+    assert registry.stats.refreshes == 2
+    assert fake_cube.request_count - requests_before == 4
+
+    # searches are shared, and names and images are cached separately
+    requests_before = fake_cube.request_count
+    results = await asyncio.gather(*(registry.get("pl-missing") for _ in range(3)))
+    assert results == [None] * 3
+    assert fake_cube.request_count - requests_before == 1
+    assert await registry.get_image("pl-missing") is None
+    assert fake_cube.request_count - requests_before == 2
+
+    # closing the client stops the background refresh
+    fake_cube.latency = 0.05
+    chris.plugin_registry.clock = lambda: now
+    await chris.plugin_registry.get("pl-dircopy")
+    now = 600.0
+    await chris.plugin_registry.get("pl-dircopy")
+    refreshing = chris.plugin_registry._refreshing
+    assert not refreshing.done()
+    await chris.close()
+    assert refreshing.cancelled()
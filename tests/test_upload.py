@@ -0,0 +1,92 @@
+import pytest
+
+from aiochris import ChrisClient
+from aiochris.util.transfer import DEFAULT_MANIFEST_NAME
+
+
+async def download(chris: ChrisClient, file) -> bytes:
+    async with chris.s.get(file.file_resource) as res:
+        return await res.read()
+
+
+async def test_upload_file(tmp_path, chris: ChrisClient):
+    content = bytes(range(256)) * 10_000
+    local_file = tmp_path / "data.dat"
+    local_file.write_bytes(content)
+    uploaded = await chris.upload_file(local_file, "a/data.dat", chunk_size=4096)
+    assert uploaded.fname == "chris/uploads/a/data.dat"
+    assert uploaded.fsize == len(content)
+    assert await download(chris, uploaded) == content
+
+
+async def test_upload_in_memory(chris: ChrisClient):
+    uploaded = await chris.upload(b"hello", "hello.txt")
+    assert await download(chris, uploaded) == b"hello"
+    view = memoryview(bytearray(range(16))).cast("B", (4, 4))
+    uploaded = await chris.upload(view, "view.dat")
+    assert await download(chris, uploaded) == bytes(range(16))
+
+
+async def test_upload_stream(chris: ChrisClient):
+    async def stream():
+        for i in range(10):
+            yield bytes([i]) * 1000
+
+    uploaded = await chris.upload(stream(), "stream.dat", length=10_000)
+    assert await download(chris, uploaded) == b"".join(
+        bytes([i]) * 1000 for i in range(10)
+    )
+    with pytest.raises(ValueError, match="size must be given"):
+        await chris.upload(stream(), "stream.dat")
+    with pytest.raises(ValueError, match="more than the declared"):
+        await chris.upload(stream(), "stream.dat", length=9_000)
+    with pytest.raises(ValueError, match="11000 were declared"):
+        await chris.upload(stream(), "stream.dat", length=11_000)
+
+
+def make_tree(root, n: int) -> dict[str, bytes]:
+    contents = {f"d{i % 3}/f{i}.txt": f"file number {i}\n".encode() for i in range(n)}
+    for rel, content in contents.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_bytes(content)
+    return contents
+
+
+async def test_upload_directory(tmp_path, chris: ChrisClient):
+    contents = make_tree(tmp_path, 20)
+    reports = []
+    report = await chris.upload_directory(
+        tmp_path, "tree", concurrency=3, progress=lambda p: reports.append(str(p))
+    )
+    assert report.ok
+    assert report.progress.done
+    assert report.progress.files == 20
+    assert report.progress.bytes == sum(len(c) for c in contents.values())
+    assert len(reports) == 20
+    uploaded = {f.fname: await download(chris, f) for f in report.transferred}
+    assert uploaded == {
+        f"chris/uploads/tree/{rel}": content for rel, content in contents.items()
+    }
+
+    # resumed from the manifest, which is not in the uploaded directory
+    assert not (tmp_path / DEFAULT_MANIFEST_NAME).exists()
+    (tmp_path / "d0" / "f0.txt").write_bytes(b"changed")
+    report = await chris.upload_directory(tmp_path, "tree")
+    assert [f.fname for f in report.transferred] == ["chris/uploads/tree/d0/f0.txt"]
+    assert report.progress.skipped_files == 19
+
+    # the manifest can be kept in the uploaded directory
+    report = await chris.upload_directory(
+        tmp_path, "tree2", manifest=DEFAULT_MANIFEST_NAME
+    )
+    assert report.progress.files == 20
+    assert (tmp_path / DEFAULT_MANIFEST_NAME).exists()
+    report = await chris.upload_directory(
+        tmp_path, "tree2", manifest=DEFAULT_MANIFEST_NAME
+    )
+    assert report.progress.skipped_files == 20
+
+    # skipped because already in CUBE
+    report = await chris.upload_directory(tmp_path, "tree", manifest=None)
+    assert report.progress.skipped_files == 20
+    assert report.transferred == []
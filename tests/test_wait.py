@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from aiochris import ChrisClient, Status
+from aiochris.errors import BadRequestError, InternalServerError
+from aiochris.testing import FakeCube
+from aiochris.util.wait import WaitManager, plan_searches
+
+
+def test_plan_searches():
+    assert plan_searches({1: list(range(1, 251))}, 100) == [
+        {"min_id": 1, "max_id": 100},
+        {"min_id": 101, "max_id": 200},
+        {"min_id": 201, "max_id": 250},
+    ]
+    assert plan_searches(
+        {1: [1, 500, 1000, 1500], 2: [7], 3: [8, 9], 4: [300]}, 100
+    ) == [
+        {"feed_id": 1, "min_id": 1, "max_id": 1500},
+        {"min_id": 7, "max_id": 9},
+        {"min_id": 300, "max_id": 300},
+    ]
+    assert plan_searches({}, 100) == []
+
+
+async def test_wait_manager(chris: ChrisClient, fake_cube: FakeCube):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    plinsts = [await dircopy.create_instance(dir="chris/uploads") for _ in range(25)]
+    manager = WaitManager(chris, interval=0.05, page_size=10)
+    requests_before = fake_cube.request_count
+    results = await asyncio.gather(
+        *(p.wait(manager=manager) for p in plinsts[1:]),
+        manager.wait(plinsts[0], Status.registeringFiles),
+    )
+    assert all(p.status is Status.finishedSuccessfully for _, p in results[:-1])
+    assert results[-1][1].status is Status.registeringFiles
+    assert [p.id for _, p in results[:-1]] == [p.id for p in plinsts[1:]]
+    assert fake_cube.request_count - requests_before == manager.requests
+
+    elapsed, unfinished = await manager.wait(
+        await dircopy.create_instance(dir="chris/uploads"), timeout=0.01
+    )
+    assert unfinished.status is not Status.finishedSuccessfully
+    assert not manager._waiters
+
+
+@pytest.mark.fake_cube(job_script=(("started", 0.2), ("finishedSuccessfully", 0)))
+async def test_feed_watch_and_wait_idle(chris: ChrisClient, fake_cube: FakeCube):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    simpledsapp = await chris.search_plugins(name_exact="pl-simpledsapp").get_only()
+    root = await dircopy.create_instance(dir="chris/uploads")
+    for _ in range(10):
+        await simpledsapp.create_instance(previous=root)
+    feed = await root.get_feed()
+    assert feed.active_jobs == 11
+
+    deltas = []
+    async for delta in feed.watch(min_interval=0.02, max_interval=0.05):
+        deltas.append(delta)
+        if delta.feed.active_jobs == 0:
+            break
+    assert sum(d.changes.get("finished_jobs", 0) for d in deltas) == 11
+    assert sum(d.changes.get("started_jobs", 0) for d in deltas) == -11
+
+    requests_before = fake_cube.request_count
+    elapsed, idle = await deltas[-1].feed.wait_idle()
+    assert elapsed == 0.0 and idle is deltas[-1].feed
+
+    busy = await simpledsapp.create_instance(previous=root)
+    elapsed, idle = await (await busy.get_feed()).wait_idle(
+        min_interval=0.02, max_interval=0.05
+    )
+    assert idle.active_jobs == 0 and idle.finished_jobs == 12
+    assert fake_cube.request_count - requests_before < 20
+
+    with pytest.raises(TimeoutError):
+        async for _ in idle.watch(min_interval=0.01, timeout=0.05):
+            pass
+
+
+@pytest.mark.fake_cube(job_script=(("started", 0.1), ("finishedSuccessfully", 0)))
+async def test_wait_manager_retries(chris: ChrisClient, fake_cube: FakeCube):
+    dircopy = await chris.search_plugins(name_exact="pl-dircopy").get_only()
+    plinsts = [await dircopy.create_instance(dir="chris/uploads") for _ in range(5)]
+    manager = WaitManager(chris, interval=0.02, max_failures=3)
+
+    fake_cube.error_rate = 1.0
+    fake_cube.error_status = 503
+    waits = asyncio.gather(*(manager.wait(p) for p in plinsts))
+    await asyncio.sleep(0.05)  # the first refresh fails
+    fake_cube.error_rate = 0.0
+    results = await waits
+    assert all(p.status is Status.finishedSuccessfully for _, p in results)
+
+    plinst = await dircopy.create_instance(dir="chris/uploads")
+    fake_cube.error_rate = 1.0
+    with pytest.raises(InternalServerError):
+        await manager.wait(plinst)  # three failures in a row
+    fake_cube.error_status = 404
+    with pytest.raises(BadRequestError):
+        await asyncio.wait_for(manager.wait(plinst), 0.05)  # not retried
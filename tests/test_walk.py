@@ -0,0 +1,45 @@
+from pytest_mock import MockerFixture
+
+from aiochris import ChrisClient
+from aiochris.util.search import acollect
+
+_SIZES = {
+    "a.txt": 10,
+    "sub/b.txt": 20,
+    "sub/c.txt": 30,
+    "sub/deeper/d.txt": 40,
+    "other/e.txt": 50,
+}
+
+
+async def test_walk(mocker: MockerFixture, chris: ChrisClient):
+    for name, size in _SIZES.items():
+        await chris.upload(bytes(size), f"tree/{name}")
+
+    search = mocker.spy(chris, "search_filebrowser")
+    entries = await acollect(chris.walk("chris/uploads/tree/", concurrency=3))
+    assert search.call_count == 1  # subfolders are not searched for
+    paths = [e.path for e in entries]
+    assert paths[0] == "chris/uploads/tree"
+    assert set(paths[1:3]) == {"chris/uploads/tree/sub", "chris/uploads/tree/other"}
+    assert paths[3:] == ["chris/uploads/tree/sub/deeper"]
+
+    by_path = {e.path: e for e in entries}
+    assert set(by_path["chris/uploads/tree"].subfolders) == {"sub", "other"}
+    assert sorted(f.fname for f in by_path["chris/uploads/tree/sub"].files) == [
+        "chris/uploads/tree/sub/b.txt",
+        "chris/uploads/tree/sub/c.txt",
+    ]
+
+    without_files = await acollect(chris.walk("chris/uploads/tree", files=False))
+    assert {e.path for e in without_files} == set(paths)
+    assert all(not e.files for e in without_files)
+
+    usage = await chris.disk_usage("chris/uploads/tree")
+    assert usage == {
+        "chris/uploads/tree": 150,
+        "chris/uploads/tree/sub": 90,
+        "chris/uploads/tree/sub/deeper": 40,
+        "chris/uploads/tree/other": 50,
+    }
+    assert await acollect(chris.walk("chris/uploads/nonexistent")) == []